@@ -0,0 +1,8 @@
+"""
+Allows the batch atom typing CLI to be run at module level: python -m aip_atom_types
+"""
+
+from aip_atom_types.batch_assign import main
+
+if __name__ == '__main__':
+    main()
@@ -8,152 +8,192 @@ from aip_atom_types.fg_graphs import water, amide, vinylogous_amide, carbonyl, a
 import types
 
 
+AROMATIC_FG_GRAPHS = [special_car, special_car2, special_c2, special_c1, special_nam]
+
+FG_GRAPHS = [water, ammonia, one_lp_1, one_lp_2, amide_n, amide, vinylogous_amide, aldehyde,
+             carbonyl, nitro, noxide, po, alcohol, any_O3, epoxide, sulfone, sulfoxide,
+             quaternary_sulfur, n_sulfoxide, phos, silicon, selenone, selenoxide,
+             incorrectly_assigned_pl3, not_pyridine, primary_amine, secondary_amine,
+             tertiary_amine, planar_aniline, primary_pl3_nitrogen, secondary_pl3_nitrogen,
+             tertiary_pl3_nitrogen, quaternary_nitrogen, ps, phene, nh, oh, softh]
+
+
 def assign_aip_atom_types(network, aromatic=False):
+    """Assigns the aipAtomType of every atom of the network: the first functional group of
+       AROMATIC_FG_GRAPHS (if aromatic) and FG_GRAPHS that types an atom wins, the remaining
+       atoms keep their sybyl type"""
     dict_atoms = {}
+    atom_index = index_atoms_by_category(network)
+    patterns = compiled_fg_patterns()
     if aromatic:
-        match = match_atoms_by_fg_description(network, special_car, dict_atoms)
-        for k, v in match.items():
-            dict_atoms[k] = v
-        match = match_atoms_by_fg_description(
-            network, special_car2, dict_atoms)
-        for k, v in match.items():
-            dict_atoms[k] = v
-        match = match_atoms_by_fg_description(network, special_c2, dict_atoms)
-        for k, v in match.items():
-            dict_atoms[k] = v
-        match = match_atoms_by_fg_description(network, special_c1, dict_atoms)
-        for k, v in match.items():
-            dict_atoms[k] = v
-        match = match_atoms_by_fg_description(network, special_nam, dict_atoms)
-        for k, v in match.items():
-            dict_atoms[k] = v
-
-    match = match_atoms_by_fg_description(network, water, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, ammonia, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, one_lp_1, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, one_lp_2, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, amide_n, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, amide, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(
-        network, vinylogous_amide, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, aldehyde, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, carbonyl, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, nitro, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, noxide, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, po, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, alcohol, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, any_O3, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, epoxide, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, sulfone, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, sulfoxide, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(
-        network, quaternary_sulfur, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(
-        network, n_sulfoxide, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, phos, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, silicon, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, selenone, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, selenoxide, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(
-        network, incorrectly_assigned_pl3, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, not_pyridine, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, primary_amine, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, secondary_amine, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, tertiary_amine, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, planar_aniline, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(
-        network, primary_pl3_nitrogen, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(
-        network, secondary_pl3_nitrogen, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(
-        network, tertiary_pl3_nitrogen, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(
-        network, quaternary_nitrogen, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, ps, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, phene, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, nh, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, oh, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
-    match = match_atoms_by_fg_description(network, softh, dict_atoms)
-    for k, v in match.items():
-        dict_atoms[k] = v
+        for pattern in patterns["aromatic"]:
+            pattern.update_dict_atoms(network, dict_atoms, atom_index)
+    for pattern in patterns["fg"]:
+        pattern.update_dict_atoms(network, dict_atoms, atom_index)
     dict_atoms = update_dict_atoms_with_sybyl(network, dict_atoms)
     return dict_atoms
 
 
+def compiled_fg_patterns():
+    """The functional group graphs compiled once per process"""
+    if not _COMPILED_FG_PATTERNS:
+        _COMPILED_FG_PATTERNS["aromatic"] = [CompiledPattern(g) for g in AROMATIC_FG_GRAPHS]
+        _COMPILED_FG_PATTERNS["fg"] = [CompiledPattern(g) for g in FG_GRAPHS]
+    return _COMPILED_FG_PATTERNS
+
+
+_COMPILED_FG_PATTERNS = {}
+
+
+def index_atoms_by_category(network):
+    """Atoms of the network grouped by their (sybyl, elementType), in network order"""
+    atom_index = {}
+    for atom, data in network.nodes(data=True):
+        key = (data.get('sybyl', "ignore_key"), data.get('elementType', "ignore_key"))
+        atom_index.setdefault(key, []).append(atom)
+    return atom_index
+
+
+class CompiledPattern:
+    """A functional group graph prepared for repeated matching against molecules.
+
+    Gives the same assignments as match_atoms_by_fg_description: an atom not yet in
+    dict_atoms takes the aipAtomType of a typed pattern node if any induced subgraph
+    isomorphism maps it to that node. Instead of enumerating every embedding, each typed
+    node is only seeded from the untyped atoms whose sybyl and element match it, and the
+    search stops at the first embedding, which also types the other atoms it covers.
+
+    Parameters
+    ----------
+    pattern : nx.Graph
+        functional group graph of fg_graphs
+    """
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.nodes = list(pattern.nodes)
+        position = {node: i for i, node in enumerate(self.nodes)}
+        self.node_rules = [(pattern.nodes[node].get('sybyl', "ignore_key"),
+                            pattern.nodes[node].get('elementType', "ignore_key"))
+                           for node in self.nodes]
+        self.atom_types = [pattern.nodes[node].get('aipAtomType') for node in self.nodes]
+        # bond rule of each pair of bonded pattern nodes; absent pairs must not be bonded
+        self.bonds = [{} for node in self.nodes]
+        for node1, node2, data in pattern.edges(data=True):
+            rule = data.get('bondOrder', "ignore_key")
+            self.bonds[position[node1]][position[node2]] = rule
+            self.bonds[position[node2]][position[node1]] = rule
+        self.typed = [i for i, atom_type in enumerate(self.atom_types) if atom_type is not None]
+        self.orders = {root: self._search_order(root) for root in self.typed}
+
+    def _search_order(self, root):
+        """Pattern nodes in breadth-first order from root, each with an earlier bonded node
+           whose molecule neighbours give its candidates (None starts a new component)"""
+        order = []
+        parents = []
+        seen = set()
+        for start in [root] + list(range(len(self.nodes))):
+            if start in seen:
+                continue
+            seen.add(start)
+            queue = [(start, None)]
+            while queue:
+                node, parent = queue.pop(0)
+                order.append(node)
+                parents.append(parent)
+                for neighbour in sorted(self.bonds[node]):
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        queue.append((neighbour, node))
+        return order, parents
+
+    def candidates(self, atom_index):
+        """Atoms of the molecule that match each pattern node, from the atom index"""
+        candidates = []
+        for sybyl_rule, element_rule in self.node_rules:
+            matching = []
+            for (sybyl, element), atoms in atom_index.items():
+                if matching_rules(sybyl, sybyl_rule, "ignore_key") and \
+                        matching_rules(element, element_rule, "ignore_key"):
+                    matching += atoms
+            candidates.append(set(matching))
+        return candidates
+
+    def update_dict_atoms(self, network, dict_atoms, atom_index=None):
+        """Adds the atoms typed by this pattern to dict_atoms, which is returned"""
+        if len(self.typed) == 0:
+            return dict_atoms
+        if atom_index is None:
+            atom_index = index_atoms_by_category(network)
+        candidates = self.candidates(atom_index)
+        if self._ambiguous(candidates):
+            return match_atoms_by_fg_description(network, self.pattern, dict_atoms)
+        for root in self.typed:
+            for atom in network.nodes:
+                if atom in dict_atoms or atom not in candidates[root]:
+                    continue
+                embedding = self._embedding(network, root, atom, candidates)
+                if embedding is None:
+                    continue
+                for i, matched in embedding.items():
+                    if self.atom_types[i] is not None and matched not in dict_atoms:
+                        dict_atoms[matched] = self.atom_types[i]
+        return dict_atoms
+
+    def _ambiguous(self, candidates):
+        """Whether an atom can match typed nodes of different aipAtomTypes, where the
+           assignment depends on the enumeration order of the embeddings"""
+        for i in self.typed:
+            for j in self.typed:
+                if self.atom_types[i] != self.atom_types[j] and candidates[i] & candidates[j]:
+                    return True
+        return False
+
+    def _embedding(self, network, root, atom, candidates):
+        """An induced subgraph isomorphism mapping the root node to atom, or None"""
+        order, parents = self.orders[root]
+        mapping = {}
+        used = set()
+
+        def extend(depth):
+            if depth == len(order):
+                return True
+            node = order[depth]
+            parent = parents[depth]
+            if depth == 0:
+                options = [atom]
+            elif parent is None:
+                options = [a for a in network.nodes if a in candidates[node]]
+            else:
+                options = [a for a in network.adj[mapping[parent]] if a in candidates[node]]
+            for option in options:
+                if option in used or not self._consistent(network, node, option, mapping):
+                    continue
+                mapping[node] = option
+                used.add(option)
+                if extend(depth + 1):
+                    return True
+                del mapping[node]
+                used.discard(option)
+            return False
+
+        return mapping if extend(0) else None
+
+    def _consistent(self, network, node, option, mapping):
+        bonds = self.bonds[node]
+        for mapped_node, mapped_atom in mapping.items():
+            bonded = network.has_edge(option, mapped_atom)
+            if mapped_node not in bonds:
+                if bonded:
+                    return False
+            elif not bonded:
+                return False
+            elif bonds[mapped_node] != "ignore_key" and \
+                    str(network.edges[option, mapped_atom].get('bondOrder', "ignore_key")) != str(bonds[mapped_node]):
+                return False
+        return True
+
+
 def match_atoms_by_fg_description(network1, network2, dict_atoms={}):
     nm = node_match_by_category_list(['sybyl', 'elementType'], "ignore_key")
     em = edge_match_by_category('bondOrder', "ignore_key")
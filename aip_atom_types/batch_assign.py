@@ -0,0 +1,315 @@
+"""
+Batch assignment of AIP atom types for large compound libraries. Structures are read from
+directories or multi-record CML, mol2, sdf or mol files, every record is typed with the
+compiled functional group patterns over a process pool and written out as namespaced CML with
+sybyl and aipAtomType attributes, {output_dir}/{inchikey}.cml, as
+python -m cmlgenerator generate -y -t writes it for a single file. Failures are collected into
+a tab-separated report rather than ending the run, and the throughput is logged. A worker that
+is killed (e.g. by the OOM killer or a crash in openbabel) breaks the pool; the pool is then
+recreated, the records of the chunks in flight are retried one at a time, and only the record
+that killed its worker fails.
+
+Run with: python -m aip_atom_types -i library.sdf structures_dir -o cml_dir -np 8
+"""
+
+import argparse
+import csv
+import glob
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
+
+REPORT_FIELDS = ["source", "record", "inchikey", "status", "seconds", "output", "error"]
+STRUCTURE_FORMATS = ["cml", "mol2", "sdf", "mol"]
+
+
+def find_structure_files(inputs, formats=STRUCTURE_FORMATS):
+    """Structure files given directly or found in the given directories by their extension"""
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    structure_files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for file_format in formats:
+                structure_files += sorted(glob.glob(os.path.join(path, "*.{}".format(file_format))))
+        else:
+            structure_files.append(path)
+    return structure_files
+
+
+def read_records(structure_files, file_format=None):
+    """(source, record, cml) of every molecule of the structure files, with the record counted
+       from 0 within its file. A file that cannot be read gives a single record with cml None."""
+    import cmlgenerator.structuretocml as structcml
+    for structure_file in structure_files:
+        in_format = file_format if file_format is not None else \
+            os.path.splitext(structure_file)[1][1:].lower()
+        n_records = 0
+        if os.path.isfile(structure_file):
+            for molecule_cml in structcml.read_records_from_file(structure_file, in_format):
+                yield structure_file, n_records, molecule_cml
+                n_records += 1
+        if n_records == 0:
+            yield structure_file, 0, None
+
+
+def type_record(source, record, molecule_cml, output_dir, aromatic=False):
+    """Assigns the AIP atom types of one record and writes {output_dir}/{inchikey}.cml.
+       Never raises: the outcome is returned as a row of the report."""
+    start = time.perf_counter()
+    inchikey, output = "", ""
+    try:
+        if molecule_cml is None:
+            raise ValueError("no molecule could be read from {}".format(source))
+        import cmlgenerator.cmlmaker as cmlmaker
+        import cmlgenerator.cmlnamespacing as cmlname
+        inchikey, molecule_element = cmlmaker.create_cml_from_cml_string(
+            molecule_cml, add_sybyl=True, add_aip_atom_types=True, aromatic=aromatic)
+        filename = cmlmaker.create_filename_frominchikey(inchikey)
+        cmlname.write_cml_to_file(molecule_element, filename, output_dir)
+        status, error = "ok", ""
+        output = os.path.join(output_dir, filename)
+    except Exception as err:
+        status = "failed"
+        error = "{}: {}".format(type(err).__name__, err).replace("\n", " ")
+    return {"source": source, "record": record, "inchikey": inchikey, "status": status,
+            "seconds": round(time.perf_counter() - start, 4), "output": output, "error": error}
+
+
+def type_records(records, output_dir, aromatic=False):
+    """(index, report row) of a chunk of (index, (source, record, cml)) records"""
+    return [(index, type_record(source, record, molecule_cml, output_dir, aromatic))
+            for index, (source, record, molecule_cml) in records]
+
+
+def _init_worker():
+    """Compiles the functional group patterns once per worker"""
+    from aip_atom_types.assign_aip_atom_types import compiled_fg_patterns
+    compiled_fg_patterns()
+
+
+def _chunks(records, chunksize):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def batch_assign_aip_atom_types(inputs, output_dir, file_format=None, aromatic=False,
+                                n_processes=None, chunksize=32, report_file=None):
+    """Assigns AIP atom types to every molecule of the inputs over a process pool.
+
+    Parameters
+    ----------
+    inputs : list
+        structure files, possibly with many records each, or directories of them
+    output_dir : string
+        directory for the {inchikey}.cml files
+    file_format : string
+        default: None; openbabel format of all the inputs, otherwise from each file extension
+    aromatic : bool
+        default: False; if True, aromatic bonds are kept and the aromatic patterns applied
+    n_processes : int
+        default: None; size of the process pool, number of CPUs if None, 1 types serially
+    chunksize : int
+        default: 32; number of molecules handed to a worker at a time
+    report_file : string
+        default: None; tab-separated report, {output_dir}/atom_type_report.tsv if None
+
+    Returns
+    -------
+    results : list
+        one report row (dictionary) per record, in input order
+    summary : dictionary
+        number of molecules, failures, seconds and molecules per second
+    """
+    from aip_atom_types.assign_aip_atom_types import compiled_fg_patterns
+    if report_file is None:
+        report_file = os.path.join(output_dir, "atom_type_report.tsv")
+    os.makedirs(output_dir, exist_ok=True)
+    records = enumerate(read_records(find_structure_files(inputs), file_format))
+    compiled_fg_patterns()
+
+    start = time.perf_counter()
+    rows = []
+    if n_processes == 1:
+        for chunk in _chunks(records, chunksize):
+            rows += type_records(chunk, output_dir, aromatic)
+    else:
+        # bounded number of chunks in flight, so that the library is read lazily
+        max_pending = 2 * (n_processes if n_processes is not None else os.cpu_count())
+        chunks = _chunks(records, chunksize)
+        while True:
+            suspects = _type_pool(chunks, n_processes, max_pending, output_dir, aromatic, rows)
+            if not suspects:
+                break
+            for indexed_record in [r for chunk in suspects for r in chunk]:
+                # on its own, a record that breaks the pool is the one that killed its worker
+                if _type_pool(iter([[indexed_record]]), 1, 1, output_dir, aromatic, rows):
+                    index, (source, record, molecule_cml) = indexed_record
+                    LOGGER.warning("\n Worker process died typing record {} of {}".format(record, source))
+                    rows.append((index, _failed_row(source, record, "BrokenProcessPool: worker process died")))
+    seconds = time.perf_counter() - start
+    results = [row for index, row in sorted(rows, key=lambda indexed_row: indexed_row[0])]
+
+    write_report(results, report_file)
+    summary = summarise(results, seconds)
+    LOGGER.info("\n Typed {} of {} molecules in {:.1f} s, {:.1f} molecules/s, report written to {}".format(
+        summary["molecules"] - summary["failed"], summary["molecules"], seconds,
+        summary["molecules_per_second"], report_file))
+    if summary["failed"] > 0:
+        LOGGER.warning("\n {} molecules failed, see {}".format(summary["failed"], report_file))
+    return results, summary
+
+
+def _type_pool(chunks, n_processes, max_pending, output_dir, aromatic, rows):
+    """Types the chunks over a new process pool with at most max_pending of them in flight,
+       adding (index, report row) to rows. Returns the chunks that were in flight when a worker
+       died and broke the pool, otherwise an empty list."""
+    pending = {}
+    chunk = None
+    with ProcessPoolExecutor(n_processes, initializer=_init_worker) as pool:
+        try:
+            for chunk in chunks:
+                if len(pending) >= max_pending:
+                    _collect(pending, wait(pending, return_when=FIRST_COMPLETED).done, rows)
+                pending[pool.submit(type_records, chunk, output_dir, aromatic)] = chunk
+                chunk = None
+            _collect(pending, list(pending), rows)
+        except BrokenProcessPool:
+            LOGGER.warning("\n A worker process died, retrying the records in flight one at a time")
+            # a chunk taken from chunks but not yet submitted is retried as well
+            return list(pending.values()) + ([chunk] if chunk is not None else [])
+    return []
+
+
+def _collect(pending, done, rows):
+    """Adds (index, report row) of the finished chunks to rows and removes them from pending.
+       BrokenProcessPool is raised with the chunk still pending."""
+    for future in done:
+        chunk = pending[future]
+        try:
+            rows += future.result()
+        except BrokenProcessPool:
+            raise
+        except Exception as err:
+            rows += [(index, _failed_row(source, record, "{}: {}".format(type(err).__name__, err)))
+                     for index, (source, record, molecule_cml) in chunk]
+        del pending[future]
+
+
+def _failed_row(source, record, error):
+    return {"source": source, "record": record, "inchikey": "", "status": "failed",
+            "seconds": "", "output": "", "error": error}
+
+
+def summarise(results, seconds):
+    """Molecule and failure counts with the throughput of a batch"""
+    failed = len([r for r in results if r["status"] != "ok"])
+    return {"molecules": len(results), "failed": failed, "seconds": round(seconds, 3),
+            "molecules_per_second": len(results) / seconds if seconds > 0 else 0.0}
+
+
+def write_report(results, report_file):
+    """Writes the report as a tab-separated file"""
+    with open(report_file, "w", newline="") as open_file:
+        writer = csv.DictWriter(open_file, fieldnames=REPORT_FIELDS, delimiter="\t")
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def create_parser():
+    help_text = 'Batch assignment of AIP atom types to the molecules of structure files or \
+                 directories. Each molecule is written out as namespaced {inchikey}.cml with \
+                 sybyl and aipAtomType attributes, and failures are collected into a report.'
+
+    parser = argparse.ArgumentParser(description=help_text)
+
+    parser.add_argument(
+        '--inputs',
+        '-i',
+        dest='inputs',
+        type=str,
+        nargs='+',
+        required=True,
+        action='store',
+        help='structure files (cml, mol2, sdf or mol, possibly with many records) or directories of them'
+    )
+    parser.add_argument(
+        '--output_dir',
+        '-o',
+        dest='output_dir',
+        type=str,
+        default=".",
+        action='store',
+        help='directory for the cml files and the report'
+    )
+    parser.add_argument(
+        '--format',
+        '-f',
+        dest='file_format',
+        type=str,
+        default=None,
+        action='store',
+        help='openbabel format of all the inputs, default from each file extension'
+    )
+    parser.add_argument(
+        '--aromatic',
+        '-a',
+        dest='aromatic',
+        default=False,
+        action='store_true',
+        help='if present, aromatic bonds are kept and the aromatic atom types assigned'
+    )
+    parser.add_argument(
+        '--processes',
+        '-np',
+        dest='processes',
+        type=int,
+        default=None,
+        action='store',
+        help='number of worker processes, default number of CPUs'
+    )
+    parser.add_argument(
+        '--chunksize',
+        '-c',
+        dest='chunksize',
+        type=int,
+        default=32,
+        action='store',
+        help='number of molecules handed to a worker at a time'
+    )
+    parser.add_argument(
+        '--report',
+        '-r',
+        dest='report',
+        type=str,
+        default=None,
+        action='store',
+        help='report file, default {output_dir}/atom_type_report.tsv'
+    )
+    return parser
+
+
+def main():
+    """Main function. Exits with a non-zero status if any molecule failed."""
+    args = create_parser().parse_args()
+    results, summary = batch_assign_aip_atom_types(
+        args.inputs, args.output_dir, file_format=args.file_format, aromatic=args.aromatic,
+        n_processes=args.processes, chunksize=args.chunksize, report_file=args.report)
+    if summary["failed"] > 0:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,7 @@ LOGGER.setLevel(logging.WARN)
 class KMC_footprint():
     # MEPS gets read and processed, surface quantified and divided
     def __init__(self, mol, centre_surface_percentile=90, lp_excl_r=1.5, dualAIP=False,
-                 path="/home/kate/workspace/newssip/dataset"):
+                 path="/home/kate/workspace/newssip/dataset", cache=False, n_workers=1, area_method="hull"):
         """Class for handling footprinting to find AIPs in a .ipy format. Parallel to aip_footprinting_script,
            but it handles molecule names, changed by ccd (dictionary) and reverts to default path to look for 
            the files for ease of handling."""
@@ -39,7 +39,7 @@ class KMC_footprint():
         cml_file = "{}/cml/{}.cml".format(path, inchikey)
 
         try:
-            self.MEPS_np = MEPS(cube_np_file, cml_file)
+            self.MEPS_np = MEPS(cube_np_file, cml_file, cache=cache, area_method=area_method)
             self.Atom = AtomSet()
             self.Atom._create_from_MEPS(self.MEPS_np)
         except (Exception, FileNotFoundError, OSError):
@@ -47,14 +47,14 @@ class KMC_footprint():
                           directory for missing files".format(inchikey))
             exit()
         try:
-            self.MEPS_m = MEPS(cube_m_file, cml_file)
+            self.MEPS_m = MEPS(cube_m_file, cml_file, cache=cache, area_method=area_method)
             if not all(self.MEPS_np.Atoms_df == self.MEPS_m.Atoms_df):
                 LOGGER.info(
                     "\n The middle cube file contains different atom coordinates and this will cause errors")
         except (Exception, FileNotFoundError, OSError):
             self.MEPS_m = 0
         try:
-            self.MEPS_p = MEPS(cube_p_file, cml_file, own_dist_scaled=False)
+            self.MEPS_p = MEPS(cube_p_file, cml_file, own_dist_scaled=False, cache=cache, area_method=area_method)
             if not all(self.MEPS_np.Atoms_df == self.MEPS_p.Atoms_df):
                 LOGGER.info(
                     "\n The polar cube file contains different atom coordinates and this will cause errors")
@@ -62,7 +62,8 @@ class KMC_footprint():
             self.MEPS_p = 0
 
         self.AIP = Footprinting(self.MEPS_np, self.MEPS_p,
-                                self.MEPS_m, self.Atom, centre_surface_percentile, lp_excl_r, dualAIP)
+                                self.MEPS_m, self.Atom, centre_surface_percentile, lp_excl_r, dualAIP,
+                                n_workers=n_workers)
 
         self.Surface = Surface(self.MEPS_np, self.AIP, self.Atom)
 
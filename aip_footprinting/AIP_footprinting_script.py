@@ -14,18 +14,57 @@ logging.basicConfig()
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.WARNING)
 
+# attributes read from the cube files only when first used after a result cache hit
+LAZY_ATTRIBUTES = ["MEPS_np", "MEPS_p", "MEPS_m", "Atom"]
+
 
 class KMC_footprint_script():
 
     # MEPS gets read and processed, surface quantified and divided
-    def __init__(self, cml_file, cube_p_file, cube_m_file, cube_np_file, centre_surface_percentile=90, lp_excl_r=1.5, dualAIP=False):
+    def __init__(self, cml_file, cube_p_file, cube_m_file, cube_np_file, centre_surface_percentile=90, lp_excl_r=1.5, dualAIP=False, cache=False, n_workers=1, area_method="hull",
+                 result_cache=None):
         """Class for handling footprinting to find AIPs from command line. Parallel to aip_footprinting_ipy,
            but it handles exact file paths as supplied by parser. It has a write_xml function for writing of
-           the XML file in the schema similar to the original SSIP code."""
+           the XML file in the schema similar to the original SSIP code.
+           With a result_cache (ResultCache instance) the AIPs and Surface of a run with the same
+           inputs and parameters are taken from the cache. The MEPS_np, MEPS_p, MEPS_m and Atom
+           attributes are then only read from the cube files when first accessed."""
         self.dualAIP = dualAIP
-        self.MEPS_np = MEPS(cube_np_file, cml_file)
+        self._cml_file = cml_file
+        self._lazy_MEPS = None
+        if result_cache is not None:
+            key = result_cache.get_key(cml_file, [cube_p_file, cube_m_file, cube_np_file],
+                                       centre_surface_percentile, lp_excl_r, dualAIP, False, area_method)
+            cached = result_cache.get(*key)
+            if cached is not None:
+                self.AIP, self.Surface = cached
+                self._lazy_MEPS = (cml_file, cube_p_file, cube_m_file, cube_np_file, cache, area_method)
+                return
+        self._read_MEPS(cml_file, cube_p_file, cube_m_file, cube_np_file, cache, area_method)
+        self.AIP = Footprinting(self.MEPS_np, self.MEPS_p,
+                                self.MEPS_m, self.Atom, centre_surface_percentile, lp_excl_r, dualAIP,
+                                n_workers=n_workers)
+        self.Surface = Surface(self.MEPS_np, self.AIP, self.Atom)
+        if result_cache is not None:
+            result_cache.put(*key, self.AIP, self.Surface)
+
+    def __getattr__(self, name):
+        """Reads the MEPS of a run taken from the result cache when one of them is first used"""
+        lazy_MEPS = self.__dict__.get("_lazy_MEPS")
+        if name in LAZY_ATTRIBUTES and lazy_MEPS is not None:
+            self._lazy_MEPS = None
+            try:
+                self._read_MEPS(*lazy_MEPS)
+            except Exception:
+                self._lazy_MEPS = lazy_MEPS
+                raise
+            return getattr(self, name)
+        raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+
+    def _read_MEPS(self, cml_file, cube_p_file, cube_m_file, cube_np_file, cache, area_method):
+        self.MEPS_np = MEPS(cube_np_file, cml_file, cache=cache, area_method=area_method)
         try:
-            self.MEPS_p = MEPS(cube_p_file, cml_file, own_dist_scaled=False)
+            self.MEPS_p = MEPS(cube_p_file, cml_file, own_dist_scaled=False, cache=cache, area_method=area_method)
             if not all(self.MEPS_np.Atoms_df == self.MEPS_p.Atoms_df):
                 LOGGER.warn(
                     "\n The cube files contain different atom coordinates and this will cause errors")
@@ -34,7 +73,7 @@ class KMC_footprint_script():
             LOGGER.warn(
                 "\n Could not localise the 0.0300 cube file, proceeding without this class object")
         try:
-            self.MEPS_m = MEPS(cube_m_file, cml_file)
+            self.MEPS_m = MEPS(cube_m_file, cml_file, cache=cache, area_method=area_method)
             if not all(self.MEPS_np.Atoms_df == self.MEPS_p.Atoms_df):
                 LOGGER.warn(
                     "\n The cube files contain different atom coordinates and this will cause errors")
@@ -45,12 +84,9 @@ class KMC_footprint_script():
 
         self.Atom = AtomSet()
         self.Atom._create_from_MEPS(self.MEPS_np)
-        self.AIP = Footprinting(self.MEPS_np, self.MEPS_p,
-                                self.MEPS_m, self.Atom, centre_surface_percentile, lp_excl_r, dualAIP)
-        self.Surface = Surface(self.MEPS_np, self.AIP, self.Atom)
 
     def write_xml(self, filename):
-        writer = AIPWriter(self.MEPS_np._cml_file)
+        writer = AIPWriter(self._cml_file)
         if self.dualAIP:
             dualAIPbool = [a.dual for a in self.AIP.AIP]
             writer.write_file(self.Surface, self.AIP.AIP, filename, dual=dualAIPbool)
@@ -107,25 +107,129 @@ def create_parser():
         action='store_true',
         help='radius of lone pair on the outer 0.0020 MEPS, exluding this area from pi system consideration'
     )
+    parser.add_argument(
+        '--cache',
+        dest='cache',
+        default=False,
+        action='store_true',
+        help='if present, parsed cube files are cached in binary .meps files next to them and reused on later runs'
+    )
+    parser.add_argument(
+        '--area_method',
+        '-am',
+        dest='area_method',
+        type=str,
+        default="hull",
+        choices=["hull", "density"],
+        action='store',
+        help='surface area measure: "hull" (ConvexHull of the MEPS) or "density" (per-point areas from local point density)'
+    )
+    parser.add_argument(
+        '--n_workers',
+        '-nw',
+        dest='n_workers',
+        type=int,
+        default=1,
+        action='store',
+        help='number of atoms footprinted concurrently'
+    )
+    parser.add_argument(
+        '--result_cache',
+        '-rc',
+        dest='result_cache',
+        type=str,
+        default=None,
+        action='store',
+        help='if present, directory of the result cache: a run with the same input files, parameters and fits is read from it'
+    )
+    parser.add_argument(
+        '--result_cache_size',
+        '-rcs',
+        dest='result_cache_size',
+        type=float,
+        default=512,
+        action='store',
+        help='size limit of the result cache in MB, least recently used results are removed beyond it'
+    )
+    parser.add_argument(
+        '--sweep_csp',
+        '-scsp',
+        dest='sweep_csp',
+        type=float,
+        nargs='+',
+        default=None,
+        action='store',
+        help='if present, runs a parameter sweep over these centre_surface_percentile values, reading the cube files once'
+    )
+    parser.add_argument(
+        '--sweep_lpr',
+        '-slpr',
+        dest='sweep_lpr',
+        type=float,
+        nargs='+',
+        default=None,
+        action='store',
+        help='if present, runs a parameter sweep over these lp_excl_r values, reading the cube files once'
+    )
+    parser.add_argument(
+        '--sweep_table',
+        '-st',
+        dest='sweep_table',
+        type=str,
+        default="footprint_sweep.tsv",
+        action='store',
+        help='tab-separated table of the AIPs found at every point of the parameter sweep'
+    )
     parser.set_defaults(func=footprint)
     return parser
 
 
 def footprint(args):
     """Actually runs foot-printing."""
+    if args.sweep_csp is not None or args.sweep_lpr is not None:
+        return sweep(args)
+    result_cache = None
+    if args.result_cache is not None:
+        from aip_footprinting.result_cache import ResultCache
+        result_cache = ResultCache(args.result_cache, int(args.result_cache_size * 1024**2))
     if args.dnn:
         linear_fit_aip.use_dnn = True
         from aip_footprinting.DNN_footprinting_script import DNN_footprint_script
-        k = DNN_footprint_script(args.cml, args.cube_nonpolar, args.centre_surface_percentile, args.lp_excl_r, args.dualAIP)
+        k = DNN_footprint_script(args.cml, args.cube_nonpolar, args.centre_surface_percentile, args.lp_excl_r, args.dualAIP,
+                                 cache=args.cache, n_workers=args.n_workers, area_method=args.area_method,
+                                 result_cache=result_cache)
         k.write_xml(args.write)
 
     else:
         linear_fit_aip.use_dnn = False
         from aip_footprinting.AIP_footprinting_script import KMC_footprint_script
         k = KMC_footprint_script(args.cml, args.cube_polar, args.cube_middle,
-                             args.cube_nonpolar, args.centre_surface_percentile, args.lp_excl_r, args.dualAIP)
+                             args.cube_nonpolar, args.centre_surface_percentile, args.lp_excl_r, args.dualAIP,
+                             cache=args.cache, n_workers=args.n_workers, area_method=args.area_method,
+                             result_cache=result_cache)
         if args.write !=False:
             k.write_xml(args.write)
+
+
+def sweep(args):
+    """Runs foot-printing for every combination of the swept parameters and writes the AIP table."""
+    linear_fit_aip.use_dnn = args.dnn
+    from aip_footprinting.parameter_sweep import FootprintSweep
+    if args.dnn:
+        s = FootprintSweep.from_dnn_file(args.cml, args.cube_nonpolar, args.dualAIP, cache=args.cache,
+                                         n_workers=args.n_workers, area_method=args.area_method)
+    else:
+        s = FootprintSweep.from_files(args.cml, args.cube_polar, args.cube_middle, args.cube_nonpolar,
+                                      args.dualAIP, cache=args.cache, n_workers=args.n_workers,
+                                      area_method=args.area_method)
+    csps = args.sweep_csp if args.sweep_csp is not None else [args.centre_surface_percentile]
+    lp_excl_rs = args.sweep_lpr if args.sweep_lpr is not None else [args.lp_excl_r]
+    table = s.run(csps, lp_excl_rs)
+    table.to_csv(args.sweep_table, sep="\t", index=False)
+    LOGGER.info("\n {} AIPs over {} parameter sets written to {}".format(
+        len(table), len(csps) * len(lp_excl_rs), args.sweep_table))
+
+
 def main():
     """Main function. Returns logger outputs if encounters failures."""
 
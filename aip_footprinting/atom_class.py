@@ -2,9 +2,9 @@
 Parses information from Atom_df and AIP into arrays.
 @author: Katarzyna Joanna Zator (kz265)
 """
-import mendeleev
 import numpy as np
 import pandas as pd
+from filereader.element_table import covalent_radius, vdw_radius
 
 
 class AtomSet():
@@ -97,7 +97,5 @@ class Atom():
         self.xyz = np.array(list(atom_row[2:5]))
         self.atom_type = atom_row[5]
         self.atom_name = atom_row[6]
-        self.covalent_radius = (mendeleev.element(
-            self.atomic_number).covalent_radius)/100
-        self.vdW_radius = (mendeleev.element(
-            self.atomic_number).vdw_radius)/100
+        self.covalent_radius = covalent_radius(self.atomic_number)/100
+        self.vdW_radius = vdw_radius(self.atomic_number)/100
@@ -1,6 +1,5 @@
 import logging
 import numpy as np
-from mendeleev import element
 from filereader.cml_reader import CmlReader, Atom
 
 CML_NS = "http://www.xml-cml.org/schema"
@@ -0,0 +1,297 @@
+"""
+Batch foot-printing of many molecules from a dataset directory laid out by InChIKey:
+{path}/0.0020/{inchikey}_0.0020_merged.cube, {path}/0.0104/..., {path}/0.0300/... and
+{path}/cml/{inchikey}.cml. Molecules are distributed over a process pool, and failures are
+collected into a summary report rather than ending the run. A worker that is killed (e.g. by the
+OOM killer) breaks the pool; the pool is then recreated, the molecules that were in flight are
+rerun one at a time to find the one that killed its worker, and only that molecule fails.
+
+Run with: python -m aip_footprinting.batch_footprinting -p dataset -o aip_dir -k "*"
+@author: Katarzyna Joanna Zator (kz265)
+"""
+
+import argparse
+import csv
+import glob
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
+
+REPORT_FIELDS = ["inchikey", "status", "seconds", "output", "error"]
+
+
+def find_inchikeys(path, patterns=("*",)):
+    """InChIKeys in the dataset that have a .cml file and match any of the glob patterns"""
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    inchikeys = set()
+    for pattern in patterns:
+        for cml_file in glob.glob(os.path.join(path, "cml", "{}.cml".format(pattern))):
+            inchikeys.add(os.path.basename(cml_file)[:-len(".cml")])
+    return sorted(inchikeys)
+
+
+def footprint_inchikey(inchikey, path, output_dir, centre_surface_percentile=90, lp_excl_r=1.5,
+                       dualAIP=False, cache=False, area_method="hull"):
+    """Footprints a single molecule of the dataset and writes {output_dir}/{inchikey}_aip.xml.
+       Never raises: the outcome is returned as a row of the summary report."""
+    start = time.perf_counter()
+    output = os.path.join(output_dir, "{}_aip.xml".format(inchikey))
+    try:
+        import aip_footprinting.linear_fit_aip as linear_fit_aip
+        linear_fit_aip.use_dnn = False
+        from aip_footprinting.AIP_footprinting_byIn import KMC_footprint_byIn
+        k = KMC_footprint_byIn(inchikey, centre_surface_percentile, lp_excl_r, dualAIP,
+                               path=path, cache=cache, area_method=area_method)
+        k.write_xml(output)
+        status, error = "ok", ""
+    except (Exception, SystemExit) as err:
+        status, output = "failed", ""
+        error = "{}: {}".format(type(err).__name__, err).replace("\n", " ")
+    return {"inchikey": inchikey, "status": status,
+            "seconds": round(time.perf_counter() - start, 3), "output": output, "error": error}
+
+
+def batch_footprint(path, inchikeys=None, patterns=("*",), output_dir=None, n_processes=None,
+                    centre_surface_percentile=90, lp_excl_r=1.5, dualAIP=False, cache=False,
+                    report_file=None, area_method="hull"):
+    """Footprints a set of molecules of the dataset over a process pool.
+
+    Parameters
+    ----------
+    path : string
+        dataset root containing the 0.0020, 0.0104, 0.0300 and cml directories
+    inchikeys : list
+        default: None; InChIKeys to footprint, otherwise found from patterns
+    patterns : list
+        default: ("*",); glob patterns of InChIKeys with a .cml file in {path}/cml
+    output_dir : string
+        default: None; directory for the aip.xml files, {path}/aip if None
+    n_processes : int
+        default: None; size of the process pool, number of CPUs if None
+    report_file : string
+        default: None; tab-separated summary report, {output_dir}/footprint_report.tsv if None
+    area_method : string
+        default: "hull"; surface area measure of the MEPS, see read_MEPS.MEPS
+
+    Returns
+    -------
+    results : list
+        one report row (dictionary) per InChIKey, in input order
+    """
+    if inchikeys is None:
+        inchikeys = find_inchikeys(path, patterns)
+    if output_dir is None:
+        output_dir = os.path.join(path, "aip")
+    if report_file is None:
+        report_file = os.path.join(output_dir, "footprint_report.tsv")
+    os.makedirs(output_dir, exist_ok=True)
+
+    options = (path, output_dir, centre_surface_percentile, lp_excl_r, dualAIP, cache, area_method)
+    n_workers = n_processes if n_processes is not None else os.cpu_count()
+    results = {}
+    queue = list(inchikeys)
+    while queue:
+        suspects = _run_pool(queue, n_workers, options, results, len(inchikeys))
+        for inchikey in suspects:
+            # on its own, a molecule that breaks the pool is the one that killed its worker
+            if _run_pool([inchikey], 1, options, results, len(inchikeys)):
+                results[inchikey] = {"inchikey": inchikey, "status": "failed", "seconds": "",
+                                     "output": "", "error": "BrokenProcessPool: worker process died"}
+                LOGGER.warning("\n Worker process died footprinting {}".format(inchikey))
+        queue = [inchikey for inchikey in queue if inchikey not in results]
+    results = [results[inchikey] for inchikey in inchikeys]
+
+    write_report(results, report_file)
+    failed = [r["inchikey"] for r in results if r["status"] != "ok"]
+    LOGGER.info("\n Footprinted {} of {} molecules, report written to {}".format(
+        len(results) - len(failed), len(results), report_file))
+    if len(failed) > 0:
+        LOGGER.warning("\n Failed: {}".format(" ".join(failed)))
+    return results
+
+
+def _run_pool(inchikeys, n_workers, options, results, n_total):
+    """Footprints the molecules over a new process pool with at most n_workers of them in
+       flight, adding their report rows to results. Returns the InChIKeys that were in flight
+       when a worker died and broke the pool, otherwise an empty list."""
+    todo = iter(inchikeys)
+    pending = {}
+    with ProcessPoolExecutor(n_workers) as pool:
+        try:
+            while True:
+                for inchikey in todo:
+                    pending[pool.submit(footprint_inchikey, inchikey, *options)] = inchikey
+                    if len(pending) >= n_workers:
+                        break
+                if not pending:
+                    return []
+                for future in wait(pending, return_when=FIRST_COMPLETED).done:
+                    inchikey = pending[future]
+                    try:
+                        results[inchikey] = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as err:
+                        results[inchikey] = {"inchikey": inchikey, "status": "failed", "seconds": "",
+                                             "output": "", "error": "{}: {}".format(type(err).__name__, err)}
+                    del pending[future]
+                    LOGGER.info("{} {} ({}/{})".format(inchikey, results[inchikey]["status"],
+                                                       len(results), n_total))
+        except BrokenProcessPool:
+            LOGGER.warning("\n A worker process died, retrying the {} molecules in flight".format(len(pending)))
+            return list(pending.values())
+
+
+def write_report(results, report_file):
+    """Writes the summary report as a tab-separated file"""
+    with open(report_file, "w", newline="") as open_file:
+        writer = csv.DictWriter(open_file, fieldnames=REPORT_FIELDS, delimiter="\t")
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def create_parser():
+    help_text = 'Batch foot-printing of molecules in a dataset directory organised by InChIKey, \
+                 with 0.0020, 0.0104, 0.0300 and cml subdirectories. Each molecule is written \
+                 out as {inchikey}_aip.xml and failures are collected into a summary report.'
+    sign_off = 'Author: Katarzyna Joanna Zator <kz265>'
+
+    parser = argparse.ArgumentParser(description=help_text, epilog=sign_off)
+
+    parser.add_argument(
+        '--path',
+        '-p',
+        dest='path',
+        type=str,
+        default=".",
+        action='store',
+        help='dataset root directory'
+    )
+    parser.add_argument(
+        '--inchikeys',
+        '-k',
+        dest='inchikeys',
+        type=str,
+        nargs='+',
+        default=["*"],
+        action='store',
+        help='InChIKeys or glob patterns of InChIKeys to footprint'
+    )
+    parser.add_argument(
+        '--inchikey_file',
+        '-f',
+        dest='inchikey_file',
+        type=str,
+        default=None,
+        action='store',
+        help='file with one InChIKey per line, used instead of --inchikeys'
+    )
+    parser.add_argument(
+        '--output_dir',
+        '-o',
+        dest='output_dir',
+        type=str,
+        default=None,
+        action='store',
+        help='directory for the aip.xml files and the report, default {path}/aip'
+    )
+    parser.add_argument(
+        '--processes',
+        '-np',
+        dest='processes',
+        type=int,
+        default=None,
+        action='store',
+        help='number of worker processes, default number of CPUs'
+    )
+    parser.add_argument(
+        '--report',
+        '-r',
+        dest='report',
+        type=str,
+        default=None,
+        action='store',
+        help='summary report file, default {output_dir}/footprint_report.tsv'
+    )
+    parser.add_argument(
+        '--dualAIP',
+        '-dA',
+        dest='dualAIP',
+        default=False,
+        action='store_true',
+        help='if present, dualAIPs are determined for the pi-systems'
+    )
+    parser.add_argument(
+        '--centre_surface_percentile',
+        '-csp',
+        dest='centre_surface_percentile',
+        type=float,
+        default=90,
+        action='store',
+        help='percentile of surface MEP density below which points are excluded for the identification as AIPs'
+    )
+    parser.add_argument(
+        '--lp_excl_r',
+        '-lpr',
+        dest='lp_excl_r',
+        type=float,
+        default=1.5,
+        action='store',
+        help='radius of lone pair on the outer 0.0020 MEPS, exluding this area from pi system consideration'
+    )
+    parser.add_argument(
+        '--cache',
+        dest='cache',
+        default=False,
+        action='store_true',
+        help='if present, parsed cube files are cached in binary .meps files next to them and reused on later runs'
+    )
+    parser.add_argument(
+        '--area_method',
+        '-am',
+        dest='area_method',
+        type=str,
+        default="hull",
+        choices=["hull", "density"],
+        action='store',
+        help='surface area measure: "hull" (ConvexHull of the MEPS) or "density" (per-point areas from local point density)'
+    )
+    parser.set_defaults(func=batch)
+    return parser
+
+
+def batch(args):
+    """Runs batch foot-printing, returns the InChIKeys that failed"""
+    if args.inchikey_file is not None:
+        with open(args.inchikey_file, "r") as open_file:
+            inchikeys = [line.strip() for line in open_file if line.strip() != ""]
+    else:
+        inchikeys = find_inchikeys(args.path, args.inchikeys)
+    results = batch_footprint(args.path, inchikeys, output_dir=args.output_dir,
+                              n_processes=args.processes,
+                              centre_surface_percentile=args.centre_surface_percentile,
+                              lp_excl_r=args.lp_excl_r, dualAIP=args.dualAIP, cache=args.cache,
+                              report_file=args.report, area_method=args.area_method)
+    return [r["inchikey"] for r in results if r["status"] != "ok"]
+
+
+def main():
+    """Main function. Exits with a non-zero status if any molecule failed."""
+    parser = create_parser()
+    args = parser.parse_args()
+    LOGGER.info("parsed args:")
+    LOGGER.info(args)
+    failed = args.func(args)
+    if len(failed) > 0:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Binary sidecar cache for parsed MEPS. Stores the atom block and MEPS points (in Angstrom), the
+vdW volume and the MEPS ownership so that repeated runs on the same cube skip text parsing.
+The arrays are memory-mapped on reading.
+
+File layout: 8 byte magic, 8 byte little-endian header length, JSON header, raw arrays each
+aligned to 64 bytes at the offsets listed in the header.
+@author: Katarzyna Joanna Zator (kz265)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
+
+MAGIC = b"AIPMEPS1"
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".meps"
+ALIGNMENT = 64
+
+
+def get_cache_file(cube_file):
+    """Sidecar cache file for a cube file, placed next to it"""
+    return cube_file + CACHE_SUFFIX
+
+
+def get_source_signature(cube_file, with_hash=True):
+    """Size, modification time and (optionally) SHA-1 of the source cube file"""
+    stat = os.stat(cube_file)
+    signature = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if with_hash:
+        sha1 = hashlib.sha1()
+        with open(cube_file, "rb") as open_file:
+            for chunk in iter(lambda: open_file.read(1 << 20), b""):
+                sha1.update(chunk)
+        signature["sha1"] = sha1.hexdigest()
+    return signature
+
+
+def is_fresh(signature, cube_file):
+    """A cache is fresh when the cube has the same size and either the same modification time
+       or, if it has been touched or copied, the same content hash"""
+    stat = os.stat(cube_file)
+    if stat.st_size != signature["size"]:
+        return False
+    if stat.st_mtime_ns == signature["mtime_ns"]:
+        return True
+    return get_source_signature(cube_file)["sha1"] == signature["sha1"]
+
+
+def write_MEPS_cache(cache_file, cube_file, vdw_volume, atoms, points, MEPS_owner, own_dist_scaled):
+    """Writes the parsed cube and its ownership to cache_file. atoms holds amass, charge, x, y, z
+       and points x, y, z, charge, both with coordinates already in Angstrom. Raises OSError,
+       with no temporary file left behind, if the cache cannot be written."""
+    arrays = {"atoms": np.ascontiguousarray(atoms, dtype=np.float64),
+              "points": np.ascontiguousarray(points),
+              "MEPS_owner": np.ascontiguousarray(MEPS_owner, dtype=np.int64)}
+    header = {"version": CACHE_VERSION,
+              "source": get_source_signature(cube_file),
+              "vdw_volume": float(vdw_volume),
+              "own_dist_scaled": bool(own_dist_scaled),
+              "arrays": {}}
+
+    # offsets depend on the header length, so settle them on a fixed-width placeholder first
+    for name, array in arrays.items():
+        header["arrays"][name] = {"offset": 0, "dtype": array.dtype.str, "shape": list(array.shape)}
+    header_length = len(json.dumps(header).encode()) + 20 * len(arrays)
+    offset = _align(len(MAGIC) + 8 + header_length)
+    for name, array in arrays.items():
+        header["arrays"][name]["offset"] = offset
+        offset = _align(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode().ljust(header_length)
+
+    tmp_file = "{}.{}.tmp".format(cache_file, os.getpid())
+    try:
+        with open(tmp_file, "wb") as open_file:
+            open_file.write(MAGIC)
+            open_file.write(np.array(header_length, dtype="<u8").tobytes())
+            open_file.write(header_bytes)
+            for name, array in arrays.items():
+                open_file.seek(header["arrays"][name]["offset"])
+                open_file.write(array.tobytes())
+            open_file.truncate(offset)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        # never leave a partial file behind, e.g. on a full disk
+        if os.path.isfile(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+def read_MEPS_cache(cache_file, cube_file=None):
+    """Returns the cache header and memory-mapped arrays, or None if the cache does not exist,
+       cannot be read, or is stale with respect to cube_file"""
+    try:
+        with open(cache_file, "rb") as open_file:
+            if open_file.read(len(MAGIC)) != MAGIC:
+                return None
+            header_length = int(np.frombuffer(open_file.read(8), dtype="<u8")[0])
+            header = json.loads(open_file.read(header_length))
+    except (OSError, ValueError, IndexError):
+        return None
+    if header.get("version") != CACHE_VERSION:
+        return None
+    if cube_file is not None and not is_fresh(header["source"], cube_file):
+        LOGGER.info("\n Stale MEPS cache {}, reparsing {}".format(cache_file, cube_file))
+        return None
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        shape = tuple(spec["shape"])
+        if np.prod(shape) == 0:
+            arrays[name] = np.empty(shape, dtype=spec["dtype"])
+        else:
+            # copy-on-write so that in-place edits never reach the cache file
+            arrays[name] = np.memmap(cache_file, dtype=spec["dtype"], mode="c",
+                                     offset=spec["offset"], shape=shape)
+    return header, arrays
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
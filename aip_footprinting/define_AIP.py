@@ -10,23 +10,18 @@ import logging
 import numpy as np
 from scipy.spatial import ConvexHull
 from scipy import spatial
-from scipy.linalg import expm, norm
-from sklearn_extra.cluster import KMedoids
 from aip_footprinting.AIP_class import AIP as AIPclass
+from aip_footprinting.geometry import rotate_about_axis, axis_distances, angles, nearest_points
+from aip_footprinting.medoid_engine import MedoidEngine
 from aip_footprinting.linear_fit_aip import alpha_linear_002, alpha_linear_104, \
-    beta_linear_002, beta_linear_03
+    beta_linear_002, beta_linear_03, compiled_alpha_linear_002, compiled_alpha_linear_104, \
+    compiled_beta_linear_002, compiled_beta_linear_03
 
 logging.basicConfig()
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.WARN)
 
 
-def rotation_matrix(axis, theta):
-    """Return the rotation matrix associated with counterclockwise rotation about
-    the given axis by theta radians."""
-    return expm(np.cross(np.eye(3), axis/norm(axis)*theta))
-
-
 def excise_lone_pairs(aips, lp_size, MEPS_df_sub):
     """Excise area taken up by lone pairs in the given MEPS so that pi system can be added (at right angles)"""
     first_AIP_xyz = aips[-1].xyz
@@ -126,6 +121,65 @@ def get_AIP_value(atom, AIP_mepsvalue, polar=False, sigma=False, dual=False):
     return round(AIP_value, 2)
 
 
+def get_AIP_values(atom_types, mep_values, mode="non-polar"):
+    """Vectorised get_AIP_value: AIP values for arrays of aipAtomTypes and MEP values, e.g. for
+       every point of a surface, evaluated with the compiled linear fit tables and the same
+       fallbacks and clamping as get_AIP_value.
+
+    Parameters
+    ----------
+    atom_types : array-like
+        aipAtomType of each point
+    mep_values : array-like
+        MEP value of each point, broadcast against atom_types
+    mode : string
+        default: "non-polar"; "non-polar", "dual", "polar", "outer-polar" or "sigma",
+        corresponding to the polar, dual and sigma arguments of get_AIP_value
+
+    Returns
+    -------
+    values : ndarray
+        AIP values rounded to 2 decimal places (as floats, clamped values are 0.0)
+    """
+    if mode not in ["non-polar", "dual", "polar", "outer-polar", "sigma"]:
+        raise ValueError("mode {} is not recognised".format(mode))
+    atom_types, mep_values = np.broadcast_arrays(np.asarray(atom_types, dtype=str),
+                                                 np.asarray(mep_values, dtype=np.float64))
+    values = np.zeros(mep_values.shape)
+
+    def evaluate(mask, table, default, prefixes=(), sign=1, clamp=None):
+        c0, c1 = table.get_coefficients(atom_types[mask], default, prefixes)
+        value = sign * (c0 + c1 * mep_values[mask])
+        if clamp == "positive":
+            value = np.where(value < 0, 0, value)
+        elif clamp == "negative":
+            value = np.where(value > 0, 0, value)
+        values[mask] = value
+
+    if mode == "sigma":
+        evaluate(np.ones(values.shape, dtype=bool), compiled_alpha_linear_104, "H.soft",
+                 clamp="positive")
+        return np.round(values, 2)
+
+    hydrogen = np.char.startswith(atom_types, "H")
+    evaluate(hydrogen, compiled_alpha_linear_104, "H.soft", clamp="positive")
+    if mode in ["non-polar", "dual"]:
+        evaluate(~hydrogen & (mep_values > 0), compiled_alpha_linear_002,
+                 "dual" if mode == "dual" else "H.soft")
+        evaluate(~hydrogen & (mep_values < 0), compiled_beta_linear_002, "C.ar", sign=-1)
+        # a MEP value of exactly zero falls through to the polar fit, as in get_AIP_value
+        evaluate(~hydrogen & ~(mep_values > 0) & ~(mep_values < 0), compiled_beta_linear_03,
+                 "O.2.other", sign=-1, clamp="negative")
+    elif mode == "polar":
+        evaluate(~hydrogen & (mep_values < 0), compiled_beta_linear_03, "O.2.other",
+                 prefixes=[("N.3", "N.3.primary"), ("O.3", "O.3.any")], sign=-1, clamp="negative")
+        evaluate(~hydrogen & ~(mep_values < 0), compiled_beta_linear_03, "O.2.other", sign=-1,
+                 clamp="negative")
+    else:
+        evaluate(~hydrogen, compiled_beta_linear_002, "C.ar", sign=-1)
+    return np.round(values, 2)
+
+
 def define_extreme_AIP(df, atom, minimum=True, polar=False, index=None):
     """Creates an AIP class instance for the interaction point defined by extreme value. It uses the dataframe,
        df, given as input to find the maximum or minimum value (as specified) on polar or non-polar surface (as
@@ -193,21 +247,20 @@ def define_extreme_geometric_AIP(df, first_AIP, atom, atom2, no_AIPs, polar=True
         no_AIPs is the total including the first_AIP"""
     O_xyz = np.array(atom.xyz)
     PS_xyz = np.array(atom2.xyz)
-    PS_O_lp_angle = np.arccos((np.dot((O_xyz - PS_xyz), (O_xyz - first_AIP.xyz).reshape(3, 1)) /
-                              (np.linalg.norm(O_xyz - PS_xyz) * np.linalg.norm(O_xyz - first_AIP.xyz)))[0])
+    PS_O_lp_angle = angles(first_AIP.xyz, O_xyz, PS_xyz)[0]
     lp_circle_r = np.linalg.norm(first_AIP.xyz - O_xyz) \
         * np.sin(np.pi - PS_O_lp_angle)
     angle = 360/no_AIPs
     AIP_object_list = []
-    for a in range(1, no_AIPs):
-        rot = rotation_matrix((O_xyz - PS_xyz), np.radians(angle*a))
-        new_lp_loc = (np.dot(rot, (first_AIP.xyz - O_xyz).T).T + O_xyz)
-        closest_MEP = df.iloc[np.argmin(spatial.distance.cdist(
-            new_lp_loc, df[["x", "y", "z"]]))].name
+    # all rotated copies of the first AIP about the atom2-atom axis and their closest MEPS points
+    new_lp_locs = rotate_about_axis(first_AIP.xyz, O_xyz, O_xyz - PS_xyz,
+                                    np.radians(angle*np.arange(1, no_AIPs))).reshape(-1, 3)
+    positions, dists_to_aip = nearest_points(df[["x", "y", "z"]].to_numpy(), new_lp_locs)
+    for position, dist_to_aip in zip(positions, dists_to_aip):
+        closest_MEP = df.index[position]
         cMEP_xyz = df.loc[closest_MEP][[
             "x", "y", "z"]].to_numpy().reshape(1, 3)
         cMEP_mepsvalue = df.loc[closest_MEP][["charge"]].to_numpy()[0]
-        dist_to_aip = np.linalg.norm(new_lp_loc - cMEP_xyz)
         if dist_to_aip < (np.pi*lp_circle_r*0.25):
             if polar == True:
                 cMEP_value = get_AIP_value(atom, cMEP_mepsvalue, polar=True)
@@ -224,8 +277,8 @@ def define_extreme_geometric_AIP(df, first_AIP, atom, atom2, no_AIPs, polar=True
 
 def define_single_cluster(df, atom, sigma=False):
     df_xyz = df[["x", "y", "z"]].to_numpy()
-    kmeans = KMedoids(n_clusters=1, random_state=0,
-                      init='k-medoids++').fit(df_xyz)
+    engine = MedoidEngine(df_xyz)
+    kmeans = engine.fit(1, 'k-medoids++')
     AIP_loc = kmeans.cluster_centers_
     AIP_index = df[(df[["x", "y", "z"]] == AIP_loc).all(1)].index[0]
     AIP_mepsvalue = df["charge"].max()
@@ -244,7 +297,7 @@ def define_hydrogen(df, atom, atom2, Htype=True):
     X = np.array(atom2.xyz)
     df_xyz = df[["x", "y", "z"]].to_numpy()
 
-    dist = [norm(np.cross(H-p, X-H))/norm(X-H) for p in df_xyz]
+    dist = axis_distances(df_xyz, H, X)
     # get index of the minimum distance
     AIP_index = df.index[np.argmin(dist)]
     AIP_loc = df.loc[AIP_index][["x", "y", "z"]].to_numpy().reshape(1, 3)
@@ -267,7 +320,7 @@ def define_geom_sigma_holes(df, atom, atom2, atom3):
     AIP_object_list = []
     for a in [atom2, atom3]:
         X = np.array(a.xyz)
-        dist = [norm(np.cross(S-p, X-S))/norm(X-S) for p in df_xyz]
+        dist = axis_distances(df_xyz, S, X)
         # get index of the minimum distance
         AIP_index = df.index[np.argmin(dist)]
         AIP_loc = df.loc[AIP_index][["x", "y", "z"]].to_numpy().reshape(1, 3)
@@ -279,37 +332,47 @@ def define_geom_sigma_holes(df, atom, atom2, atom3):
     return AIP_object_list
 
 
+def get_cluster_areas(df, labels, fallback=False):
+    """Surface areas of the two clusters labelled 0 and 1. If the MEPS carries per-point areas
+       (an "area" column, see MEPS.get_areas) they are weighted sums over the cluster points,
+       otherwise the area of each cluster's ConvexHull. With fallback, a second cluster whose
+       hull cannot be built is given the area of the first."""
+    if "area" in df.columns:
+        return tuple(np.bincount(labels, weights=df["area"].to_numpy(), minlength=2)[:2])
+    df_xyz = df[["x", "y", "z"]].to_numpy()
+    p0_area = ConvexHull(df_xyz[labels == 0]).area
+    try:
+        p1_area = ConvexHull(df_xyz[labels == 1]).area
+    except:
+        if not fallback:
+            raise
+        p1_area = p0_area
+    return p0_area, p1_area
+
+
 def define_kmedoid_AIP_value_dual(df, atom, sigma):
     """Works on pi system MEPS which is usually split into two clusters on each face of the system.
        The function uses KMedoid to find geometric centres of those clusters.
        The dualAIP value is determined by for the two extreme MEP values (if such exist)    ``for each cluster.
        Because it determines two AIPs, they are returned as a list."""
     df_xyz = df[["x", "y", "z"]].to_numpy()
-    kmeans = KMedoids(n_clusters=2, random_state=0,
-                      init='k-medoids++').fit(df_xyz)
+    engine = MedoidEngine(df_xyz)
+    kmeans = engine.fit(2, 'k-medoids++')
     locs = kmeans.cluster_centers_
 
-    p0 = df_xyz[kmeans.labels_ == 0]
-    p1 = df_xyz[kmeans.labels_ == 1]
-    p0h = ConvexHull(p0)
-    p1h = ConvexHull(p1)
+    p0_area, p1_area = get_cluster_areas(df, kmeans.labels_)
 
     # double check another initialisation won't give better separated sites
     if np.sqrt(np.sum(np.power((locs[0] - locs[1]), 2))) < (atom.vdW_radius*np.sqrt(2)) \
-            or p0h.area > 4*p1h.area or p1h.area > 4*p0h.area:
-        kmeans = KMedoids(n_clusters=2, random_state=0,
-                          init='heuristic').fit(df_xyz)
+            or p0_area > 4*p1_area or p1_area > 4*p0_area:
+        kmeans = engine.fit(2, 'heuristic')
         locs = kmeans.cluster_centers_
 
-        p0 = df_xyz[kmeans.labels_ == 0]
-        p1 = df_xyz[kmeans.labels_ == 1]
-        p0h = ConvexHull(p0)
-        p1h = ConvexHull(p1)
+        p0_area, p1_area = get_cluster_areas(df, kmeans.labels_)
         # if the clusters still have distinctly different sizes or only one distinct patch
         if np.sqrt(np.sum(np.power((locs[0] - locs[1]), 2))) < (atom.vdW_radius*np.sqrt(2)) \
-                or p0h.area > 4*p1h.area or p1h.area > 4*p0h.area:
-            kmeans = KMedoids(n_clusters=1, random_state=0,
-                              init='k-medoids++').fit(df_xyz)
+                or p0_area > 4*p1_area or p1_area > 4*p0_area:
+            kmeans = engine.fit(1, 'k-medoids++')
             locs = kmeans.cluster_centers_
             LOGGER.info("Clusters of atom ", atom.index,
                         " highly uneven; using single AIP instead")
@@ -372,50 +435,34 @@ def define_kmedoid_AIP_value_critical_point(df, atom, sigma, minimum=True, sp1=F
        The AIP value is, however, determined by the extreme MEP value for each cluster.
        Because it determines two AIPs, they are returned as a list."""
     df_xyz = df[["x", "y", "z"]].to_numpy()
-    kmeans = KMedoids(n_clusters=2, random_state=0,
-                      init='k-medoids++').fit(df_xyz)
+    engine = MedoidEngine(df_xyz)
+    kmeans = engine.fit(2, 'k-medoids++')
     locs = kmeans.cluster_centers_
 
-    p0 = df_xyz[kmeans.labels_ == 0]
-    p1 = df_xyz[kmeans.labels_ == 1]
-    p0h = ConvexHull(p0)
-    try:
-        p1h = ConvexHull(p1)
-    except:
-        p1h = p0h
+    p0_area, p1_area = get_cluster_areas(df, kmeans.labels_, fallback=True)
     # double check another initialisation won't give better separated sites
     if np.sqrt(np.sum(np.power((locs[0] - locs[1]), 2))) < (atom.vdW_radius*np.sqrt(2)) \
-            or p0h.area > 4*p1h.area or p1h.area > 4*p0h.area:
-        kmeans = KMedoids(n_clusters=2, random_state=0,
-                          init='heuristic').fit(df_xyz)
+            or p0_area > 4*p1_area or p1_area > 4*p0_area:
+        kmeans = engine.fit(2, 'heuristic')
         locs = kmeans.cluster_centers_
 
-        p0 = df_xyz[kmeans.labels_ == 0]
-        p1 = df_xyz[kmeans.labels_ == 1]
-        p0h = ConvexHull(p0)
-        p1h = ConvexHull(p1)
+        p0_area, p1_area = get_cluster_areas(df, kmeans.labels_)
         if np.sqrt(np.sum(np.power((locs[0] - locs[1]), 2))) < (atom.vdW_radius**np.sqrt(2)) \
-                or p0h.area > 4*p1h.area or p1h.area > 4*p0h.area:
-            kmeans = KMedoids(n_clusters=2, random_state=0,
-                              init='random').fit(df_xyz)
+                or p0_area > 4*p1_area or p1_area > 4*p0_area:
+            kmeans = engine.fit(2, 'random')
             locs = kmeans.cluster_centers_
 
-            p0 = df_xyz[kmeans.labels_ == 0]
-            p1 = df_xyz[kmeans.labels_ == 1]
-            p0h = ConvexHull(p0)
-            p1h = ConvexHull(p1)
+            p0_area, p1_area = get_cluster_areas(df, kmeans.labels_)
         # if the clusters still have distinctly different sizes or only one distinct patch
         if np.sqrt(np.sum(np.power((locs[0] - locs[1]), 2))) < (atom.vdW_radius*np.sqrt(2)) \
-                or p0h.area > 4*p1h.area or p1h.area > 4*p0h.area:
-            kmeans = KMedoids(n_clusters=1, random_state=0,
-                              init='k-medoids++').fit(df_xyz)
+                or p0_area > 4*p1_area or p1_area > 4*p0_area:
+            kmeans = engine.fit(1, 'k-medoids++')
             locs = kmeans.cluster_centers_
             LOGGER.info("Clusters of atom ", atom.index,
                         " highly uneven; using single AIP instead")
 
     if sp1 == True:
-        kmeans = KMedoids(n_clusters=4, random_state=0,
-                          init='heuristic').fit(df_xyz)
+        kmeans = engine.fit(4, 'heuristic')
         locs = kmeans.cluster_centers_
 
     AIP_object_list = []
@@ -455,14 +502,11 @@ def define_kmedoid_AIP_value_polar(df, atom, sigma):
        The AIP value is, however, determined by the extreme MEP value for each cluster.
        Because it determines two AIPs, they are returned as a list"""
     df_xyz = df[["x", "y", "z"]].to_numpy()
-    kmeans = KMedoids(n_clusters=2, random_state=0,
-                      init='k-medoids++').fit(df_xyz)
+    engine = MedoidEngine(df_xyz)
+    kmeans = engine.fit(2, 'k-medoids++')
     locs = kmeans.cluster_centers_
 
-    p0 = df_xyz[kmeans.labels_ == 0]
-    p1 = df_xyz[kmeans.labels_ == 1]
-    p0h = ConvexHull(p0)
-    p1h = ConvexHull(p1)
+    p0_area, p1_area = get_cluster_areas(df, kmeans.labels_)
     # double check another initialisation won't give better separated sites
     if atom.atom_type == "S.3" or atom.atom_type == "S.2.phene":
         dist_limit = (atom.vdW_radius*np.sqrt(2)/2)
@@ -470,30 +514,21 @@ def define_kmedoid_AIP_value_polar(df, atom, sigma):
         dist_limit = (atom.vdW_radius*np.sqrt(2))
 
     if np.sqrt(np.sum(np.power((locs[0] - locs[1]), 2))) < dist_limit \
-            or p0h.area > 4*p1h.area or p1h.area > 4*p0h.area:
-        kmeans = KMedoids(n_clusters=2, random_state=0,
-                          init='heuristic').fit(df_xyz)
+            or p0_area > 4*p1_area or p1_area > 4*p0_area:
+        kmeans = engine.fit(2, 'heuristic')
         locs = kmeans.cluster_centers_
 
-        p0 = df_xyz[kmeans.labels_ == 0]
-        p1 = df_xyz[kmeans.labels_ == 1]
-        p0h = ConvexHull(p0)
-        p1h = ConvexHull(p1)
+        p0_area, p1_area = get_cluster_areas(df, kmeans.labels_)
         if np.sqrt(np.sum(np.power((locs[0] - locs[1]), 2))) < dist_limit \
-                or p0h.area > 4*p1h.area or p1h.area > 4*p0h.area:
-            kmeans = KMedoids(n_clusters=2, random_state=0,
-                              init='random').fit(df_xyz)
+                or p0_area > 4*p1_area or p1_area > 4*p0_area:
+            kmeans = engine.fit(2, 'random')
             locs = kmeans.cluster_centers_
 
-            p0 = df_xyz[kmeans.labels_ == 0]
-            p1 = df_xyz[kmeans.labels_ == 1]
-            p0h = ConvexHull(p0)
-            p1h = ConvexHull(p1)
+            p0_area, p1_area = get_cluster_areas(df, kmeans.labels_)
             # if the clusters still have distinctly different sizes or only one distinct patch
             if np.sqrt(np.sum(np.power((locs[0] - locs[1]), 2))) < dist_limit \
-                    or p0h.area > 4*p1h.area or p1h.area > 4*p0h.area:
-                kmeans = KMedoids(n_clusters=1, random_state=0,
-                                  init='k-medoids++').fit(df_xyz)
+                    or p0_area > 4*p1_area or p1_area > 4*p0_area:
+                kmeans = engine.fit(1, 'k-medoids++')
                 locs = kmeans.cluster_centers_
                 LOGGER.info("Clusters of atom ", atom.index,
                             " highly uneven; using single AIP instead")
@@ -8,22 +8,27 @@ from aip_footprinting.polar_search import polar_AIP_search
 from aip_footprinting.non_polar_search import non_polar_AIP_search
 from aip_footprinting.constants import subset_r_nn, Atom_based_exclusion
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import numpy as np
 import pandas as pd
-from scipy import spatial
 from scipy.linalg import expm, norm
 
 logging.basicConfig()
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
 
+# Footprinting instance shared with forked worker processes
+_WORKER_FOOTPRINTING = None
+
 
 class Footprinting():
     """"This class footprints all the MEP surfaces of the ligand to calculate AIPs output
         as a list of AIP objects. Defines how to determine them for different atom types,
         which surface to use and which linear fit to use. """
 
-    def __init__(self, MEPS_np, MEPS_p, MEPS_m, Atom, centre_surface_percentile=80, lp_excl_r=1.74, dualAIP=False):
+    def __init__(self, MEPS_np, MEPS_p, MEPS_m, Atom, centre_surface_percentile=80, lp_excl_r=1.74, dualAIP=False,
+                 n_workers=1, executor="thread"):
         """
         Parameters
         ----------
@@ -42,6 +47,13 @@ class Footprinting():
 
         dualAIP: bool
             default False, determines if the algorithm uses the cluster centre MEPS value, or the extreme one
+
+        n_workers : int
+            default 1, number of atoms footprinted concurrently; 1 runs the atoms serially
+
+        executor : string
+            default "thread", "thread" or "process" pool used when n_workers > 1; the process pool
+            needs the fork start method, as the MEPS are shared with the workers rather than pickled
         """
         self.csp = centre_surface_percentile
         self.lp_excl_r = lp_excl_r
@@ -60,32 +72,71 @@ class Footprinting():
 
         # A loop running over all atoms of the ligand, adding AIPs for polar, hydrogens,
         # and non-polar areas from relevant MEPS
-        for atom in range(self.MEPS.no_atoms):
-            atomclass = self._Atom.Atom[atom]
-            min_area = Atom_based_exclusion[atomclass.atom_type]
-            self.FootprintByAtom(atomclass, min_area)
+        if n_workers > 1 and self.MEPS.no_atoms > 1:
+            self._footprint_parallel(n_workers, executor)
+        else:
+            for atom in range(self.MEPS.no_atoms):
+                atomclass = self._Atom.Atom[atom]
+                min_area = Atom_based_exclusion[atomclass.atom_type]
+                self.FootprintByAtom(atomclass, min_area)
+
+    def _footprint_parallel(self, n_workers, executor):
+        """Footprints the atoms concurrently, each into its own AIP buffer, and merges the buffers
+           in atom order so that the result is the same as for the serial loop"""
+        # shared lazily-computed state is filled in before the workers start
+        for MEPS in [self.MEPS, self.MEPS_p, self.MEPS_m]:
+            if MEPS != 0:
+                MEPS.get_local_density(subset_r_nn)
+
+        atoms = range(self.MEPS.no_atoms)
+        if executor == "process" and "fork" in multiprocessing.get_all_start_methods():
+            global _WORKER_FOOTPRINTING
+            _WORKER_FOOTPRINTING = self
+            try:
+                with ProcessPoolExecutor(n_workers, mp_context=multiprocessing.get_context("fork")) as pool:
+                    results = list(pool.map(_footprint_atom_in_worker, atoms))
+            finally:
+                _WORKER_FOOTPRINTING = None
+        else:
+            if executor != "thread":
+                LOGGER.warning("\n Process pool needs the fork start method, using threads instead")
+            with ThreadPoolExecutor(n_workers) as pool:
+                results = list(pool.map(self._footprint_atom_index, atoms))
+
+        for result in results:
+            self._merge_atom_result(*result)
+
+    def _footprint_atom_index(self, atom):
+        atomclass = self._Atom.Atom[atom]
+        return self._footprint_atom(atomclass, Atom_based_exclusion[atomclass.atom_type])
+
+    def _merge_atom_result(self, AIP, ia_002, ia_03, ia_01):
+        self.AIP += AIP
+        self.surface_areas_initial.append(ia_002)
+        self.sai_03.append(ia_03)
+        self.sai_01.append(ia_01)
 
     def FootprintByAtom(self, atomclass, min_area):
         """An instance of the loop over atoms to assign relevant AIPs to the MEPS associated with the atom.
            A subsject of a set of definitions for variuos atom types, however, each is softened to also consider
            the effect of molecular geometry, and therefore MEPS availability"""
+        self._merge_atom_result(*self._footprint_atom(atomclass, min_area))
+
+    def _footprint_atom(self, atomclass, min_area):
+        """Footprints a single atom into its own AIP buffer, which only ever holds the AIPs of this atom.
+           Returns the buffer and the initial areas at the three isosurfaces."""
+        AIP = []
 
         # initial areas at different isosurfaces
-        ia_002 = sum(self.MEPS.MEPS_owner == atomclass.index) * \
-            self.MEPS.total_area/self.MEPS.no_MEPS
-        if self.MEPS_p is not 0:
-            ia_03 = sum(self.MEPS_p.MEPS_owner == atomclass.index) * \
-                self.MEPS_p.total_area/self.MEPS_p.no_MEPS
+        ia_002 = self.MEPS.get_area(self.MEPS.MEPS_owner == atomclass.index)
+        if self.MEPS_p != 0:
+            ia_03 = self.MEPS_p.get_area(self.MEPS_p.MEPS_owner == atomclass.index)
         else:
             ia_03 = None
-        if self.MEPS_m is not 0:
-            ia_01 = sum(self.MEPS_m.MEPS_owner == atomclass.index) * \
-                self.MEPS_m.total_area/self.MEPS_m.no_MEPS
+        if self.MEPS_m != 0:
+            ia_01 = self.MEPS_m.get_area(self.MEPS_m.MEPS_owner == atomclass.index)
         else:
             ia_01 = None
-        self.surface_areas_initial.append(ia_002)
-        self.sai_03.append(ia_03)
-        self.sai_01.append(ia_01)
 
         if ia_002 > min_area:
             # define surface to search
@@ -108,22 +159,24 @@ class Footprinting():
                     or atomclass.atom_type == "S.2" \
                     or atomclass.atom_type == "S.2.ps":
                 # locate the polar AIPs on inner surface
-                MEPS_df_sub = polar_AIP_search(self.MEPS_p, self.AIP, self._Atom,
+                MEPS_df_sub = polar_AIP_search(self.MEPS_p, AIP, self._Atom,
                                                atomclass, MEPS_df_sub, self.lp_excl_r)
 
                 # if it failed to add AIPs due to the MEPS being too positive
-                no_polar_AIPs = [s.atom_name for s in self.AIP].count(
+                no_polar_AIPs = [s.atom_name for s in AIP].count(
                     atomclass.atom_name)
                 if no_polar_AIPs == 0:
-                    MEPS_df_sub = polar_AIP_search(self.MEPS, self.AIP, self._Atom,
+                    MEPS_df_sub = polar_AIP_search(self.MEPS, AIP, self._Atom,
                                                    atomclass, MEPS_df_sub, self.lp_excl_r, outer_meps=True)
 
             # update and check the surface area requirement again
-            remainder_area = len(MEPS_df_sub) * MEPS.total_area/MEPS.no_MEPS
+            remainder_area = MEPS.get_area(MEPS_df_sub)
             if remainder_area > min_area * self.csp/100:
-                non_polar_AIP_search(self.AIP, self._Atom, MEPS, self.MEPS_p,
+                non_polar_AIP_search(AIP, self._Atom, MEPS, self.MEPS_p,
                                      MEPS_df_sub, atomclass, self._dualAIP)
 
+        return AIP, ia_002, ia_03, ia_01
+
     @staticmethod
     def EdgeDetection(MEPS, atom, csp):
         """Detects MEPS points near atom-owned surface fragment edge based on local density of points.
@@ -136,15 +189,19 @@ class Footprinting():
                             no MEPS is available to locate the AIPs. \
                             Using 0.1 instead")
 
-        # matrix of distances; ndarray
-        MEPS_df_atom = MEPS.MEPS_df[MEPS.MEPS_owner == atom.index]
-        subset_mat_dis = spatial.distance.cdist(MEPS_df_atom[["x", "y", "z"]],
-                                                MEPS_df_atom[["x", "y", "z"]])
+        # number of atom-owned points within subset_r_nn, cached on MEPS; ndarray
+        atom_mask = MEPS.MEPS_owner == atom.index
+        MEPS_df_atom = MEPS.MEPS_df[atom_mask]
+        subset_density = MEPS.get_local_density(subset_r_nn)[atom_mask]
 
         # non-averaged per MEPS point surface area; array
         subset_nonav_pMA = 1 / \
-            (sum(subset_mat_dis < subset_r_nn)/(subset_r_nn**2*np.pi))
+            (subset_density/(subset_r_nn**2*np.pi))
         edge_mask = subset_nonav_pMA <= np.percentile(subset_nonav_pMA, csp)
         MEPS_df = MEPS_df_atom.loc[edge_mask]
 
         return MEPS_df
+
+
+def _footprint_atom_in_worker(atom):
+    return _WORKER_FOOTPRINTING._footprint_atom_index(atom)
@@ -0,0 +1,70 @@
+"""
+Batched geometry kernels for placing AIPs on a surface: distances of all surface points to a
+bond axis, angles at an atom, rotations about a bond axis (Rodrigues' formula) and the surface
+points nearest to a set of target positions. All functions work on whole (n, 3) arrays of
+points instead of one point at a time.
+@author: Katarzyna Joanna Zator (kz265)
+"""
+
+import numpy as np
+from scipy import spatial
+
+
+def unit_vector(vector):
+    """Returns the vector scaled to unit length"""
+    vector = np.asarray(vector, dtype=np.float64).ravel()
+    return vector / np.linalg.norm(vector)
+
+
+def rotate_about_axis(points, origin, axis, thetas):
+    """Rotates points counterclockwise about the axis through origin, once for every angle.
+
+    Parameters
+    ----------
+    points : numpy array
+        coordinates, shape (3,) or (n, 3)
+    origin : numpy array
+        point on the axis of rotation
+    axis : numpy array
+        direction of the axis of rotation, need not be normalised
+    thetas : array-like
+        angles in radians
+
+    Returns
+    -------
+    rotated : numpy array
+        shape (len(thetas), n, 3), or (len(thetas), 3) if a single point was given
+    """
+    origin = np.asarray(origin, dtype=np.float64).ravel()
+    k = unit_vector(axis)
+    v = np.asarray(points, dtype=np.float64) - origin
+    thetas = np.asarray(thetas, dtype=np.float64).reshape((-1,) + (1,) * v.ndim)
+    cos, sin = np.cos(thetas), np.sin(thetas)
+    # v cos(t) + (k x v) sin(t) + k (k.v) (1 - cos(t))
+    k_dot_v = np.dot(v, k)[..., np.newaxis]
+    return v * cos + np.cross(k, v) * sin + k * k_dot_v * (1 - cos) + origin
+
+
+def axis_distances(points, start, end):
+    """Perpendicular distances of points, shape (n, 3), to the line through start and end"""
+    start = np.asarray(start, dtype=np.float64).ravel()
+    axis = np.asarray(end, dtype=np.float64).ravel() - start
+    return np.linalg.norm(np.cross(start - points, axis), axis=1) / np.linalg.norm(axis)
+
+
+def angles(points, vertex, reference):
+    """Angles (in radians) at vertex between each of the points, shape (n, 3), and reference"""
+    vertex = np.asarray(vertex, dtype=np.float64).ravel()
+    u = np.asarray(points, dtype=np.float64).reshape(-1, 3) - vertex
+    w = np.asarray(reference, dtype=np.float64).ravel() - vertex
+    cos = np.dot(u, w) / (np.linalg.norm(u, axis=1) * np.linalg.norm(w))
+    return np.arccos(np.clip(cos, -1, 1))
+
+
+def nearest_points(points, targets):
+    """Position in points, shape (n, 3), of the point closest to each target, shape (m, 3), and
+       the distance to it"""
+    targets = np.asarray(targets, dtype=np.float64).reshape(-1, 3)
+    D = spatial.distance.cdist(targets, points)
+    positions = np.argmin(D, axis=1)
+    return positions, D[np.arange(len(targets)), positions]
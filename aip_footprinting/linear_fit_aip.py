@@ -1,4 +1,5 @@
 #
+import numpy as np
 from pep562 import pep562
 
 
@@ -223,12 +224,57 @@ dnn_constants = {"alpha_linear_002": {"H.soft":    selected_water["positive_pi"]
 }
 
 
+class CompiledFit():
+    """A linear fit table (atom type: [c0, c1]) compiled into a coefficient array indexed by
+       atom type, so that the coefficients of many points are gathered at once"""
+
+    def __init__(self, table):
+        self.atom_types = list(table)
+        self.index = {atom_type: i for i, atom_type in enumerate(self.atom_types)}
+        self.coefficients = np.array([table[t] for t in self.atom_types], dtype=np.float64)
+
+    def resolve(self, atom_type, default, prefixes=()):
+        """Row of the coefficients used for atom_type: its own if fitted, otherwise those of the
+           first (prefix, atom type) pair whose prefix it starts with, otherwise those of default"""
+        if atom_type in self.index:
+            return self.index[atom_type]
+        for prefix, fallback in prefixes:
+            if atom_type.startswith(prefix):
+                return self.index[fallback]
+        return self.index[default]
+
+    def get_coefficients(self, atom_types, default, prefixes=()):
+        """Returns the c0 and c1 arrays for an array of atom types, resolving each distinct
+           atom type once"""
+        unique, inverse = np.unique(np.asarray(atom_types, dtype=str), return_inverse=True)
+        rows = np.array([self.resolve(t, default, prefixes) for t in unique], dtype=np.int64)
+        coefficients = self.coefficients[rows[inverse.ravel()]]
+        shape = np.shape(atom_types)
+        return coefficients[:, 0].reshape(shape), coefficients[:, 1].reshape(shape)
+
+
+def compile_constants(constants):
+    """CompiledFit for every linear fit table of a set of constants"""
+    return {name: CompiledFit(table) for name, table in constants.items()
+            if isinstance(table, dict)}
+
+
+compiled_dft_constants = compile_constants(dft_constants)
+compiled_dnn_constants = compile_constants(dnn_constants)
+
+
 def __getattr__(name):
     if name in dnn_constants and name in dft_constants:
         if use_dnn:
             return dnn_constants[name]
         else:
             return dft_constants[name]
+    elif name.startswith("compiled_") and name[len("compiled_"):] in compiled_dnn_constants \
+            and name[len("compiled_"):] in compiled_dft_constants:
+        if use_dnn:
+            return compiled_dnn_constants[name[len("compiled_"):]]
+        else:
+            return compiled_dft_constants[name[len("compiled_"):]]
     else:
         raise AttributeError
 
@@ -0,0 +1,128 @@
+"""
+Small k-medoid engine for the pi-system and sigma-hole patches clustered in define_AIP. The
+patch's distance matrix is computed once and shared by every initialisation that is tried
+(k-medoids++, heuristic, random and the single cluster fallback), instead of each
+sklearn_extra KMedoids fit building its own. The initialisation and the alternate update
+reproduce KMedoids(random_state=0, method="alternate", metric="euclidean") step by step, so
+the medoids and labels are the same as those of the fits they replace.
+@author: Katarzyna Joanna Zator (kz265)
+"""
+
+import numpy as np
+
+INIT_METHODS = ["k-medoids++", "heuristic", "random"]
+
+
+class MedoidClusters():
+    """Result of a fit, exposing the attributes of a fitted KMedoids used by define_AIP"""
+
+    def __init__(self, xyz, D, medoid_indices):
+        self.n_clusters = len(medoid_indices)
+        self.medoid_indices_ = medoid_indices
+        self.cluster_centers_ = xyz[medoid_indices]
+        self.labels_ = np.argmin(D[medoid_indices, :], axis=0)
+
+
+class MedoidEngine():
+    """Clusters one set of points for several numbers of clusters and initialisations, sharing
+       the pairwise distances and the per-point distance sums between all of them.
+
+    Parameters
+    ----------
+    xyz : numpy array
+        point coordinates, shape (n_points, 3)
+    random_state : int
+        default: 0; seed of the initialisation, reset for every fit as in KMedoids
+    max_iter : int
+        default: 300; maximum number of alternate updates
+    """
+
+    def __init__(self, xyz, random_state=0, max_iter=300):
+        from sklearn.metrics.pairwise import pairwise_distances
+        self.xyz = np.asarray(xyz, dtype=np.float64)
+        self.random_state = random_state
+        self.max_iter = max_iter
+        # same distances (and rounding) as KMedoids computes internally
+        self.D = pairwise_distances(self.xyz, metric="euclidean")
+        self._distance_sums = None
+        self._DT = None
+        self._fits = {}
+
+    @property
+    def distance_sums(self):
+        """Sum of the distances of each point to all others, used by the heuristic initialisation"""
+        if self._distance_sums is None:
+            self._distance_sums = np.sum(self.D, axis=1)
+        return self._distance_sums
+
+    def fit(self, n_clusters, init="k-medoids++"):
+        """Returns the MedoidClusters for n_clusters started from init; repeated calls with the
+           same arguments are served from memory"""
+        if init not in INIT_METHODS:
+            raise ValueError("init needs to be one of the following: {}".format(INIT_METHODS))
+        if n_clusters > len(self.D):
+            raise ValueError("The number of medoids ({}) must be less than the number of samples {}."
+                             .format(n_clusters, len(self.D)))
+        key = (n_clusters, init)
+        if key not in self._fits:
+            medoid_indices = self._initialise(n_clusters, init)
+            self._fits[key] = MedoidClusters(self.xyz, self.D, self._alternate(medoid_indices))
+        return self._fits[key]
+
+    def _initialise(self, n_clusters, init):
+        random_state = np.random.RandomState(self.random_state)
+        if init == "random":
+            return random_state.choice(len(self.D), n_clusters, replace=False)
+        elif init == "heuristic":
+            return np.argpartition(self.distance_sums, n_clusters - 1)[:n_clusters]
+        return self._kpp_init(n_clusters, random_state)
+
+    def _kpp_init(self, n_clusters, random_state):
+        """k-medoids++ seeding with 2 + log(k) local trials per centre"""
+        from sklearn.utils.extmath import stable_cumsum
+        D = self.D
+        n_local_trials = 2 + int(np.log(n_clusters))
+        centers = np.empty(n_clusters, dtype=int)
+        centers[0] = random_state.randint(len(D))
+        closest_dist_sq = D[centers[0], :] ** 2
+        current_pot = closest_dist_sq.sum()
+        for cluster_index in range(1, n_clusters):
+            rand_vals = random_state.random_sample(n_local_trials) * current_pot
+            candidate_ids = np.searchsorted(stable_cumsum(closest_dist_sq), rand_vals)
+            # potentials of all candidates in one pass; the first lowest wins as in KMedoids
+            new_dist_sq = np.minimum(closest_dist_sq, D[candidate_ids, :] ** 2)
+            new_pots = new_dist_sq.sum(axis=1)
+            best = np.argmin(new_pots)
+            centers[cluster_index] = candidate_ids[best]
+            current_pot = new_pots[best]
+            closest_dist_sq = new_dist_sq[best]
+        return centers
+
+    def _alternate(self, medoid_indices):
+        """Alternates between labelling the points and moving each medoid to the point of its
+           cluster with the lowest sum of distances, until the medoids do not change"""
+        D = self.D
+        if self._DT is None:
+            # the matrix is not exactly symmetric, and KMedoids sums D[j, i] over the cluster
+            # points j; gathering rows of the transpose reads memory contiguously
+            self._DT = np.ascontiguousarray(D.T)
+        medoid_indices = np.array(medoid_indices)
+        cluster_costs = {}
+        for _ in range(self.max_iter):
+            old_medoid_indices = np.copy(medoid_indices)
+            labels = np.argmin(D[medoid_indices, :], axis=0)
+            for k in range(len(medoid_indices)):
+                cluster_k = np.where(labels == k)[0]
+                if len(cluster_k) == 0:
+                    continue
+                # a cluster that kept its points keeps its costs
+                key = (k, cluster_k.tobytes())
+                if key not in cluster_costs:
+                    cluster_costs[key] = np.sum(self._DT[np.ix_(cluster_k, cluster_k)], axis=1)
+                costs = cluster_costs[key]
+                min_cost_index = np.argmin(costs)
+                if costs[min_cost_index] < costs[np.argmax(cluster_k == medoid_indices[k])]:
+                    medoid_indices[k] = cluster_k[min_cost_index]
+            if np.all(old_medoid_indices == medoid_indices):
+                break
+        return medoid_indices
@@ -0,0 +1,134 @@
+"""
+Parameter sweeps of foot-printing over centre_surface_percentile and lp_excl_r. The cube files
+are read, and the MEPS ownership, areas and local point densities computed, once per molecule;
+only the parameter-dependent stages (the edge percentile mask, the lone pair excision and the
+AIP selection) are rerun for every point of the grid. The AIPs of all grid points are collected
+into a single table with one row per AIP.
+@author: Katarzyna Joanna Zator (kz265)
+"""
+
+import itertools
+import logging
+import numpy as np
+import pandas as pd
+from aip_footprinting.read_MEPS import MEPS
+from aip_footprinting.atom_class import AtomSet
+from aip_footprinting.constants import subset_r_nn
+from aip_footprinting.footprinting import Footprinting
+from aip_footprinting.surface_class import Surface
+
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.WARNING)
+
+SWEEP_COLUMNS = ["centre_surface_percentile", "lp_excl_r", "atom_index", "atom_name",
+                 "atom_type", "aip_type", "value", "mepsvalue", "x", "y", "z", "mepsindex",
+                 "isosurface", "fraction", "dual"]
+
+
+class FootprintSweep():
+    """Footprints one molecule for many centre_surface_percentile and lp_excl_r values,
+       sharing the MEPS between all of them.
+
+    Parameters
+    ----------
+    MEPS_np : class instance
+        non-polar (0.0020 eBohr-3) MEPS
+    MEPS_p : class instance
+        polar (0.0300 eBohr-3) MEPS, or 0 if not available
+    MEPS_m : class instance
+        middle (0.0104 eBohr-3) MEPS, or 0 if not available
+    dualAIP : bool
+        default: False; if True, dualAIPs are determined for the pi-systems
+    n_workers : int
+        default: 1; number of atoms footprinted concurrently at each grid point
+    """
+
+    def __init__(self, MEPS_np, MEPS_p, MEPS_m, dualAIP=False, n_workers=1):
+        self.MEPS_np = MEPS_np
+        self.MEPS_p = MEPS_p
+        self.MEPS_m = MEPS_m
+        self.dualAIP = dualAIP
+        self.n_workers = n_workers
+        self.Atom = AtomSet()
+        self.Atom._create_from_MEPS(self.MEPS_np)
+        # the local densities do not depend on the parameters, computed here once for all grid points
+        for surface in [self.MEPS_np, self.MEPS_p, self.MEPS_m]:
+            if surface != 0:
+                surface.get_local_density(subset_r_nn)
+
+    @classmethod
+    def from_files(cls, cml_file, cube_p_file, cube_m_file, cube_np_file, dualAIP=False, cache=False,
+                   n_workers=1, area_method="hull"):
+        """Reads the three cube files as KMC_footprint_script does, a missing polar or middle
+           cube file is skipped"""
+        MEPS_np = MEPS(cube_np_file, cml_file, cache=cache, area_method=area_method)
+        try:
+            MEPS_p = MEPS(cube_p_file, cml_file, own_dist_scaled=False, cache=cache,
+                          area_method=area_method)
+        except Exception:
+            MEPS_p = 0
+            LOGGER.warning("\n Could not localise the 0.0300 cube file, proceeding without this class object")
+        try:
+            MEPS_m = MEPS(cube_m_file, cml_file, cache=cache, area_method=area_method)
+        except Exception:
+            MEPS_m = 0
+            LOGGER.warning("\n Could not localise the 0.0104 cube file, proceeding without this class object")
+        return cls(MEPS_np, MEPS_p, MEPS_m, dualAIP, n_workers)
+
+    @classmethod
+    def from_dnn_file(cls, cml_file, cube_file, dualAIP=False, cache=False, n_workers=1,
+                      area_method="hull"):
+        """Reads the single cube file used for all surfaces, as DNN_footprint_script does"""
+        MEPS_np = MEPS(cube_file, cml_file, cache=cache, area_method=area_method)
+        return cls(MEPS_np, MEPS_np, MEPS_np, dualAIP, n_workers)
+
+    def footprint(self, centre_surface_percentile=90, lp_excl_r=1.5):
+        """Footprinting of the molecule at a single grid point"""
+        return Footprinting(self.MEPS_np, self.MEPS_p, self.MEPS_m, self.Atom,
+                            centre_surface_percentile, lp_excl_r, self.dualAIP,
+                            n_workers=self.n_workers)
+
+    def surface(self, footprinting):
+        """Surface description for the footprinting of a grid point, e.g. for AIPWriter"""
+        return Surface(self.MEPS_np, footprinting, self.Atom)
+
+    def run(self, centre_surface_percentiles=(90,), lp_excl_rs=(1.5,)):
+        """Footprints every combination of the parameters.
+
+        Parameters
+        ----------
+        centre_surface_percentiles : list
+            default: (90,); values of centre_surface_percentile
+        lp_excl_rs : list
+            default: (1.5,); values of lp_excl_r
+
+        Returns
+        -------
+        table : DataFrame
+            one row per AIP per grid point, with the columns of SWEEP_COLUMNS; a grid point
+            without any AIPs has a single row with NaN in every column but the parameters, so
+            that the table covers the full grid
+        """
+        rows = []
+        for csp, lp_excl_r in itertools.product(centre_surface_percentiles, lp_excl_rs):
+            footprinting = self.footprint(csp, lp_excl_r)
+            rows += [aip_row(csp, lp_excl_r, aip) for aip in footprinting.AIP]
+            if len(footprinting.AIP) == 0:
+                rows.append(empty_row(csp, lp_excl_r))
+            LOGGER.info("\n centre_surface_percentile {}, lp_excl_r {}: {} AIPs".format(
+                csp, lp_excl_r, len(footprinting.AIP)))
+        return pd.DataFrame(rows, columns=SWEEP_COLUMNS)
+
+
+def aip_row(centre_surface_percentile, lp_excl_r, aip):
+    """Row of the sweep table for a single AIP"""
+    x, y, z = np.ravel(aip.xyz)
+    return [centre_surface_percentile, lp_excl_r, aip.atom_owner_index, aip.atom_name,
+            aip.atom_type, aip.type, aip.value, aip.mepsvalue, x, y, z, aip.mepsindex,
+            aip.isosurface, aip.fraction, aip.dual]
+
+
+def empty_row(centre_surface_percentile, lp_excl_r):
+    """Row of the sweep table for a grid point without any AIPs"""
+    return [centre_surface_percentile, lp_excl_r] + [np.nan] * (len(SWEEP_COLUMNS) - 2)
@@ -3,6 +3,7 @@ import numpy as np
 import pandas as pd
 from scipy import spatial
 from aip_footprinting.AIP_class import AIP as AIPclass
+from aip_footprinting.read_MEPS import find_neighbour_pairs
 from aip_footprinting.define_AIP import define_extreme_AIP, define_extreme_geometric_AIP, get_AIP_value
 
 logging.basicConfig()
@@ -22,17 +23,21 @@ def find_connecting_atom(MEPS, Atom, atom):
     return atom2
 
 
+def get_local_minima(xyz, charge, radius=1):
+    """Positions of the negative points whose charge is the minimum of all points within radius,
+       found from a single neighbour list of the surface patch"""
+    charge = np.asarray(charge)
+    pairs = find_neighbour_pairs(xyz, radius)
+    neighbour_min = charge.copy()
+    np.minimum.at(neighbour_min, pairs[:, 0], charge[pairs[:, 1]])
+    np.minimum.at(neighbour_min, pairs[:, 1], charge[pairs[:, 0]])
+    return np.flatnonzero((neighbour_min >= charge) & (charge < 0))
+
+
 def find_local_minima(ox, atom, outer_meps=False, radius=1):
-    minima = []
     AIPs = []
-    ox_xyz = ox[["x", "y", "z"]].to_numpy()
-    for index, point in ox.iterrows():
-        xyz = point[["x", "y", "z"]].to_numpy().reshape(1, 3)
-        charge = point["charge"]
-        mat_dis_to_point = spatial.distance.cdist(ox_xyz, xyz).flatten()
-        close_to_point = ox[mat_dis_to_point < radius]
-        if (close_to_point["charge"].min() >= charge) and charge < 0:
-            minima.append(index)
+    minima = ox.index[get_local_minima(ox[["x", "y", "z"]].to_numpy(),
+                                       ox["charge"].to_numpy(), radius)].tolist()
 
     for index in minima:
         AIP_mepsvalue = ox.loc[index]["charge"]
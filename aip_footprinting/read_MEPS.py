@@ -4,26 +4,113 @@ Creates instance of MEPS class for each cube file. Identifies division of the su
 """
 
 import logging
+import re
 import numpy as np
 import pandas as pd
-from mendeleev import element
-from scipy.spatial import ConvexHull
+from scipy.spatial import ConvexHull, cKDTree
 from scipy.spatial.distance import cdist
 
 from aip_footprinting.atom_type_reader import ATReader
-from aip_footprinting.constants import bohr_to_Angstrom
+from aip_footprinting.cache_MEPS import get_cache_file, read_MEPS_cache, write_MEPS_cache
+from aip_footprinting.constants import bohr_to_Angstrom, r_nn, subset_r_nn
+from filereader.element_table import vdw_radius
 
 logging.basicConfig()
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
 
+# number of point-atom distances held at once when assigning MEPS ownership
+OWNER_BLOCK_SIZE = 1 << 22
+# ways of measuring surface area, see MEPS.get_areas
+AREA_METHODS = ["hull", "density"]
+
+
+def read_cube(cube_file, dtype=np.float64):
+    """Reads a merged MEPS cube file in a single pass. The header and the atom block are read
+       line by line, while the block of MEPS points is handed to numpy in bulk so that no
+       per-value Python work is done.
+
+    Parameters
+    ----------
+    cube_file : string
+        path to the .cube file of NWChem origin for the MEPS coordinates
+    dtype : numpy dtype
+        default: np.float64; precision of the returned MEPS points
+
+    Returns
+    -------
+    vdw_volume : float
+        enclosed volume as read from the title line
+    atoms : ndarray
+        (no_atoms, 5) array of atomic mass, charge, x, y, z; coordinates in Bohr
+    points : ndarray
+        (no_MEPS, 4) array of x, y, z, MEPS charge; coordinates in Bohr
+    """
+    with open(cube_file, "r") as open_file:
+        title = open_file.readline()
+        if len(title.split(" ")) > 4:
+            if type(title.split(" ")[4]) == float:
+                vdw_volume = float(title.split(" ")[4]) * np.power(0.529177, 3)
+            else:
+                vdw_volume = 0
+        else:
+            vdw_volume = 0
+        open_file.readline()
+        no_atoms = int(open_file.readline().split()[0])
+        for _ in range(3):
+            open_file.readline()
+        atoms = np.array([open_file.readline().split()[:5] for _ in range(no_atoms)],
+                         dtype=np.float64).reshape(no_atoms, 5)
+        data = open_file.read()
+
+    first_line = re.search(r"\S[^\n]*", data)
+    if first_line is None:
+        return vdw_volume, atoms, np.empty((0, 4), dtype=dtype)
+    no_columns = len(first_line.group().split())
+    points = np.fromstring(data, dtype=dtype, sep=" ")
+    if points.size % no_columns != 0:
+        raise ValueError("Malformed MEPS point block in {}".format(cube_file))
+    # any trailing column after the MEPS charge is discarded
+    points = points.reshape(-1, no_columns)[:, :4]
+    return vdw_volume, atoms, np.ascontiguousarray(points)
+
+
+def find_neighbour_pairs(xyz, radius):
+    """Finds all pairs of points closer than radius to each other. Candidates come from a KD-tree
+       and their distances are then evaluated the same way as by cdist, so that the pairs are
+       exactly those of cdist(xyz, xyz) < radius off the diagonal.
+
+    Parameters
+    ----------
+    xyz : ndarray
+        (n, 3) array of coordinates
+    radius : float
+        neighbour radius, strict
+
+    Returns
+    -------
+    pairs : ndarray
+        (no_pairs, 2) array of point indices i < j
+    """
+    xyz = np.asarray(xyz, dtype=np.float64)
+    # slightly widened search so that no pair at the boundary is lost to rounding
+    pairs = cKDTree(xyz).query_pairs(radius * (1 + 1e-9) + 1e-12, output_type='ndarray')
+    x, y, z = np.ascontiguousarray(xyz.T)
+    i, j = pairs[:, 0], pairs[:, 1]
+    dx, dy, dz = x[i] - x[j], y[i] - y[j], z[i] - z[j]
+    dist = dx * dx
+    dist += dy * dy
+    dist += dz * dz
+    return pairs[np.sqrt(dist) < radius]
+
 
 class MEPS():
     """Class describing MEPS on a specified isosurface, splitting it on atom ownership and determining areas,
        those will be handed over to the Footprinting class for AIP calculation
        It uses input surface from a cube(esque) file - it only contains one isosurface and in Cartesians."""
 
-    def __init__(self, cube_file, cml_file, own_dist_scaled=True):
+    def __init__(self, cube_file, cml_file, own_dist_scaled=True, dtype=np.float64, cache=False,
+                 area_method="hull"):
         """
         Parameters
         ----------
@@ -34,10 +121,29 @@ class MEPS():
         own_dist_scaled : boolean
             default: True; if True the closest atom neighbour is decided based a relative distance, 
             scaled by the vdW surface as defined by vdW radii, and otherwise uses absolute distances
+        dtype : numpy dtype
+            default: np.float64; precision in which the MEPS points are held, np.float32 halves
+            the memory footprint of dense surfaces
+        cache : boolean
+            default: False; if True the parsed cube and ownership are memory-mapped from the binary
+            sidecar cache (cube_file + ".meps") when it is fresh, and the cache is (re)written otherwise
+        area_method : string
+            default: "hull"; "hull" takes the total area from the ConvexHull of the MEPS and shares
+            it equally between the points, "density" gives each point its own area from the local
+            point density (see get_point_areas) and stores it in the "area" column of MEPS_df
         """
+        if area_method not in AREA_METHODS:
+            raise ValueError("area_method needs to be one of the following: {}".format(AREA_METHODS))
         self._cube_file = cube_file
         self._cml_file = cml_file
-        self._get_MEPS_ownership(own_dist_scaled)
+        self._dtype = dtype
+        self._own_dist_scaled = own_dist_scaled
+        self._local_density = {}
+        self.area_method = area_method
+        if not (cache and self._load_cache()):
+            self._get_MEPS_ownership(own_dist_scaled)
+            if cache:
+                self.write_cache()
         self.get_areas()
 
     def _get_Atoms_df_and_MEPS_df(self):
@@ -50,52 +156,91 @@ class MEPS():
         MEPS_df : pandas dataframe with info of the MEPS
                   x, y, z, MEPS charge
         """
-        open_file = open(self._cube_file, "r")
-        read_file = open_file.readlines()
-        if len(read_file[0].split(" ")) > 4:
-            if type(read_file[0].split(" ")[4]) == float:
-                self.vdw_volume = float(read_file[0].split(" ")[4]) * np.power(0.529177, 3)
-            else:
-                self.vdw_volume = 0
-        else:
-            self.vdw_volume = 0
-        data = pd.DataFrame([[float(x) for x in e.split()] for e in read_file[6:]],
-                            columns=['amass', 'charge', 'x', 'y', 'z'])
-        no_atoms = int(read_file[2].split()[0])
-        open_file.close()
-        Atoms_df = data[:no_atoms].reset_index(drop=True)
+        self.vdw_volume, atoms, points = read_cube(self._cube_file, self._dtype)
+        Atoms_df = pd.DataFrame(atoms, columns=['amass', 'charge', 'x', 'y', 'z'])
         Atoms_df.loc[:, ['x', 'y', 'z']] = Atoms_df[[
             'x', 'y', 'z']] * bohr_to_Angstrom
 
-        # add atom type information
-        self._cml = ATReader(self._cml_file)
-        Atoms_df["atype"] = self._cml.aipAtomType
-        Atoms_df["aname"] = self._cml.atoms
-
-        MEPS_df = data[no_atoms:].reset_index(drop=True)
-        MEPS_df.columns = ['x', 'y', 'z', 'charge', 'e']
-        MEPS_df = MEPS_df.drop('e', axis=1)
-        MEPS_df.loc[:, ['x', 'y', 'z']] = MEPS_df[[
-            'x', 'y', 'z']] * bohr_to_Angstrom
+        self._add_atom_types(Atoms_df)
 
-        if len(MEPS_df) == 0:
+        if len(points) == 0:
             LOGGER.error(
                 "\n The cube file does not cointain any MEPS points. Exiting")
             exit(1)
+        points[:, :3] *= bohr_to_Angstrom
+        MEPS_df = pd.DataFrame(points, columns=['x', 'y', 'z', 'charge'])
         return Atoms_df, MEPS_df
 
+    def _add_atom_types(self, Atoms_df):
+        """Adds atom type information from the .cml file to Atoms_df"""
+        self._cml = ATReader(self._cml_file)
+        Atoms_df["atype"] = self._cml.aipAtomType
+        Atoms_df["aname"] = self._cml.atoms
+
+    def _load_cache(self, cache_file=None):
+        """Populates the MEPS from the binary sidecar cache. Returns False if there is no fresh cache."""
+        if cache_file is None:
+            cache_file = get_cache_file(self._cube_file)
+        cached = read_MEPS_cache(cache_file, self._cube_file)
+        if cached is None:
+            return False
+        header, arrays = cached
+        if arrays["points"].dtype != np.dtype(self._dtype):
+            return False
+
+        self.vdw_volume = header["vdw_volume"]
+        self.Atoms_df = pd.DataFrame(np.array(arrays["atoms"]),
+                                     columns=['amass', 'charge', 'x', 'y', 'z'])
+        self._add_atom_types(self.Atoms_df)
+        self.MEPS_df = pd.DataFrame(arrays["points"], columns=['x', 'y', 'z', 'charge'])
+        self.no_atoms = len(self.Atoms_df)
+        self.no_MEPS = len(self.MEPS_df)
+        if header["own_dist_scaled"] == bool(self._own_dist_scaled):
+            self.MEPS_owner = np.array(arrays["MEPS_owner"])
+        else:
+            self.MEPS_owner = self._find_MEPS_owners(
+                self.MEPS_df, self.Atoms_df, self._own_dist_scaled)
+        return True
+
+    def write_cache(self, cache_file=None):
+        """Writes the parsed MEPS and its ownership to the binary sidecar cache. The cache is
+           optional: if it cannot be written (read-only directory, full disk) a warning is logged,
+           None is returned and the computed MEPS is used as it is."""
+        if cache_file is None:
+            cache_file = get_cache_file(self._cube_file)
+        try:
+            write_MEPS_cache(cache_file, self._cube_file, self.vdw_volume,
+                             self.Atoms_df[['amass', 'charge', 'x', 'y', 'z']].to_numpy(),
+                             self.MEPS_df[['x', 'y', 'z', 'charge']].to_numpy(),
+                             self.MEPS_owner, self._own_dist_scaled)
+        except OSError as err:
+            LOGGER.warning("\n Could not write MEPS cache {}: {}".format(cache_file, err))
+            return None
+        return cache_file
+
     @staticmethod
-    def _find_MEPS_owners(MEPS_df, Atoms_df, own_dist_scaled=True):
-        '''Finds the closest atom (by index) for all the MEPS points'''
-        atom_xyz = Atoms_df[['x', 'y', 'z']].to_numpy()
+    def _find_MEPS_owners(MEPS_df, Atoms_df, own_dist_scaled=True, chunk_size=None):
+        """Finds the closest atom (by index) for all the MEPS points. The points are processed in
+           chunks so that only a (chunk_size, no_atoms) block of distances is held at any time;
+           the distances and the first-minimum argmin are the same as for the full matrix.
+
+        Parameters
+        ----------
+        chunk_size : int
+            default: None; number of MEPS points per block, chosen from OWNER_BLOCK_SIZE if None
+        """
+        atom_xyz = Atoms_df[['x', 'y', 'z']].to_numpy(dtype=np.float64)
         meps_xyz = MEPS_df[['x', 'y', 'z']].to_numpy()
-        radii = [element(int(a)).vdw_radius/100 for a in Atoms_df.amass]
+        radii = np.array([vdw_radius(int(a))/100 for a in Atoms_df.amass])
         #radii = [1.3 if round(r,2)==1.10 else r for r in radii] #extended H by 0.1 A
-        if own_dist_scaled == True:
-            dists = cdist(meps_xyz, atom_xyz) - radii
-        else:
-            dists = cdist(meps_xyz, atom_xyz)
-        indexes = np.array([np.argmin(i) for i in np.array(dists)])
+        if chunk_size is None:
+            chunk_size = max(1, OWNER_BLOCK_SIZE // max(1, len(atom_xyz)))
+        indexes = np.empty(len(meps_xyz), dtype=np.int64)
+        for start in range(0, len(meps_xyz), chunk_size):
+            dists = cdist(meps_xyz[start:start + chunk_size], atom_xyz)
+            if own_dist_scaled == True:
+                dists -= radii
+            indexes[start:start + chunk_size] = np.argmin(dists, axis=1)
         return indexes
 
     def _get_MEPS_ownership(self, own_dist_scaled):
@@ -114,11 +259,78 @@ class MEPS():
         self.MEPS_owner = indexes
 
 
+    def get_local_density(self, radius=subset_r_nn):
+        """Number of MEPS points, including the point itself, owned by the same atom and lying
+           closer than radius to each MEPS point. Neighbour candidates come from a KD-tree of each
+           atom-owned fragment (see find_neighbour_pairs), so that the counts match the dense
+           distance matrix exactly. Computed once for the whole surface
+           and cached on the instance.
+
+        Parameters
+        ----------
+        radius : float
+            default: subset_r_nn; neighbour radius in Angstrom
+
+        Returns
+        -------
+        density : ndarray
+            (no_MEPS,) integer array, in the order of MEPS_df
+        """
+        if radius not in self._local_density:
+            xyz = self.MEPS_df[['x', 'y', 'z']].to_numpy(dtype=np.float64)
+            density = np.ones(len(xyz), dtype=np.int64)
+            for owner in np.unique(self.MEPS_owner):
+                index = np.flatnonzero(self.MEPS_owner == owner)
+                pairs = find_neighbour_pairs(xyz[index], radius)
+                density[index] += np.bincount(pairs.ravel(), minlength=len(index))
+            self._local_density[radius] = density
+        return self._local_density[radius]
+
     def get_areas(self):
-        """Calculation of the surface area MEPS using ConvexHull: looks for the convex figure 
-           with edges joining the coordinate points"""
-        hull = ConvexHull(np.array(self.MEPS_df[['x', 'y', 'z']]))
-        self.total_area = hull.area
+        """Calculation of the surface area of the MEPS. With the "hull" method it is the area of the
+           ConvexHull, the convex figure with edges joining the coordinate points, and every point
+           carries an equal share of it. With the "density" method it is the sum of the per-point
+           areas, which follows concave surfaces that the hull spans over."""
+        if self.area_method == "hull":
+            hull = ConvexHull(np.array(self.MEPS_df[['x', 'y', 'z']]))
+            self.total_area = hull.area
+            self.point_areas = None
+        else:
+            self.point_areas = self.get_point_areas(r_nn)
+            self.MEPS_df["area"] = self.point_areas
+            self.total_area = self.point_areas.sum()
+
+    def get_point_areas(self, radius=r_nn):
+        """Area of the surface represented by each MEPS point: the area of a disc of the given
+           radius shared between all the MEPS points (of any owner) lying within it. The
+           neighbours of the whole surface are counted in one KD-tree query.
+
+        Parameters
+        ----------
+        radius : float
+            default: r_nn; neighbour radius in Angstrom, small compared to the surface curvature
+
+        Returns
+        -------
+        point_areas : ndarray
+            (no_MEPS,) array in Angstrom^2, in the order of MEPS_df
+        """
+        xyz = self.MEPS_df[['x', 'y', 'z']].to_numpy(dtype=np.float64)
+        # neighbour counts include the point itself
+        density = cKDTree(xyz).query_ball_point(xyz, radius, return_length=True)
+        return np.pi * radius**2 / density
+
+    def get_area(self, points):
+        """Surface area of a selection of MEPS points, given as a boolean mask over MEPS_df or as
+           a subset of MEPS_df. For the "hull" method it is the number of points times the
+           average area per point, otherwise the sum of the per-point areas."""
+        if isinstance(points, pd.DataFrame):
+            if self.point_areas is None:
+                return len(points) * self.total_area/self.no_MEPS
+            return points["area"].sum()
+        if self.point_areas is None:
+            return np.count_nonzero(points) * self.total_area/self.no_MEPS
+        return self.point_areas[points].sum()
 
     def visualise(self, method):
         """Visualisation of the MEPS according to the method: "charge", "atom_owner", "sign" """
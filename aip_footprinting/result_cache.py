@@ -0,0 +1,236 @@
+"""
+Content-addressed on-disk cache of foot-printing results. An entry holds the AIP list and the
+Surface of one run and is keyed by the SHA-256 of the contents of the cml and cube files, the
+foot-printing parameters (centre_surface_percentile, lp_excl_r, dualAIP, dnn, area_method) and
+the linear fit tables in linear_fit_aip, so that changing any input or fit gives a new key.
+The cache directory is bounded in size; when it grows past the limit the least recently used
+entries are removed.
+
+Entries are named {cml_hash}-{key}.pkl so that all the entries of a molecule can be invalidated
+without reading them.
+
+Run with: python -m aip_footprinting.result_cache -d cache_dir --invalidate [-c molecule.cml]
+@author: Katarzyna Joanna Zator (kz265)
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+import pickle
+import numpy as np
+import aip_footprinting.linear_fit_aip as linear_fit_aip
+from aip_footprinting.cache_MEPS import get_source_signature
+
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
+
+RESULT_CACHE_VERSION = 1
+ENTRY_SUFFIX = ".pkl"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "aip_footprinting")
+DEFAULT_MAX_BYTES = 512 * 1024**2
+
+
+class FootprintResult():
+    """The parts of a Footprinting run that are kept in the cache, with the attributes of a
+       Footprinting instance that are read after the run"""
+
+    def __init__(self, AIP, surface_areas_initial=None, sai_03=None, sai_01=None):
+        self.AIP = AIP
+        self.surface_areas_initial = surface_areas_initial
+        self.sai_03 = sai_03
+        self.sai_01 = sai_01
+
+    @classmethod
+    def from_footprinting(cls, footprinting):
+        return cls(footprinting.AIP, footprinting.surface_areas_initial, footprinting.sai_03,
+                   footprinting.sai_01)
+
+
+def file_hash(file_name):
+    """SHA-1 of the file content, or "missing" if the file does not exist"""
+    if file_name is None or not os.path.isfile(file_name):
+        return "missing"
+    return get_source_signature(file_name)["sha1"]
+
+
+def fit_tables_hash(dnn=False):
+    """SHA-1 of the linear fit tables used for dnn or DFT foot-printing"""
+    constants = linear_fit_aip.dnn_constants if dnn else linear_fit_aip.dft_constants
+    text = json.dumps(constants, sort_keys=True, default=lambda o: np.asarray(o).tolist())
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+class ResultCache():
+    """Directory of cached foot-printing results with least recently used eviction.
+
+    Parameters
+    ----------
+    cache_dir : string
+        default: DEFAULT_CACHE_DIR; directory of the cache entries, created if needed
+    max_bytes : int
+        default: DEFAULT_MAX_BYTES; total size of the entries above which the least recently
+        used ones are evicted
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def get_key(cml_file, cube_files, centre_surface_percentile=90, lp_excl_r=1.5, dualAIP=False,
+                dnn=False, area_method="hull"):
+        """Returns the cml hash and the key of a foot-printing run"""
+        cml_hash = file_hash(cml_file)
+        content = {"version": RESULT_CACHE_VERSION,
+                   "cml": cml_hash,
+                   "cubes": [file_hash(cube_file) for cube_file in cube_files],
+                   "parameters": [float(centre_surface_percentile), float(lp_excl_r), bool(dualAIP),
+                                  bool(dnn), area_method],
+                   "fits": fit_tables_hash(dnn)}
+        key = hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+        return cml_hash, key
+
+    def get_entry_file(self, cml_hash, key):
+        return os.path.join(self.cache_dir, "{}-{}{}".format(cml_hash, key, ENTRY_SUFFIX))
+
+    def get(self, cml_hash, key):
+        """Returns the cached (FootprintResult, Surface) or None on a miss. A hit marks the entry
+           as recently used. An entry that cannot be unpickled (truncated, or written by an
+           incompatible version of the code) counts as a miss and is removed."""
+        entry_file = self.get_entry_file(cml_hash, key)
+        try:
+            with open(entry_file, "rb") as open_file:
+                result = pickle.load(open_file)
+        except FileNotFoundError:
+            return None
+        except Exception as err:
+            LOGGER.warning("\n Removing unreadable cached result {}: {}".format(entry_file, err))
+            try:
+                os.remove(entry_file)
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(entry_file)
+        except OSError:
+            pass
+        return result
+
+    def put(self, cml_hash, key, footprinting, surface):
+        """Stores the result of a run and evicts least recently used entries beyond max_bytes.
+           The cache is optional: if the entry cannot be written (full disk, read-only cache
+           directory) a warning is logged, no partial file is left and None is returned."""
+        entry_file = self.get_entry_file(cml_hash, key)
+        result = (FootprintResult.from_footprinting(footprinting), surface)
+        tmp_file = "{}.{}.tmp".format(entry_file, os.getpid())
+        try:
+            with open(tmp_file, "wb") as open_file:
+                pickle.dump(result, open_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, entry_file)
+        except OSError as err:
+            LOGGER.warning("\n Could not write cached result {}: {}".format(entry_file, err))
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+            return None
+        self.evict()
+        return entry_file
+
+    def entries(self):
+        """Entry files with their size and last use, least recently used first"""
+        entries = []
+        for entry_file in glob.glob(os.path.join(self.cache_dir, "*" + ENTRY_SUFFIX)):
+            try:
+                stat = os.stat(entry_file)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry_file))
+        return sorted(entries)
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in max_bytes, returns the
+           removed entry files"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for _, size, entry_file in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_file)
+            except OSError:
+                continue
+            total -= size
+            removed.append(entry_file)
+        return removed
+
+    def invalidate(self, cml_file=None):
+        """Removes the entries of a molecule (by the content of its cml file), or all entries if
+           cml_file is None. Returns the number of entries removed."""
+        prefix = "*" if cml_file is None else file_hash(cml_file) + "-*"
+        removed = 0
+        for entry_file in glob.glob(os.path.join(self.cache_dir, prefix + ENTRY_SUFFIX)):
+            try:
+                os.remove(entry_file)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+def create_parser():
+    help_text = 'Manages the on-disk cache of foot-printing results.'
+    sign_off = 'Author: Katarzyna Joanna Zator <kz265>'
+
+    parser = argparse.ArgumentParser(description=help_text, epilog=sign_off)
+
+    parser.add_argument(
+        '--cache_dir',
+        '-d',
+        dest='cache_dir',
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        action='store',
+        help='directory of the result cache'
+    )
+    parser.add_argument(
+        '--invalidate',
+        '-i',
+        dest='invalidate',
+        default=False,
+        action='store_true',
+        help='if present, removes the cached results of the --cml_file molecule, or all of them'
+    )
+    parser.add_argument(
+        '--cml_file',
+        '-c',
+        dest='cml',
+        type=str,
+        default=None,
+        action='store',
+        help='cml file of the molecule whose cached results are invalidated'
+    )
+    return parser
+
+
+def main():
+    """Main function. Reports the size of the cache, or invalidates entries."""
+    args = create_parser().parse_args()
+    cache = ResultCache(args.cache_dir)
+    if args.invalidate:
+        removed = cache.invalidate(args.cml)
+        LOGGER.info("\n Removed {} cached results from {}".format(removed, args.cache_dir))
+    else:
+        entries = cache.entries()
+        LOGGER.info("\n {} cached results, {:.1f} MB in {}".format(
+            len(entries), sum(size for _, size, _ in entries) / 1024**2, args.cache_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,8 @@ Class to describe 0.0020 e.Bohr-3  surface for the XML file output.
 """
 
 from re import A
-from aip_footprinting.linear_fit_aip import alpha_linear_002, beta_linear_all_002
+import numpy as np
+from aip_footprinting.linear_fit_aip import compiled_alpha_linear_002, compiled_beta_linear_all_002
 
 
 class Surface():
@@ -13,10 +14,8 @@ class Surface():
     def __init__(self, MEPS_np, AIP, Atom):
         self.total = MEPS_np.total_area
         self.numberOFMEPSPoints = len(MEPS_np.MEPS_df)
-        self.positive = self.total * \
-            sum(MEPS_np.MEPS_df["charge"] > 0)/self.numberOFMEPSPoints
-        self.negative = self.total * \
-            sum(MEPS_np.MEPS_df["charge"] < 0)/self.numberOFMEPSPoints
+        self.positive = MEPS_np.get_area((MEPS_np.MEPS_df["charge"] > 0).to_numpy())
+        self.negative = MEPS_np.get_area((MEPS_np.MEPS_df["charge"] < 0).to_numpy())
         self.electrostaticPotentialMax = max(MEPS_np.MEPS_df["charge"])
         self.electrostaticPotentialMin = min(MEPS_np.MEPS_df["charge"])
         self.isosurface = 0.0020
@@ -25,41 +24,54 @@ class Surface():
 
     def get_surface_types(self, MEPS_np, AIP, Atom):
         """determines the contributions to the total surface area from positive, negative, polar 
-           and non-polar areas of the surface"""
+           and non-polar areas of the surface. The alpha and beta values of all MEPS points are
+           evaluated at once with the compiled linear fits and then summed per atom."""
 
         sa = AIP.surface_areas_initial  # for a list of areas total
-        pp = []
-        pn = []
-        np = []
-        nn = []
+        owner = MEPS_np.MEPS_owner
+        charge = MEPS_np.MEPS_df["charge"].to_numpy()
+        atom_types = np.empty(MEPS_np.no_atoms, dtype=object)
         for atom in Atom.Atom:
-            MEP_points = MEPS_np.MEPS_df["charge"][MEPS_np.MEPS_owner ==
-                                                   atom.index].values
-            if len(MEP_points) > 0:
-                fraction = sa[atom.index] / len(MEP_points)
-                MEP_points_pos = MEP_points[MEP_points > 0]
-                MEP_points_neg = MEP_points[MEP_points < 0]
+            atom_types[atom.index] = atom.atom_type
+        point_types = atom_types[owner].astype(str)
 
-                if len(MEP_points_pos) > 0:
-                    if atom.atom_type in alpha_linear_002.keys():
-                        a0, a1 = alpha_linear_002[atom.atom_type]
-                    else:
-                        a0, a1 = alpha_linear_002['H.soft']
-                    AIP_values_pos = a0 + a1 * MEP_points_pos
-                    pp.append(sum(AIP_values_pos > 1.5) * fraction)
-                    pn.append(sum(AIP_values_pos <= 1.5) * fraction)
+        a0, a1 = compiled_alpha_linear_002.get_coefficients(point_types, 'H.soft')
+        AIP_values_pos = a0 + a1 * charge
+        b0, b1 = compiled_beta_linear_all_002.get_coefficients(point_types, 'C.ar')
+        # beta is a positive value
+        AIP_values_neg = b0 + b1 * charge
+        positive = charge > 0
+        negative = charge < 0
+        masks = [positive & (AIP_values_pos > 1.5), positive & (AIP_values_pos <= 1.5),
+                 negative & (AIP_values_neg > 2.5), negative & (AIP_values_neg <= 2.5)]
+        if MEPS_np.point_areas is None:
+            # point counts per atom, scaled by the area per point of each atom below
+            pp_a, pn_a, np_a, nn_a = [np.bincount(owner[m], minlength=MEPS_np.no_atoms)
+                                      for m in masks]
+        else:
+            # per-point areas, so the parts are weighted sums rather than counts
+            pp_a, pn_a, np_a, nn_a = [np.bincount(owner[m], weights=MEPS_np.point_areas[m],
+                                                     minlength=MEPS_np.no_atoms) for m in masks]
+        no_points = np.bincount(owner, minlength=MEPS_np.no_atoms)
+        no_positive = np.bincount(owner[positive], minlength=MEPS_np.no_atoms)
+        no_negative = np.bincount(owner[negative], minlength=MEPS_np.no_atoms)
 
-                if len(MEP_points_neg) > 0:
-                    if atom.atom_type in beta_linear_all_002.keys():
-                        b0, b1 = beta_linear_all_002[atom.atom_type]
-                    else:
-                        b0, b1 = beta_linear_all_002['C.ar']
-                    AIP_values_neg = b0 + b1 * MEP_points_neg
-                    # beta is a positive value
-                    np.append(sum(AIP_values_neg > 2.5) * fraction)
-                    nn.append(sum(AIP_values_neg <= 2.5) * fraction)
+        positive_polar = []
+        positive_non_polar = []
+        negative_polar = []
+        negative_non_polar = []
+        for atom in Atom.Atom:
+            i = atom.index
+            if no_points[i] > 0:
+                fraction = sa[i] / no_points[i] if MEPS_np.point_areas is None else 1
+                if no_positive[i] > 0:
+                    positive_polar.append(pp_a[i] * fraction)
+                    positive_non_polar.append(pn_a[i] * fraction)
+                if no_negative[i] > 0:
+                    negative_polar.append(np_a[i] * fraction)
+                    negative_non_polar.append(nn_a[i] * fraction)
 
-        self.positive_polar = sum(pp)
-        self.negative_polar = sum(np)
-        self.positive_non_polar = sum(pn)
-        self.negative_non_polar = sum(nn)
+        self.positive_polar = sum(positive_polar)
+        self.negative_polar = sum(negative_polar)
+        self.positive_non_polar = sum(positive_non_polar)
+        self.negative_non_polar = sum(negative_non_polar)
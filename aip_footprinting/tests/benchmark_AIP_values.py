@@ -0,0 +1,47 @@
+"""
+Benchmark of the vectorised get_AIP_values against calling get_AIP_value point by point, over
+the points of the selected test surfaces.
+Run from the repository root with: python -m aip_footprinting.tests.benchmark_AIP_values
+"""
+
+import glob
+import pathlib
+import timeit
+import numpy as np
+import pandas as pd
+from aip_footprinting.atom_class import Atom
+from aip_footprinting.define_AIP import get_AIP_value, get_AIP_values
+
+SURFACES = pathlib.Path(__file__).resolve().parents[0] / "test_files" / "select_surfaces"
+ATOM_TYPES = ["C.ar", "N.1", "N.3.unfitted", "O.2.carbonyl", "O.3.water", "H.O", "Cl"]
+MODES = {"non-polar": {}, "polar": {"polar": True}, "sigma": {"sigma": True}}
+
+
+def scalar_AIP_values(atom_types, mep_values, **kwargs):
+    values = []
+    for atom_type, mepsvalue in zip(atom_types, mep_values):
+        atom = Atom()
+        atom.atom_type = atom_type
+        values.append(get_AIP_value(atom, mepsvalue, **kwargs))
+    return np.array(values, dtype=np.float64)
+
+
+def main(repeat=3):
+    mep_values = np.concatenate([pd.read_csv(csv_file, index_col=0)["charge"].to_numpy()
+                                 for csv_file in sorted(glob.glob(str(SURFACES / "*.csv")))])
+    atom_types = np.resize(ATOM_TYPES, len(mep_values)).tolist()
+    print("{:<12} {:>8} {:>12} {:>12} {:>8}".format(
+        "mode", "points", "scalar / ms", "arrays / ms", "speedup"))
+    for mode, kwargs in MODES.items():
+        assert np.array_equal(get_AIP_values(atom_types, mep_values, mode),
+                              scalar_AIP_values(atom_types, mep_values, **kwargs)), mode
+        scalar = min(timeit.repeat(lambda: scalar_AIP_values(atom_types, mep_values, **kwargs),
+                                   number=1, repeat=repeat))
+        vectorised = min(timeit.repeat(lambda: get_AIP_values(atom_types, mep_values, mode),
+                                       number=1, repeat=repeat))
+        print("{:<12} {:>8} {:>12.2f} {:>12.2f} {:>7.1f}x".format(
+            mode, len(mep_values), scalar*1000, vectorised*1000, scalar/vectorised))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark of the batched point to bond axis distances and rotations against the per-point
+list comprehension and the expm rotation matrices they replaced.
+Run from the repository root with: python -m aip_footprinting.tests.benchmark_geometry
+"""
+
+import glob
+import pathlib
+import timeit
+import numpy as np
+import pandas as pd
+from scipy import spatial
+from scipy.linalg import expm, norm
+from aip_footprinting.geometry import axis_distances, rotate_about_axis, nearest_points
+
+SURFACES = pathlib.Path(__file__).resolve().parents[0] / "test_files" / "select_surfaces"
+
+
+def legacy_axis_argmin(points, H, X):
+    return np.argmin([norm(np.cross(H-p, X-H))/norm(X-H) for p in points])
+
+
+def legacy_rotated_nearest(points, first, O, PS, no_AIPs):
+    positions = []
+    for a in range(1, no_AIPs):
+        axis = O - PS
+        rot = expm(np.cross(np.eye(3), axis/norm(axis)*np.radians(360/no_AIPs*a)))
+        new_lp_loc = np.dot(rot, (first - O).T).T + O
+        positions.append(np.argmin(spatial.distance.cdist(new_lp_loc, points)))
+    return positions
+
+
+def batched_rotated_nearest(points, first, O, PS, no_AIPs):
+    locs = rotate_about_axis(first, O, O - PS, np.radians(360/no_AIPs*np.arange(1, no_AIPs)))
+    return nearest_points(points, locs.reshape(-1, 3))[0].tolist()
+
+
+def main(repeat=3):
+    print("{:<30} {:>8} {:>8} {:>12} {:>12} {:>8}".format(
+        "surface", "points", "kernel", "legacy / ms", "batched / ms", "speedup"))
+    for csv_file in sorted(glob.glob(str(SURFACES / "*.csv"))):
+        points = pd.read_csv(csv_file, index_col=0)[["x", "y", "z"]].to_numpy()
+        centre = points.mean(axis=0)
+        H, X = centre + [0, 0, 0.5], centre - [0, 0.3, 0.5]
+        first = points[:1]
+        cases = {"axis": (lambda: legacy_axis_argmin(points, H, X),
+                          lambda: np.argmin(axis_distances(points, H, X))),
+                 "rotate": (lambda: legacy_rotated_nearest(points, first, H, X, 3),
+                            lambda: batched_rotated_nearest(points, first, H, X, 3))}
+        for kernel, (legacy_call, batched_call) in cases.items():
+            assert legacy_call() == batched_call(), (csv_file, kernel)
+            legacy = min(timeit.repeat(legacy_call, number=1, repeat=repeat))
+            batched = min(timeit.repeat(batched_call, number=1, repeat=repeat))
+            print("{:<30} {:>8} {:>8} {:>12.2f} {:>12.2f} {:>7.1f}x".format(
+                pathlib.Path(csv_file).name, len(points), kernel, legacy*1000, batched*1000,
+                legacy/batched))
+
+
+if __name__ == "__main__":
+    main()
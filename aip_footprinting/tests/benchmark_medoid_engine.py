@@ -0,0 +1,47 @@
+"""
+Benchmark of the shared-distance medoid engine against separate sklearn_extra KMedoids fits,
+for the full sequence of retries define_AIP can try on a pi-system patch.
+Run from the repository root with: python -m aip_footprinting.tests.benchmark_medoid_engine
+"""
+
+import pathlib
+import timeit
+import warnings
+import numpy as np
+import pandas as pd
+from aip_footprinting.medoid_engine import MedoidEngine
+
+SURFACES = pathlib.Path(__file__).resolve().parents[0] / "test_files" / "select_surfaces"
+NAMES = ["O2_pi_only", "benzene_C_002_small", "paracyclophane_C_002", "benzene_C_002",
+         "pyridine_C_002", "benzonitrile_C1_002"]
+RETRIES = [(2, "k-medoids++"), (2, "heuristic"), (2, "random"), (1, "k-medoids++")]
+
+
+def legacy_retries(xyz):
+    """One KMedoids fit, with its own distance matrix, per retry"""
+    from sklearn_extra.cluster import KMedoids
+    return [KMedoids(n_clusters=n_clusters, random_state=0, init=init).fit(xyz).medoid_indices_
+            for n_clusters, init in RETRIES]
+
+
+def engine_retries(xyz):
+    engine = MedoidEngine(xyz)
+    return [engine.fit(n_clusters, init).medoid_indices_ for n_clusters, init in RETRIES]
+
+
+def main(repeat=3):
+    warnings.simplefilter("ignore")
+    print("{:<25} {:>8} {:>12} {:>12} {:>8}".format("surface", "points", "legacy / ms",
+                                                   "engine / ms", "speedup"))
+    for name in NAMES:
+        xyz = pd.read_csv(SURFACES / "{}.csv".format(name), index_col=0)[["x", "y", "z"]].to_numpy()
+        for legacy, engine in zip(legacy_retries(xyz), engine_retries(xyz)):
+            assert np.array_equal(legacy, engine), name
+        legacy = min(timeit.repeat(lambda: legacy_retries(xyz), number=1, repeat=repeat))
+        engine = min(timeit.repeat(lambda: engine_retries(xyz), number=1, repeat=repeat))
+        print("{:<25} {:>8} {:>12.1f} {:>12.1f} {:>7.1f}x".format(
+            name, len(xyz), legacy*1000, engine*1000, legacy/engine))
+
+
+if __name__ == "__main__":
+    main()
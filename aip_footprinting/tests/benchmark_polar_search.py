@@ -0,0 +1,50 @@
+"""
+Benchmark of the neighbour-list local minimum search against the previous iterrows() loop.
+Run from the repository root with: python -m aip_footprinting.tests.benchmark_polar_search
+"""
+
+import glob
+import pathlib
+import timeit
+import pandas as pd
+from scipy import spatial
+from aip_footprinting.polar_search import get_local_minima
+
+SURFACES = pathlib.Path(__file__).resolve().parents[0] / "test_files" / "select_surfaces"
+
+
+def legacy_local_minima(ox, radius=1):
+    """The per-point cdist and DataFrame filter that get_local_minima replaced"""
+    minima = []
+    ox_xyz = ox[["x", "y", "z"]].to_numpy()
+    for index, point in ox.iterrows():
+        xyz = point[["x", "y", "z"]].to_numpy().reshape(1, 3)
+        charge = point["charge"]
+        mat_dis_to_point = spatial.distance.cdist(ox_xyz, xyz).flatten()
+        close_to_point = ox[mat_dis_to_point < radius]
+        if (close_to_point["charge"].min() >= charge) and charge < 0:
+            minima.append(index)
+    return minima
+
+
+def vectorised_local_minima(ox, radius=1):
+    return ox.index[get_local_minima(ox[["x", "y", "z"]].to_numpy(),
+                                     ox["charge"].to_numpy(), radius)].tolist()
+
+
+def main(repeat=3):
+    print("{:<30} {:>8} {:>8} {:>12} {:>12} {:>8}".format(
+        "surface", "points", "minima", "legacy / ms", "kdtree / ms", "speedup"))
+    for csv_file in sorted(glob.glob(str(SURFACES / "*_03.csv"))):
+        ox = pd.read_csv(csv_file, index_col=0)
+        minima = vectorised_local_minima(ox)
+        assert minima == legacy_local_minima(ox), csv_file
+        legacy = min(timeit.repeat(lambda: legacy_local_minima(ox), number=1, repeat=repeat))
+        vectorised = min(timeit.repeat(lambda: vectorised_local_minima(ox), number=1, repeat=repeat))
+        print("{:<30} {:>8} {:>8} {:>12.2f} {:>12.2f} {:>7.1f}x".format(
+            pathlib.Path(csv_file).name, len(ox), len(minima), legacy*1000, vectorised*1000,
+            legacy/vectorised))
+
+
+if __name__ == "__main__":
+    main()
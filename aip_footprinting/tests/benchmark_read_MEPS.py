@@ -0,0 +1,44 @@
+"""
+Benchmark of the MEPS cube parser against the previous list-of-lists parser.
+Run from the repository root with: python -m aip_footprinting.tests.benchmark_read_MEPS
+"""
+
+import glob
+import pathlib
+import timeit
+import numpy as np
+import pandas as pd
+from aip_footprinting.read_MEPS import read_cube
+
+TEST_FILES = pathlib.Path(__file__).resolve().parents[0] / "test_files"
+
+
+def legacy_parse(cube_file):
+    """The readlines() and float()-per-token parser that read_cube replaced"""
+    with open(cube_file, "r") as open_file:
+        read_file = open_file.readlines()
+    data = pd.DataFrame([[float(x) for x in e.split()] for e in read_file[6:]],
+                        columns=['amass', 'charge', 'x', 'y', 'z'])
+    no_atoms = int(read_file[2].split()[0])
+    return data[:no_atoms], data[no_atoms:]
+
+
+def main(repeat=5):
+    cube_files = sorted(glob.glob(str(TEST_FILES / "**" / "*.cube"), recursive=True))
+    print("{:<50} {:>8} {:>12} {:>12} {:>8}".format(
+        "cube file", "points", "legacy / ms", "numpy / ms", "speedup"))
+    for cube_file in cube_files:
+        _, _, points = read_cube(cube_file)
+        legacy = min(timeit.repeat(lambda: legacy_parse(cube_file), number=1, repeat=repeat))
+        vectorised = min(timeit.repeat(lambda: read_cube(cube_file), number=1, repeat=repeat))
+        print("{:<50} {:>8} {:>12.2f} {:>12.2f} {:>7.1f}x".format(
+            pathlib.Path(cube_file).name, len(points), legacy*1000, vectorised*1000,
+            legacy/vectorised))
+    float32 = [read_cube(f, np.float32)[2].nbytes for f in cube_files]
+    float64 = [read_cube(f)[2].nbytes for f in cube_files]
+    print("point block memory: {:.1f} MB (float64), {:.1f} MB (float32)".format(
+        sum(float64)/1e6, sum(float32)/1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import csv
+import logging
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import aip_footprinting.batch_footprinting as batch_footprinting
+from aip_footprinting.batch_footprinting import batch_footprint, create_parser, find_inchikeys
+
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
+
+
+def footprint_or_die(inchikey, *args):
+    """Stands in for footprint_inchikey, with the worker killed outright for KILLED-*"""
+    if inchikey.startswith("KILLED"):
+        os._exit(9)
+    return {"inchikey": inchikey, "status": "ok", "seconds": 0.0, "output": "", "error": ""}
+
+
+class TestBatchFootprinting(unittest.TestCase):
+    """Test batch foot-printing over a dataset directory"""
+
+    def setUp(self):
+        """Set up a dataset directory with the water test files"""
+        parent_directory = pathlib.Path(__file__).resolve().parents[0]
+        self.water = "XLYOFNOQVPJJNP-UHFFFAOYSA-N"
+        source = parent_directory / "test_files" / self.water
+        self.path = tempfile.mkdtemp()
+        for isosurface in ["0.0020", "0.0104", "0.0300"]:
+            os.makedirs(os.path.join(self.path, isosurface))
+            cube_file = "{}_{}_merged.cube".format(self.water, isosurface)
+            os.symlink(source / cube_file, os.path.join(self.path, isosurface, cube_file))
+        os.makedirs(os.path.join(self.path, "cml"))
+        shutil.copy(source / "{}.cml".format(self.water), os.path.join(self.path, "cml"))
+        # a molecule with its cml file but without any cube files
+        shutil.copy(source / "{}.cml".format(self.water),
+                    os.path.join(self.path, "cml", "NOCUBES-UHFFFAOYSA-N.cml"))
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(self.path)
+
+    def test_find_inchikeys(self):
+        LOGGER.info("Testing InChIKey globbing in the dataset")
+        self.assertEqual(find_inchikeys(self.path), ["NOCUBES-UHFFFAOYSA-N", self.water])
+        self.assertEqual(find_inchikeys(self.path, "XLY*"), [self.water])
+
+    def test_parser(self):
+        LOGGER.info("Testing batch parser")
+        args = create_parser().parse_args(["-p", self.path, "-k", "XLY*", "ABC", "-np", "2"])
+        self.assertEqual(args.inchikeys, ["XLY*", "ABC"])
+        self.assertEqual(args.processes, 2)
+
+    def test_batch_footprint(self):
+        LOGGER.info("Testing batch foot-printing collects failures into the report")
+        output_dir = os.path.join(self.path, "aip")
+        results = batch_footprint(self.path, n_processes=2)
+        self.assertEqual([r["inchikey"] for r in results], ["NOCUBES-UHFFFAOYSA-N", self.water])
+        self.assertEqual([r["status"] for r in results], ["failed", "ok"])
+        self.assertIn("FileNotFoundError", results[0]["error"])
+        self.assertTrue(os.path.isfile(os.path.join(output_dir, "{}_aip.xml".format(self.water))))
+        with open(os.path.join(output_dir, "footprint_report.tsv"), "r") as open_file:
+            report = list(csv.DictReader(open_file, delimiter="\t"))
+        self.assertEqual([r["status"] for r in report], ["failed", "ok"])
+
+    def test_killed_worker(self):
+        LOGGER.info("Testing only the molecule whose worker is killed fails")
+        inchikeys = ["A", "B", "KILLED-A", "C", "D", "E", "KILLED-B", "F"]
+        with mock.patch.object(batch_footprinting, "footprint_inchikey", footprint_or_die):
+            results = batch_footprint(self.path, inchikeys=inchikeys, n_processes=2)
+        self.assertEqual([r["inchikey"] for r in results], inchikeys)
+        self.assertEqual([r["status"] for r in results],
+                         ["failed" if i.startswith("KILLED") else "ok" for i in inchikeys])
+        self.assertIn("BrokenProcessPool", results[2]["error"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import logging
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from aip_footprinting.cache_MEPS import get_cache_file, read_MEPS_cache
+from aip_footprinting.read_MEPS import MEPS
+
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.WARN)
+
+class TestCacheMEPS(unittest.TestCase):
+    """Test the binary sidecar cache of parsed MEPS"""
+
+    def setUp(self):
+        """Set up instances before testing"""
+        parent_directory = pathlib.Path(__file__).resolve().parents[0]
+        self.tmp_directory = tempfile.mkdtemp()
+        self.cube_file = shutil.copy(parent_directory / "test_files/test_inner.cube", self.tmp_directory)
+        self.cml_file = ((parent_directory / "test_files/test.cml").absolute().as_posix())
+        self.MEPS_p = MEPS(self.cube_file, self.cml_file, own_dist_scaled=False)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        del self.MEPS_p
+        shutil.rmtree(self.tmp_directory)
+
+    def assertSameMEPS(self, meps, ref):
+        pd.testing.assert_frame_equal(meps.Atoms_df, ref.Atoms_df)
+        pd.testing.assert_frame_equal(meps.MEPS_df, ref.MEPS_df)
+        np.testing.assert_array_equal(meps.MEPS_owner, ref.MEPS_owner)
+        self.assertEqual(meps.no_MEPS, ref.no_MEPS)
+        self.assertEqual(meps.vdw_volume, ref.vdw_volume)
+        self.assertAlmostEqual(meps.total_area, ref.total_area)
+
+    def test_round_trip(self):
+        LOGGER.info("Testing that a cached MEPS is identical to a parsed one")
+        written = MEPS(self.cube_file, self.cml_file, own_dist_scaled=False, cache=True)
+        self.assertTrue(os.path.isfile(get_cache_file(self.cube_file)))
+        self.assertSameMEPS(written, self.MEPS_p)
+        loaded = MEPS(self.cube_file, self.cml_file, own_dist_scaled=False, cache=True)
+        self.assertIsInstance(loaded.MEPS_df, pd.DataFrame)
+        self.assertSameMEPS(loaded, self.MEPS_p)
+
+    def test_other_ownership(self):
+        LOGGER.info("Testing that ownership is recomputed for a different distance mode")
+        MEPS(self.cube_file, self.cml_file, own_dist_scaled=False, cache=True)
+        loaded = MEPS(self.cube_file, self.cml_file, own_dist_scaled=True, cache=True)
+        np.testing.assert_array_equal(loaded.MEPS_owner,
+                                      MEPS(self.cube_file, self.cml_file).MEPS_owner)
+
+    def test_stale(self):
+        LOGGER.info("Testing detection of a stale cache")
+        MEPS(self.cube_file, self.cml_file, own_dist_scaled=False, cache=True)
+        cache_file = get_cache_file(self.cube_file)
+        self.assertIsNotNone(read_MEPS_cache(cache_file, self.cube_file))
+        os.utime(self.cube_file, ns=(0, 0))
+        self.assertIsNotNone(read_MEPS_cache(cache_file, self.cube_file))
+        with open(self.cube_file, "a") as open_file:
+            open_file.write("\n")
+        self.assertIsNone(read_MEPS_cache(cache_file, self.cube_file))
+
+    def test_unwritable(self):
+        LOGGER.info("Testing that a cache that cannot be written is skipped")
+        # a directory in place of the cache file makes both reading and writing fail
+        cache_file = get_cache_file(self.cube_file)
+        os.mkdir(cache_file)
+        with self.assertLogs("aip_footprinting.read_MEPS", level="WARNING"):
+            meps = MEPS(self.cube_file, self.cml_file, own_dist_scaled=False, cache=True)
+        self.assertSameMEPS(meps, self.MEPS_p)
+        self.assertEqual(sorted(os.listdir(self.tmp_directory)),
+                         sorted([os.path.basename(self.cube_file), os.path.basename(cache_file)]))
+        self.assertIsNone(self.MEPS_p.write_cache(os.path.join(self.tmp_directory, "missing", "x.meps")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,9 @@ import numpy as np
 import logging
 import pandas as pd
 from aip_footprinting.atom_class import Atom
-from aip_footprinting.define_AIP import define_extreme_AIP, define_hydrogen, get_AIP_value
+from scipy.spatial import ConvexHull
+from aip_footprinting.define_AIP import define_extreme_AIP, define_hydrogen, get_AIP_value, \
+    get_AIP_values, get_cluster_areas
 from aip_footprinting.linear_fit_aip import alpha_linear_104, alpha_linear_002, \
     beta_linear_002, beta_linear_03
 logging.basicConfig()
@@ -120,6 +122,45 @@ class TestDefineAIP(unittest.TestCase):
                                    negmepsvalue * fit_nonpolar[1])
             self.assertAlmostEqual(aipvalue_nonpolar, round(ref_calc_nonpolar, 2))
 
+    def test_get_AIP_values(self):
+        LOGGER.info("Testing vectorised AIP values match get_AIP_value")
+        modes = {"non-polar": {}, "dual": {"dual": True}, "polar": {"polar": True},
+                 "outer-polar": {"polar": "outer-polar"}, "sigma": {"sigma": True}}
+        # unfitted types exercise the defaults, and a zero MEP the fall-through to the polar fit
+        atom_types = sorted(set(self.atom_types_all_neg + self.atom_types_pos)) + \
+            ["N.3.unfitted", "O.3.unfitted", "H.unfitted", "C.3"]
+        mep_values = [-0.3, -0.1, 0.0, 0.1, 0.3]
+        types = np.repeat(atom_types, len(mep_values))
+        meps = np.tile(mep_values, len(atom_types))
+        for mode, kwargs in modes.items():
+            values = get_AIP_values(types, meps, mode)
+            for atom_type, mepsvalue, value in zip(types, meps, values):
+                atom = Atom()
+                atom.atom_type = str(atom_type)
+                self.assertEqual(value, get_AIP_value(atom, mepsvalue, **kwargs))
+        with self.assertRaises(ValueError):
+            get_AIP_values(types, meps, "unknown")
+
+    def test_get_cluster_areas(self):
+        LOGGER.info("Testing cluster areas from hulls and from per-point areas")
+        labels = (self.C1_002.x > self.C1_002.x.median()).to_numpy().astype(int)
+        xyz = self.C1_002[["x", "y", "z"]].to_numpy()
+        areas = get_cluster_areas(self.C1_002, labels)
+        self.assertAlmostEqual(areas[0], ConvexHull(xyz[labels == 0]).area)
+        self.assertAlmostEqual(areas[1], ConvexHull(xyz[labels == 1]).area)
+        # a single point has no hull, so the second cluster takes the area of the first
+        labels_single = np.zeros(len(xyz), dtype=int)
+        labels_single[0] = 1
+        with self.assertRaises(Exception):
+            get_cluster_areas(self.C1_002, labels_single)
+        areas = get_cluster_areas(self.C1_002, labels_single, fallback=True)
+        self.assertEqual(areas[0], areas[1])
+
+        weighted = self.C1_002.assign(area=np.linspace(0.01, 0.02, len(xyz)))
+        areas = get_cluster_areas(weighted, labels)
+        self.assertAlmostEqual(areas[0], weighted.area[labels == 0].sum())
+        self.assertAlmostEqual(areas[1], weighted.area[labels == 1].sum())
+
 
 if __name__ == '__main__':
     unittest.main()
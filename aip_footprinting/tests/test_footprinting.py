@@ -163,6 +163,22 @@ class TestAIPWhole(unittest.TestCase):
         self.assertSequenceEqual([a.atom_owner_index for a in self.AIP_pyr.AIP], AIP_owner)
         self.assertSequenceEqual([a.fraction for a in self.AIP_pyr.AIP], frac_values)
 
+    def test_parallel_footprinting(self):
+        LOGGER.info("Testing parallel footprinting gives the serial AIPs in atom order")
+        for serial, MEPS_np, MEPS_p, MEPS_m, Atom in [
+                (self.AIP_pyr, self.MEPS_np_pyr, self.MEPS_p_pyr, self.MEPS_m_pyr, self.Atom_pyr),
+                (self.AIP_mes, self.MEPS_np_mes, self.MEPS_p_mes, self.MEPS_m_mes, self.Atom_mes)]:
+            for executor in ["thread", "process"]:
+                parallel = Footprinting(MEPS_np, MEPS_p, MEPS_m, Atom, 80,
+                                        n_workers=3, executor=executor)
+                self.assertSequenceEqual([(a.value, a.mepsvalue, a.mepsindex, a.atom_owner_index, a.type)
+                                          for a in parallel.AIP],
+                                         [(a.value, a.mepsvalue, a.mepsindex, a.atom_owner_index, a.type)
+                                          for a in serial.AIP])
+                np.testing.assert_array_equal(np.concatenate([a.xyz for a in parallel.AIP]),
+                                              np.concatenate([a.xyz for a in serial.AIP]))
+                self.assertSequenceEqual(parallel.surface_areas_initial, serial.surface_areas_initial)
+
     def test_Edge_Detection(self):
         LOGGER.info("Testing EdgeDetection removes right fraction")
         ox_edge_MEPS = self.AIP.EdgeDetection(
@@ -0,0 +1,53 @@
+import logging
+import unittest
+import numpy as np
+from scipy.spatial.transform import Rotation
+from aip_footprinting.geometry import rotate_about_axis, axis_distances, angles, nearest_points
+
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
+
+
+class TestGeometry(unittest.TestCase):
+    """Test the batched geometry kernels"""
+
+    def setUp(self):
+        """Set up random points around a bond along the z axis"""
+        self.points = np.random.RandomState(0).normal(size=(200, 3))
+        self.start = np.array([0.0, 0.0, 1.0])
+        self.end = np.array([0.0, 0.0, -1.0])
+
+    def test_rotate_about_axis(self):
+        LOGGER.info("Testing batched rotations match scipy rotations")
+        origin = np.array([0.5, -1.0, 2.0])
+        axis = np.array([1.0, 1.0, 0.0])
+        thetas = np.radians([120, 240])
+        rotated = rotate_about_axis(self.points, origin, axis, thetas)
+        self.assertEqual(rotated.shape, (2, 200, 3))
+        for theta, points in zip(thetas, rotated):
+            rotation = Rotation.from_rotvec(theta * axis / np.linalg.norm(axis))
+            expected = rotation.apply(self.points - origin) + origin
+            np.testing.assert_allclose(points, expected, atol=1e-12)
+        self.assertEqual(rotate_about_axis(self.points[0], origin, axis, thetas).shape, (2, 3))
+
+    def test_axis_distances(self):
+        LOGGER.info("Testing point to bond axis distances")
+        np.testing.assert_allclose(axis_distances(self.points, self.start, self.end),
+                                   np.hypot(self.points[:, 0], self.points[:, 1]))
+
+    def test_angles(self):
+        LOGGER.info("Testing angles at an atom")
+        points = np.array([[1.0, 0.0, 1.0], [0.0, 0.0, 2.0], [0.0, 0.0, 0.0]])
+        np.testing.assert_allclose(angles(points, self.start, self.end), [np.pi/2, np.pi, 0])
+
+    def test_nearest_points(self):
+        LOGGER.info("Testing nearest points to targets")
+        targets = self.points[[5, 17]] + 1e-3
+        positions, distances = nearest_points(self.points, targets)
+        np.testing.assert_array_equal(positions, [5, 17])
+        np.testing.assert_allclose(distances, np.sqrt(3)*1e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
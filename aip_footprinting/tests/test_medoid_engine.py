@@ -0,0 +1,58 @@
+import logging
+import pathlib
+import unittest
+import warnings
+import numpy as np
+import pandas as pd
+from sklearn_extra.cluster import KMedoids
+from aip_footprinting.medoid_engine import MedoidEngine
+
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
+
+
+class TestMedoidEngine(unittest.TestCase):
+    """Test the shared-distance medoid engine against sklearn_extra KMedoids"""
+
+    def setUp(self):
+        parent_directory = pathlib.Path(__file__).resolve().parents[0]
+        path = "test_files/select_surfaces/"
+        self.surfaces = [pd.read_csv("{}/{}{}.csv".format(parent_directory, path, name),
+                                     index_col=0)[["x", "y", "z"]].to_numpy()
+                         for name in ["O2_pi_only_small", "benzene_C_002_small",
+                                      "paracyclophane_C_002"]]
+        random_state = np.random.RandomState(1)
+        self.surfaces += [random_state.rand(n, 3) for n in [5, 17, 120]]
+        # coarse grid with many equal distances
+        self.surfaces += [np.round(random_state.rand(60, 3)*3)]
+
+    def tearDown(self):
+        del self.surfaces
+
+    def test_same_medoids_as_kmedoids(self):
+        LOGGER.info("Testing medoid engine reproduces KMedoids")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            for xyz in self.surfaces:
+                engine = MedoidEngine(xyz)
+                for n_clusters in [1, 2, 4]:
+                    for init in ["k-medoids++", "heuristic", "random"]:
+                        kmeans = KMedoids(n_clusters=n_clusters, random_state=0,
+                                          init=init).fit(xyz)
+                        clusters = engine.fit(n_clusters, init)
+                        self.assertEqual(clusters.n_clusters, n_clusters)
+                        np.testing.assert_array_equal(clusters.medoid_indices_, kmeans.medoid_indices_)
+                        np.testing.assert_array_equal(clusters.labels_, kmeans.labels_)
+                        np.testing.assert_array_equal(clusters.cluster_centers_, kmeans.cluster_centers_)
+
+    def test_fits_are_reused(self):
+        LOGGER.info("Testing repeated fits share the result")
+        engine = MedoidEngine(self.surfaces[0])
+        self.assertIs(engine.fit(2, "heuristic"), engine.fit(2, "heuristic"))
+        with self.assertRaises(ValueError):
+            engine.fit(2, "build")
+
+
+if __name__ == '__main__':
+    unittest.main()
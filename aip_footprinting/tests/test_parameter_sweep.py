@@ -0,0 +1,81 @@
+import logging
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import aip_footprinting.AIP_parser as fscript
+from aip_footprinting.AIP_footprinting_script import KMC_footprint_script
+from aip_footprinting.parameter_sweep import FootprintSweep, SWEEP_COLUMNS
+
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
+
+
+class TestParameterSweep(unittest.TestCase):
+    """Test parameter sweeps reading the MEPS once"""
+
+    def setUp(self):
+        """Set up the water test files"""
+        parent_directory = pathlib.Path(__file__).resolve().parents[0]
+        path = "test_files/XLYOFNOQVPJJNP-UHFFFAOYSA-N/XLYOFNOQVPJJNP-UHFFFAOYSA-N"
+        self.files = ["{}/{}.cml".format(parent_directory, path)] + \
+            ["{}/{}_{}_merged.cube".format(parent_directory, path, isosurface)
+             for isosurface in ["0.0300", "0.0104", "0.0020"]]
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(self.directory)
+
+    def test_sweep_matches_footprinting(self):
+        LOGGER.info("Testing every grid point of the sweep matches a separate foot-printing run")
+        sweep = FootprintSweep.from_files(*self.files)
+        table = sweep.run([70, 90], [1.0, 1.5])
+        self.assertEqual(list(table.columns), SWEEP_COLUMNS)
+        for (csp, lp_excl_r), rows in table.groupby(["centre_surface_percentile", "lp_excl_r"]):
+            k = KMC_footprint_script(*self.files, centre_surface_percentile=csp, lp_excl_r=lp_excl_r)
+            self.assertEqual(list(rows.value), [a.value for a in k.AIP.AIP])
+            self.assertEqual(list(rows.mepsindex), [a.mepsindex for a in k.AIP.AIP])
+            np.testing.assert_array_equal(rows[["x", "y", "z"]].to_numpy(),
+                                          np.vstack([np.ravel(a.xyz) for a in k.AIP.AIP]))
+        self.assertEqual(len(table.groupby(["centre_surface_percentile", "lp_excl_r"])), 4)
+
+    def test_sweep_without_aips(self):
+        LOGGER.info("Testing a grid point without AIPs still has a row in the table")
+        sweep = FootprintSweep.from_files(*self.files)
+        footprint = sweep.footprint
+
+        def footprint_without_aips(csp, lp_excl_r):
+            footprinting = footprint(csp, lp_excl_r)
+            if csp == 70:
+                footprinting.AIP = []
+            return footprinting
+        sweep.footprint = footprint_without_aips
+        table = sweep.run([70, 90], [1.5])
+        empty = table[table.centre_surface_percentile == 70]
+        self.assertEqual(len(empty), 1)
+        self.assertEqual(empty.lp_excl_r.iloc[0], 1.5)
+        self.assertTrue(empty.drop(columns=["centre_surface_percentile", "lp_excl_r"]).isna().all(axis=None))
+        self.assertEqual(len(table[table.centre_surface_percentile == 90]),
+                         len(footprint(90, 1.5).AIP))
+
+    def test_sweep_parser(self):
+        LOGGER.info("Testing the sweep mode of the command line")
+        sweep_table = os.path.join(self.directory, "sweep.tsv")
+        args = fscript.create_parser().parse_args(
+            ["-c", self.files[0], "-m", self.files[1], "-b", self.files[2], "-n", self.files[3],
+             "--sweep_csp", "80", "90", "--sweep_table", sweep_table])
+        self.assertEqual(args.sweep_csp, [80, 90])
+        self.assertIsNone(args.sweep_lpr)
+        fscript.footprint(args)
+        table = pd.read_csv(sweep_table, sep="\t")
+        self.assertEqual(sorted(set(table.centre_surface_percentile)), [80, 90])
+        self.assertEqual(set(table.lp_excl_r), {1.5})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,11 @@
 from tables import Atom
-from aip_footprinting.polar_search import polar_AIP_search
+from aip_footprinting.polar_search import polar_AIP_search, get_local_minima
 import pathlib
 import unittest
 import numpy as np
 import logging
 import pandas as pd
+from scipy import spatial
 from aip_footprinting.AIP_class import AIP as AIPclass
 from aip_footprinting.read_MEPS import MEPS
 from aip_footprinting.atom_class import AtomSet, Atom
@@ -209,6 +210,17 @@ class TestDefineAIPPolar(unittest.TestCase):
                 MEPS_class, AIP, _Atom, atom, MEPS_np)
             self.assertEqual(len(MEPS_df_after), exp_fraction)
 
+    def test_local_minima(self):
+        LOGGER.info("Testing neighbour-list local minima against the dense distance matrix")
+        for surface in [self.N1_03, self.Nar_03, self.O2aldehyde_03, self.O2am_03, self.O2nitro_03,
+                        self.O3alcohol_03, self.O3water_03, self.S2_03, self.S3_03, self.Spos_03]:
+            xyz = surface[["x", "y", "z"]].to_numpy()
+            charge = surface["charge"].to_numpy()
+            close = spatial.distance.cdist(xyz, xyz) < 1
+            neighbour_min = np.where(close, charge, np.inf).min(axis=1)
+            expected = np.flatnonzero((neighbour_min >= charge) & (charge < 0))
+            np.testing.assert_array_equal(get_local_minima(xyz, charge, radius=1), expected)
+
     @staticmethod
     def get_angle(a, b, c):
         ba = a - b
@@ -3,8 +3,9 @@ import pathlib
 import unittest
 import numpy as np
 import pandas as pd
+from scipy.spatial.distance import cdist
 from aip_footprinting.constants import bohr_to_Angstrom
-from aip_footprinting.read_MEPS import MEPS
+from aip_footprinting.read_MEPS import MEPS, read_cube
 
 logging.basicConfig()
 LOGGER = logging.getLogger(__name__)
@@ -19,6 +20,8 @@ class TestCubeParse(unittest.TestCase):
         cube_inner_file = ((parent_directory / "test_files/test_inner.cube").absolute().as_posix())
         cube_outer_file = ((parent_directory / "test_files/test_outer.cube").absolute().as_posix())        
         cml_file = ((parent_directory / "test_files/test.cml").absolute().as_posix())
+        self.cube_outer_file = cube_outer_file
+        self.cml_file = cml_file
         self.MEPS_p = MEPS(cube_inner_file, cml_file, own_dist_scaled=False)
         self.MEPS_np = MEPS(cube_outer_file, cml_file)
 
@@ -68,6 +71,61 @@ class TestCubeParse(unittest.TestCase):
         self.assertSequenceEqual(self.MEPS_np.MEPS_df.iloc[0,:4].round(6).tolist(), first_series_np)
         self.assertSequenceEqual(self.MEPS_p.MEPS_df.iloc[0,:4].round(6).tolist(), first_series_p)
 
+    def test_read_cube(self):
+        LOGGER.info("Testing bulk parsing of the cube point block")
+        vdw_volume, atoms, points = read_cube(self.cube_outer_file)
+        self.assertEqual(atoms.shape, (3, 5))
+        self.assertEqual(points.shape, (5128, 4))
+        np.testing.assert_array_equal(points[:, :3] * bohr_to_Angstrom,
+                                      self.MEPS_np.MEPS_df[["x", "y", "z"]].to_numpy())
+        _, _, points_32 = read_cube(self.cube_outer_file, dtype=np.float32)
+        self.assertEqual(points_32.dtype, np.float32)
+        np.testing.assert_allclose(points_32, points, rtol=1e-6)
+
+    def test_find_MEPS_owners(self):
+        LOGGER.info("Testing chunked MEPS ownership against the full distance matrix")
+        radii = np.array([1.52, 1.10, 1.10])
+        atom_xyz = self.MEPS_np.Atoms_df[['x', 'y', 'z']].to_numpy()
+        for meps in [self.MEPS_np, self.MEPS_p]:
+            meps_xyz = meps.MEPS_df[['x', 'y', 'z']].to_numpy()
+            for scaled, dists in [(True, cdist(meps_xyz, atom_xyz) - radii),
+                                  (False, cdist(meps_xyz, atom_xyz))]:
+                expected = np.array([np.argmin(i) for i in dists])
+                for chunk_size in [None, 1, 7, 1000]:
+                    owners = MEPS._find_MEPS_owners(meps.MEPS_df, meps.Atoms_df, scaled, chunk_size)
+                    np.testing.assert_array_equal(owners, expected)
+
+    def test_local_density(self):
+        LOGGER.info("Testing local density against the dense per-atom distance matrix")
+        for meps in [self.MEPS_np, self.MEPS_p]:
+            density = meps.get_local_density()
+            self.assertIs(density, meps.get_local_density())
+            for atom in range(meps.no_atoms):
+                mask = meps.MEPS_owner == atom
+                xyz = meps.MEPS_df[mask][['x', 'y', 'z']]
+                expected = sum(cdist(xyz, xyz) < 1)
+                np.testing.assert_array_equal(density[mask], expected)
+            np.testing.assert_array_equal(meps.get_local_density(0.4) <= density, True)
+
+    def test_point_areas(self):
+        LOGGER.info("Testing per-point areas of the density area method")
+        meps = MEPS(self.cube_outer_file, self.cml_file, area_method="density")
+        xyz = meps.MEPS_df[['x', 'y', 'z']]
+        expected = np.pi * 0.5**2 / np.sum(cdist(xyz, xyz) < 0.5, axis=0)
+        np.testing.assert_allclose(meps.point_areas, expected)
+        np.testing.assert_array_equal(meps.MEPS_df["area"], meps.point_areas)
+        # close to the hull area on the convex water surface
+        self.assertAlmostEqual(meps.total_area, self.MEPS_np.total_area, delta=0.5)
+        mask = meps.MEPS_owner == 0
+        self.assertAlmostEqual(meps.get_area(mask), meps.point_areas[mask].sum())
+        self.assertAlmostEqual(meps.get_area(meps.MEPS_df[mask]), meps.point_areas[mask].sum())
+        # the hull method shares the total area equally between the points
+        self.assertIsNone(self.MEPS_np.point_areas)
+        self.assertEqual(self.MEPS_np.get_area(self.MEPS_np.MEPS_owner == 0),
+                         sum(self.MEPS_np.MEPS_owner == 0) * self.MEPS_np.total_area/self.MEPS_np.no_MEPS)
+        with self.assertRaises(ValueError):
+            MEPS(self.cube_outer_file, self.cml_file, area_method="mesh")
+
     def test_indices_reset(self):
         LOGGER.info("Testing indices of MEPS_df")
         true_index = self.MEPS_np.MEPS_df.index.to_list()
@@ -0,0 +1,113 @@
+import filecmp
+import logging
+import os
+import pathlib
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+from aip_footprinting.AIP_footprinting_script import KMC_footprint_script
+from aip_footprinting.result_cache import ResultCache, create_parser
+
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
+
+
+class TestResultCache(unittest.TestCase):
+    """Test the content-addressed cache of foot-printing results"""
+
+    def setUp(self):
+        """Set up the water test files and an empty cache"""
+        parent_directory = pathlib.Path(__file__).resolve().parents[0]
+        path = "test_files/XLYOFNOQVPJJNP-UHFFFAOYSA-N/XLYOFNOQVPJJNP-UHFFFAOYSA-N"
+        self.files = ["{}/{}.cml".format(parent_directory, path)] + \
+            ["{}/{}_{}_merged.cube".format(parent_directory, path, isosurface)
+             for isosurface in ["0.0300", "0.0104", "0.0020"]]
+        self.directory = tempfile.mkdtemp()
+        self.cache = ResultCache(os.path.join(self.directory, "cache"))
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(self.directory)
+
+    def test_cache_hit(self):
+        LOGGER.info("Testing a cached run writes the same file without reading the MEPS")
+        first = KMC_footprint_script(*self.files, result_cache=self.cache)
+        self.assertEqual(len(self.cache.entries()), 1)
+        second = KMC_footprint_script(*self.files, result_cache=self.cache)
+        self.assertNotIn("MEPS_np", vars(second))
+        self.assertEqual([a.value for a in second.AIP.AIP], [a.value for a in first.AIP.AIP])
+        first_file = os.path.join(self.directory, "first.xml")
+        second_file = os.path.join(self.directory, "second.xml")
+        first.write_xml(first_file)
+        second.write_xml(second_file)
+        self.assertTrue(filecmp.cmp(first_file, second_file, shallow=False))
+        # the MEPS are read when first used
+        self.assertEqual(second.MEPS_p.no_MEPS, first.MEPS_p.no_MEPS)
+        self.assertEqual(len(second.Atom.Atom), len(first.Atom.Atom))
+        with self.assertRaises(AttributeError):
+            second.missing_attribute
+
+    def test_unreadable_entry(self):
+        LOGGER.info("Testing a truncated or stale entry counts as a miss and is removed")
+        k = KMC_footprint_script(*self.files)
+        key = self.cache.get_key(self.files[0], self.files[1:])
+        entry_file = self.cache.put(*key, k.AIP, k.Surface)
+        for content in [b"", b"\x80\x05\x95", b"\x80\x04cno_such_module\nThing\n."]:
+            with open(entry_file, "wb") as open_file:
+                open_file.write(content)
+            self.assertIsNone(self.cache.get(*key))
+            self.assertFalse(os.path.isfile(entry_file))
+
+    def test_unwritable_cache(self):
+        LOGGER.info("Testing a result that cannot be cached is still returned")
+        expected = KMC_footprint_script(*self.files)
+        with mock.patch("os.replace", side_effect=OSError(28, "No space left on device")):
+            with self.assertLogs("aip_footprinting.result_cache", level="WARNING"):
+                k = KMC_footprint_script(*self.files, result_cache=self.cache)
+        self.assertEqual([a.value for a in k.AIP.AIP], [a.value for a in expected.AIP.AIP])
+        self.assertEqual(k.Surface.total, expected.Surface.total)
+        self.assertEqual(os.listdir(self.cache.cache_dir), [])
+
+    def test_keys(self):
+        LOGGER.info("Testing keys depend on the inputs and parameters")
+        cml, cubes = self.files[0], self.files[1:]
+        key = self.cache.get_key(cml, cubes)
+        self.assertEqual(key, self.cache.get_key(cml, cubes))
+        self.assertNotEqual(key[1], self.cache.get_key(cml, cubes, lp_excl_r=1.0)[1])
+        self.assertNotEqual(key[1], self.cache.get_key(cml, cubes, dnn=True)[1])
+        self.assertNotEqual(key[1], self.cache.get_key(cml, cubes[::-1])[1])
+        self.assertIsNone(self.cache.get(*key))
+
+    def test_eviction_and_invalidation(self):
+        LOGGER.info("Testing least recently used eviction and invalidation")
+        k = KMC_footprint_script(*self.files)
+        cml, cubes = self.files[0], self.files[1:]
+        keys = [self.cache.get_key(cml, cubes, centre_surface_percentile=csp) for csp in [70, 80, 90]]
+        for key in keys:
+            self.cache.put(*key, k.AIP, k.Surface)
+            time.sleep(0.01)
+        size = self.cache.entries()[0][1]
+        # using the first entry makes the second the least recently used
+        self.assertIsNotNone(self.cache.get(*keys[0]))
+        self.cache.max_bytes = 2 * size
+        self.cache.evict()
+        self.assertIsNone(self.cache.get(*keys[1]))
+        self.assertIsNotNone(self.cache.get(*keys[0]))
+        self.assertIsNotNone(self.cache.get(*keys[2]))
+
+        self.assertEqual(self.cache.invalidate(self.files[1]), 0)
+        self.assertEqual(self.cache.invalidate(cml), 2)
+        self.assertEqual(self.cache.entries(), [])
+
+    def test_parser(self):
+        LOGGER.info("Testing the cache command line parser")
+        args = create_parser().parse_args(["-d", self.directory, "--invalidate", "-c", self.files[0]])
+        self.assertTrue(args.invalidate)
+        self.assertEqual(args.cml, self.files[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
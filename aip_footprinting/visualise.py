@@ -1,6 +1,5 @@
 import numpy as np
 import pandas as pd
-from mayavi import mlab
 from scipy import spatial
 from aip_footprinting.constants import subset_r_nn
 
@@ -8,6 +7,7 @@ from aip_footprinting.constants import subset_r_nn
 def visualise(self, method="charge", opacity=1, isosurface=0.002):
     """Visualisation of the MEPS and AIPs according to the method.
     Choices include "charge", "percentile", "both", "points" """
+    from mayavi import mlab
 
     if method == "charge":
         if isosurface == "0.0300":
@@ -38,6 +38,7 @@ import argparse
 import glob
 import cmlgenerator.cmlmaker as cmlmaker
 import cmlgenerator.cmlnamespacing as cmlname
+import cmlgenerator.smilesbatch as smilesbatch
 
 logging.basicConfig()
 LOGGER = logging.getLogger(__name__)
@@ -59,6 +60,12 @@ GENERATE_EPILOG = """Example usages:
         python -m cmlgenerator generate -s 'c1ccccc1'
         # For multiple SMILES strings, each on a new line in a file called smiles.txt
         python -m cmlgenerator generate -s -b smiles.txt
+        # The same over 8 worker processes, with at most 10 minutes per molecule,
+        # skipping molecules whose CML file already exists in cml_dir
+        python -m cmlgenerator generate -s -b smiles.txt -j 8 --timeout 600 --resume -o cml_dir
+        # 300 conformers per molecule embedded and minimised on 4 threads, with
+        # conformers within 0.5 Angstrom RMSD of each other pruned before minimisation
+        python -m cmlgenerator generate -s 'CC(=O)Nc1ccc(O)cc1' --confs 300 --threads 4 --prune_rms 0.5
 """
 
 
@@ -101,23 +108,24 @@ def process_generator_args(args):
     if args.smiles and args.batch:
         LOGGER.info("number of confs per molecule: %i", args.confs)
         smiles_list = parse_smiles_from_file(args.molecule[0])
-        for smiles in smiles_list:
-            output_values = []
-            try:
-                cmlmaker.generate_cml_file_from_smiles(
-                    smiles_string=smiles, max_confs=args.confs,
-                    directory=args.out_dir,
-                    add_sybyl = args.sybyl,
-                    add_aip_atom_types = args.aip_atom_types,
-                    aromatic = args.aromatic
-                )
-            except Exception as e:
-                output_values.append((smiles, e))
+        rows = smilesbatch.batch_generate_cml_from_smiles(
+            smiles_list, directory=args.out_dir, n_workers=args.workers,
+            timeout=args.timeout, resume=args.resume, report_file=args.report,
+            max_confs=args.confs,
+            num_threads=args.threads,
+            prune_rms_thresh=args.prune_rms,
+            add_sybyl=args.sybyl,
+            add_aip_atom_types=args.aip_atom_types,
+            aromatic=args.aromatic
+        )
+        output_values = [(row["smiles"], row["error"]) for row in rows if row["status"] == "failed"]
     elif args.smiles:
         LOGGER.info("number of confs per molecule: %i", args.confs)
         try:
             cmlmaker.generate_cml_file_from_smiles(
                 smiles_string=args.molecule[0], max_confs=args.confs,
+                num_threads=args.threads,
+                prune_rms_thresh=args.prune_rms,
                 directory=args.out_dir,
                 add_sybyl=args.sybyl,
                 add_aip_atom_types = args.aip_atom_types,
@@ -135,6 +143,8 @@ def process_generator_args(args):
                                                      directory=args.out_dir, add_sybyl=args.sybyl, add_aip_atom_types = args.aip_atom_types, aromatic = args.aromatic)
             except Exception as e:
                 output_values.append((molecule, e))
+    if args.profile:
+        LOGGER.info("conversion profile:\n%s", cmlmaker.PROFILE.report())
     return output_values
 
 def process_convert_args(args):
@@ -215,6 +225,10 @@ def create_generate_argparser():
     parser.add_argument(
         "molecule", type=str, nargs="+", help="This is the SMILES or filename"
     )
+    parser.add_argument("--threads", type=int, default=1,
+                        help="Threads for conformer embedding and MMFF minimisation, 0 for all cores")
+    parser.add_argument("--prune_rms", type=float, default=-1.0,
+                        help="Heavy-atom RMSD in Angstrom below which conformers are pruned before minimisation, default no pruning")
     parser.add_argument("-o", "--out_dir", type=str, default=None,
                         help="Output directory location")
     
@@ -239,6 +253,37 @@ def create_generate_argparser():
         default=False,
         help="Specify if you want to add aip_atom_types and sybyl to the cml")
 
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes converting SMILES in batch mode")
+
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Seconds allowed per SMILES in batch mode before the molecule is recorded as failed")
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        default=False,
+        help="Skip SMILES in batch mode whose CML file already exists in the output directory")
+
+    parser.add_argument(
+        "--report",
+        type=str,
+        default=None,
+        help="Tab-separated report of the batch mode, default smiles_report.tsv in the output directory")
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="Log the time spent in each conversion stage. Conversions in batch worker processes are not included")
+
     parser.set_defaults(func=process_generator_args)
     return parser
 
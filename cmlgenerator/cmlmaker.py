@@ -17,23 +17,89 @@
 """
 Script for making CML from SMILES or from 3D structure and writing to file.
 
+Each structure is parsed once by openbabel, and the CML, sybyl atom types and
+InChIKey are derived from the same in-memory molecule. The time spent in each
+stage of the conversion is accumulated in PROFILE.
+
 :Authors:
     Mark Driver <mdd31>
+
+Attributes
+----------
+
+PROFILE : ConversionProfile
+    Time spent in each conversion stage in this process.
 """
 
+import contextlib
 import logging
+import time
 from lxml import etree
 import cmlgenerator.structuretocml as structcml
 import cmlgenerator.smilestocml as smicml
 import cmlgenerator.cmlnamespacing as cmlname
 from filereader.cml_reader import CmlReader
-from filereader.mol2reader import Mol2Reader
 
 logging.basicConfig()
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.WARN)
 
 
+class ConversionProfile:
+    """Accumulated time and number of calls of each conversion stage."""
+
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+
+    def reset(self):
+        """Clear all stages."""
+        self.seconds.clear()
+        self.calls.clear()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time the enclosed block as part of stage name.
+
+        Parameters
+        ----------
+        name : str
+            stage name.
+
+        Yields
+        ------
+        None
+
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def report(self):
+        """Table of the calls, total and mean time of each stage, in the order first run.
+
+        Returns
+        -------
+        str
+            formatted table.
+
+        """
+        total = sum(self.seconds.values())
+        lines = ["{:<16} {:>7} {:>10} {:>10} {:>6}".format("stage", "calls", "total / s", "mean / ms", "%")]
+        for name, seconds in self.seconds.items():
+            calls = self.calls[name]
+            lines.append("{:<16} {:>7} {:>10.3f} {:>10.2f} {:>6.1f}".format(
+                name, calls, seconds, 1000 * seconds / calls,
+                100 * seconds / total if total > 0 else 0.0))
+        return "\n".join(lines)
+
+
+PROFILE = ConversionProfile()
+
+
 def generate_cml_file_from_smiles(smiles_string, add_sybyl=False, add_aip_atom_types=False, **kwargs):
     """Generate CML file from SMILES string.
 
@@ -45,6 +111,8 @@ def generate_cml_file_from_smiles(smiles_string, add_sybyl=False, add_aip_atom_t
         Maximum number of conformers to search for. The default is 10.
     MaxIters : int, optional
         Maximum number of iterations in calculation. The default is 1000.
+    num_threads, prune_rms_thresh : optional
+        Conformer generation options, see smilestocml.GenerateAndMinimiseConformers.
     directory : str, optional
         directory to put output file, if different to CWD. The default is None.
 
@@ -96,6 +164,8 @@ def create_cml_from_smiles(smiles_string, add_sybyl = False, add_aip_atom_types
         Maximum number of conformers to search for. The default is 10.
     MaxIters : int, optional
         Maximum number of iterations in calculation. The default is 1000.
+    num_threads, prune_rms_thresh : optional
+        Conformer generation options, see smilestocml.GenerateAndMinimiseConformers.
 
     Returns
     -------
@@ -105,24 +175,16 @@ def create_cml_from_smiles(smiles_string, add_sybyl = False, add_aip_atom_types
         cml:molecule with qualified attributes.
 
     """
-    inchikey, molecule_cml = smicml.generate_cml_and_inchikey_from_smiles(
-        smiles_string, **kwargs
-    )
-
-
-    if add_sybyl or add_aip_atom_types:
-        if aromatic:
-            molecule_cml2 = structcml.perform_conversion_from_string(molecule_cml, in_format="cml", aromatic=aromatic)
-            cml = CmlReader(molecule_cml2, from_file=False, ns=None)
-        else:
-            cml = CmlReader(molecule_cml, from_file=False, ns=None)
-        molecule_mol2 = structcml.perform_mol2_conversion_from_string(molecule_cml, in_format="cml")
-        mol2 = Mol2Reader(molecule_mol2, from_file = False)
-        if add_aip_atom_types:
-            molecule_cml = etree.tostring(cml.get_cml_with_sybyl_and_aip_atom_types(mol2, aromatic), encoding="unicode")
-        else:
-            molecule_cml = etree.tostring(cml.get_cml_with_sybyl_info(mol2), encoding="unicode")
-    return inchikey, cmlname.convert_molecule_from_string(inchikey, molecule_cml)
+    with PROFILE.stage("embed"):
+        rd_mol = smicml.generate_mol_from_smiles(smiles_string)
+        rd_mol, min_conf_id = smicml.generate_3d_structure_for_mol(rd_mol, **kwargs)
+        mol_block = smicml.convert_structure_to_molblock(rd_mol, confId=min_conf_id)
+    with PROFILE.stage("parse"):
+        structure = structcml.StructureConversion.from_string(mol_block, "mol")
+    add_sybyl = add_sybyl or add_aip_atom_types
+    # without atom types the CML is written with kekulé bonds, whatever aromatic is
+    return create_cml_from_structure(structure, add_sybyl, add_aip_atom_types,
+                                     aromatic and add_sybyl)
 
 
 def create_cml_from_file(input_file, file_format, add_sybyl=False, add_aip_atom_types=False, aromatic=False):
@@ -144,20 +206,74 @@ def create_cml_from_file(input_file, file_format, add_sybyl=False, add_aip_atom_
 
     """
     molecule_cml_orig = structcml.perform_conversion_from_file(input_file, file_format)
-    molecule_cml = structcml.perform_conversion_from_string(molecule_cml_orig, "cml", aromatic)
+    return create_cml_from_cml_string(molecule_cml_orig, add_sybyl, add_aip_atom_types, aromatic)
+
+
+def create_cml_from_cml_string(molecule_cml_orig, add_sybyl=False, add_aip_atom_types=False, aromatic=False):
+    """Create fully namespace qualified CML from unqualified CML written by openbabel,
+    such as a single record of a multi-molecule file.
+
+    Parameters
+    ----------
+    molecule_cml_orig : str
+        CML of molecule with unqualified attributes.
+
+    Returns
+    -------
+    inchikey : str
+        InChIKey
+    cml : etree._Element
+        cml:molecule with qualified attributes.
+
+    """
+    with PROFILE.stage("parse"):
+        structure = structcml.StructureConversion.from_string(molecule_cml_orig, "cml")
+    return create_cml_from_structure(structure, add_sybyl, add_aip_atom_types, aromatic)
+
+
+def create_cml_from_structure(structure, add_sybyl=False, add_aip_atom_types=False, aromatic=False):
+    """Create fully namespace qualified CML from a molecule parsed by openbabel.
+
+    Only the final CML is serialised; the sybyl atom types and InChIKey are
+    taken from the parsed molecule.
+
+    Parameters
+    ----------
+    structure : structuretocml.StructureConversion
+        parsed molecule.
+    add_sybyl : bool, optional
+        add sybyl atom types. The default is False.
+    add_aip_atom_types : bool, optional
+        add AIP atom types as well, if add_sybyl. The default is False.
+    aromatic : bool, optional
+        write aromatic bonds and assign aromatic AIP atom types. The default is False.
+
+    Returns
+    -------
+    inchikey : str
+        InChIKey
+    cml : etree._Element
+        cml:molecule with qualified attributes.
+
+    """
+    with PROFILE.stage("cml"):
+        molecule_cml = structure.cml(aromatic)
     if add_sybyl:
-        cml = CmlReader(molecule_cml, from_file=False, ns=None)
-        molecule_mol2 = structcml.perform_mol2_conversion_from_string(molecule_cml_orig, in_format="cml")
-        mol2 = Mol2Reader(molecule_mol2, from_file = False)
+        with PROFILE.stage("sybyl"):
+            sybyl_types = structure.sybyl_types()
+            cml = CmlReader(molecule_cml, from_file=False, ns=None)
+            if not add_aip_atom_types:
+                molecule_cml = etree.tostring(cml.get_cml_with_sybyl_info(sybyl_types), encoding="unicode")
         if add_aip_atom_types:
-            molecule_cml = etree.tostring(cml.get_cml_with_sybyl_and_aip_atom_types(mol2, aromatic), encoding="unicode")
-        else:    
-            molecule_cml = etree.tostring(cml.get_cml_with_sybyl_info(mol2), encoding="unicode")
-    inchikey = structcml.generate_inchikey_for_cml(molecule_cml)
+            with PROFILE.stage("aip_atom_types"):
+                molecule_cml = etree.tostring(cml.get_cml_with_sybyl_and_aip_atom_types(sybyl_types, aromatic), encoding="unicode")
+    with PROFILE.stage("inchikey"):
+        inchikey = structure.inchikey()
     LOGGER.info("inchikey: %s", inchikey)
     LOGGER.debug("molecule cml:")
     LOGGER.debug(molecule_cml)
-    return inchikey, cmlname.convert_molecule_from_string(inchikey, molecule_cml)
+    with PROFILE.stage("namespace"):
+        return inchikey, cmlname.convert_molecule_from_string(inchikey, molecule_cml)
 
 
 def create_filename_frominchikey(inchikey):
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+#    cmlgenerator creates fully namespaced CML for molecules from input structures.
+#    Copyright (C) 2019  Mark D. Driver
+#
+#    cmlgenerator is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+Script for generating CML files from many SMILES in parallel.
+
+Each SMILES is converted in a long-lived worker process. A worker that exceeds
+the per-molecule timeout, or dies, is replaced, and the molecule is recorded as
+failed, so a single pathological SMILES cannot stall the run. SMILES whose CML
+already exists in the output directory can be skipped, allowing an interrupted
+run to be resumed, and every outcome is written to a tab-separated report.
+
+Attributes
+----------
+
+REPORT_FIELDS : list of str
+    Columns of the batch report.
+"""
+
+import csv
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import pathlib
+import time
+import cmlgenerator.cmlmaker as cmlmaker
+import cmlgenerator.cmlnamespacing as cmlname
+import cmlgenerator.structuretocml as structcml
+
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
+
+REPORT_FIELDS = ["smiles", "inchikey", "status", "seconds", "output", "error"]
+
+
+def generate_cml_record(smiles_string, directory=None, **kwargs):
+    """Generate CML file from SMILES string, returning the outcome as a report row.
+
+    This never raises, so that failures are collected rather than ending the batch.
+
+    Parameters
+    ----------
+    smiles_string : str
+        SMILES string.
+    directory : str, optional
+        directory to put output file, if different to CWD. The default is None.
+    kwargs :
+        options of cmlmaker.create_cml_from_smiles, such as max_confs, add_sybyl,
+        add_aip_atom_types and aromatic.
+
+    Returns
+    -------
+    dict
+        report row with the SMILES, InChIKey, status, seconds, output and error.
+
+    """
+    start = time.perf_counter()
+    inchikey, output = "", ""
+    try:
+        inchikey, molecule_element = cmlmaker.create_cml_from_smiles(smiles_string, **kwargs)
+        filename = cmlmaker.create_filename_frominchikey(inchikey)
+        cmlname.write_cml_to_file(molecule_element, filename, directory=directory)
+        output = output_path(filename, directory)
+        status, error = "ok", ""
+    except Exception as err:
+        status = "failed"
+        error = "{}: {}".format(type(err).__name__, err).replace("\n", " ")
+    return {"smiles": smiles_string, "inchikey": inchikey, "status": status,
+            "seconds": round(time.perf_counter() - start, 3), "output": output, "error": error}
+
+
+def output_path(filename, directory=None):
+    """Absolute path of an output file, as cmlnamespacing.write_cml_to_file writes it."""
+    return (pathlib.Path(directory if directory is not None else "") / filename).absolute().as_posix()
+
+
+def inchikey_from_smiles(smiles_string):
+    """InChIKey of a SMILES string from openbabel, or None if it cannot be read.
+
+    This can differ from the InChIKey of the generated 3D structure when the SMILES
+    leaves stereochemistry undefined.
+    """
+    conversion = structcml.create_inchikey_conversion("smi")
+    ob_mol = structcml.openbabel.OBMol()
+    if conversion.ReadString(ob_mol, smiles_string):
+        inchikey = conversion.WriteString(ob_mol).strip()
+        return inchikey if inchikey != "" else None
+    return None
+
+
+def find_completed(smiles_list, directory=None, report_file=None):
+    """Report rows of the SMILES whose CML file already exists.
+
+    The InChIKey of each SMILES is looked up in the previous report first, which
+    records the InChIKey of the 3D structure, and otherwise generated from the SMILES.
+
+    Parameters
+    ----------
+    smiles_list : list of str
+        SMILES strings.
+    directory : str, optional
+        output directory. The default is None.
+    report_file : str, optional
+        report of an earlier run. The default is None.
+
+    Returns
+    -------
+    dict
+        skipped report row by SMILES.
+
+    """
+    previous = {}
+    if report_file is not None and os.path.isfile(report_file):
+        with open(report_file, "r", newline="") as open_file:
+            for row in csv.DictReader(open_file, delimiter="\t"):
+                if row["status"] in ["ok", "skipped"] and row["inchikey"] != "":
+                    previous[row["smiles"]] = row["inchikey"]
+    completed = {}
+    for smiles_string in smiles_list:
+        inchikey = previous.get(smiles_string)
+        if inchikey is None:
+            inchikey = inchikey_from_smiles(smiles_string)
+        if inchikey is None:
+            continue
+        output = output_path(cmlmaker.create_filename_frominchikey(inchikey), directory)
+        if os.path.isfile(output):
+            completed[smiles_string] = {"smiles": smiles_string, "inchikey": inchikey,
+                                        "status": "skipped", "seconds": "", "output": output,
+                                        "error": ""}
+    return completed
+
+
+def batch_generate_cml_from_smiles(smiles_list, directory=None, n_workers=1, timeout=None,
+                                   resume=False, report_file=None, **kwargs):
+    """Generate CML files for many SMILES over worker processes.
+
+    Parameters
+    ----------
+    smiles_list : list of str
+        SMILES strings.
+    directory : str, optional
+        directory to put output files, if different to CWD. The default is None.
+    n_workers : int, optional
+        number of worker processes. The default is 1.
+    timeout : float, optional
+        seconds allowed per molecule before its worker is terminated. The default
+        is None, for no limit.
+    resume : bool, optional
+        skip SMILES whose CML file already exists. The default is False.
+    report_file : str, optional
+        tab-separated report, {directory}/smiles_report.tsv if None.
+    kwargs :
+        options of cmlmaker.create_cml_from_smiles, such as max_confs, add_sybyl,
+        add_aip_atom_types and aromatic.
+
+    Returns
+    -------
+    list of dict
+        one report row per SMILES, in input order.
+
+    """
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+    if report_file is None:
+        report_file = output_path("smiles_report.tsv", directory)
+    completed = find_completed(smiles_list, directory, report_file) if resume else {}
+    tasks = [(i, smiles_string) for i, smiles_string in enumerate(smiles_list)
+             if smiles_string not in completed]
+    LOGGER.info("%i SMILES to convert, %i skipped", len(tasks), len(smiles_list) - len(tasks))
+
+    start = time.perf_counter()
+    if n_workers == 1 and timeout is None:
+        results = {i: generate_cml_record(smiles_string, directory, **kwargs)
+                   for i, smiles_string in tasks}
+    else:
+        results = run_workers(tasks, n_workers, timeout, directory, kwargs)
+    seconds = time.perf_counter() - start
+
+    rows = [results[i] if i in results else completed[smiles_string]
+            for i, smiles_string in enumerate(smiles_list)]
+    write_report(rows, report_file)
+    failed = [row for row in rows if row["status"] == "failed"]
+    LOGGER.info("Converted %i of %i SMILES in %.1f s, report written to %s",
+                len(tasks) - len(failed), len(tasks), seconds, report_file)
+    if len(failed) > 0:
+        LOGGER.warning("%i SMILES failed, see %s", len(failed), report_file)
+    return rows
+
+
+class _Worker:
+    """Worker process converting one SMILES at a time, sent over a pipe."""
+
+    def __init__(self, directory, kwargs):
+        self.connection, child_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_loop,
+                                               args=(child_connection, directory, kwargs),
+                                               daemon=True)
+        self.process.start()
+        child_connection.close()
+        self.task = None
+        self.started = None
+
+    def submit(self, task):
+        self.task = task
+        self.started = time.perf_counter()
+        self.connection.send(task[1])
+
+    def stop(self, terminate=False):
+        if terminate:
+            self.process.terminate()
+        else:
+            try:
+                self.connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.process.join()
+        self.connection.close()
+
+
+def _worker_loop(connection, directory, kwargs):
+    while True:
+        smiles_string = connection.recv()
+        if smiles_string is None:
+            break
+        connection.send(generate_cml_record(smiles_string, directory, **kwargs))
+
+
+def _failed_row(smiles_string, seconds, error):
+    return {"smiles": smiles_string, "inchikey": "", "status": "failed",
+            "seconds": round(seconds, 3), "output": "", "error": error}
+
+
+def run_workers(tasks, n_workers, timeout, directory, kwargs):
+    """Report row by task index of (index, SMILES) tasks, run over n_workers processes.
+
+    A worker that exceeds the timeout is terminated and one that dies is replaced;
+    in both cases the SMILES it was converting is recorded as failed.
+    """
+    tasks = list(reversed(tasks))
+    results = {}
+    workers = [_Worker(directory, kwargs) for _ in range(max(1, min(n_workers, len(tasks))))]
+    try:
+        while tasks or any(worker.task is not None for worker in workers):
+            for worker in workers:
+                if worker.task is None and tasks:
+                    worker.submit(tasks.pop())
+            busy = [worker for worker in workers if worker.task is not None]
+            wait_time = None
+            if timeout is not None:
+                now = time.perf_counter()
+                wait_time = max(0.0, min(worker.started + timeout - now for worker in busy))
+            ready = multiprocessing.connection.wait([worker.connection for worker in busy], wait_time)
+            for i, worker in enumerate(workers):
+                if worker.task is None:
+                    continue
+                index, smiles_string = worker.task
+                seconds = time.perf_counter() - worker.started
+                if worker.connection in ready:
+                    try:
+                        results[index] = worker.connection.recv()
+                        worker.task = None
+                        continue
+                    except (EOFError, OSError):
+                        error = "WorkerError: worker process exited with code {}".format(
+                            worker.process.exitcode)
+                        worker.stop(terminate=True)
+                elif timeout is not None and seconds >= timeout:
+                    error = "TimeoutError: no CML after {} s".format(timeout)
+                    worker.stop(terminate=True)
+                else:
+                    continue
+                LOGGER.warning("%s: %s", smiles_string, error)
+                results[index] = _failed_row(smiles_string, seconds, error)
+                workers[i] = _Worker(directory, kwargs)
+    finally:
+        for worker in workers:
+            worker.stop(terminate=worker.task is not None)
+    return results
+
+
+def write_report(rows, report_file):
+    """Write the batch report as a tab-separated file.
+
+    Parameters
+    ----------
+    rows : list of dict
+        report rows.
+    report_file : str
+        report filename.
+
+    Returns
+    -------
+    None
+
+    """
+    with open(report_file, "w", newline="") as open_file:
+        writer = csv.DictWriter(open_file, fieldnames=REPORT_FIELDS, delimiter="\t")
+        writer.writeheader()
+        writer.writerows(rows)
@@ -125,10 +125,11 @@ def convert_structure_to_molblock(rd_mol, confId=-1):
     return AllChem.MolToMolBlock(rd_mol, confId=confId)
 
 
-def GenerateAndMinimiseConformers(mol, max_confs=10, MaxIters=1000):
+def GenerateAndMinimiseConformers(mol, max_confs=10, MaxIters=1000, num_threads=1,
+                                  prune_rms_thresh=-1.0, energy_window=None, random_seed=-1):
     """Generate conformers returning mol and minimum energy conformer ID.
     
-    This uses the ETKDG algorithm for conformer generation and the UFF
+    This uses the ETKDG algorithm for conformer generation and the MMFF
     force field for energy evaluation.
 
     Parameters
@@ -139,6 +140,20 @@ def GenerateAndMinimiseConformers(mol, max_confs=10, MaxIters=1000):
         Maximum number of conformers to search for. The default is 10.
     MaxIters : int, optional
         Maximum number of iterations in calculation. The default is 1000.
+    num_threads : int, optional
+        Threads used by RDKit for embedding and MMFF optimisation, 0 for all
+        the cores of the machine. The default is 1.
+    prune_rms_thresh : float, optional
+        Heavy-atom RMSD (Angstrom) below which embedded conformers are discarded
+        as duplicates before minimisation. The default is -1.0, for no pruning.
+    energy_window : float, optional
+        Conformers more than this energy (kcal/mol) above the minimum are
+        removed from mol after minimisation. This only affects callers that
+        use the remaining conformers of mol: every conformer is still
+        minimised and the minimum energy conformer is unchanged. The default
+        is None, keeping all.
+    random_seed : int, optional
+        Seed of the embedding, -1 for a random one. The default is -1.
 
     Returns
     -------
@@ -158,12 +173,19 @@ def GenerateAndMinimiseConformers(mol, max_confs=10, MaxIters=1000):
         LOGGER.debug(conf_id)
         return mol, conf_id
     else:
-        AllChem.EmbedMultipleConfs(mol, max_confs, AllChem.ETKDG())
+        params = AllChem.ETKDG()
+        params.numThreads = num_threads
+        params.pruneRmsThresh = prune_rms_thresh
+        params.randomSeed = random_seed
+        AllChem.EmbedMultipleConfs(mol, max_confs, params)
+        LOGGER.debug("Embedded %i conformers.", mol.GetNumConformers())
 
         # Minimise and sort
-        calcEnergies = AllChem.MMFFOptimizeMoleculeConfs(mol)
+        conf_ids = [conf.GetId() for conf in mol.GetConformers()]
+        calcEnergies = AllChem.MMFFOptimizeMoleculeConfs(mol, numThreads=num_threads,
+                                                         maxIters=MaxIters)
         sorted_energies = sorted(
-            [[calcEnergies[i], i] for i in range(len(calcEnergies))],
+            [[calcEnergies[i], conf_ids[i]] for i in range(len(calcEnergies))],
             key=lambda tup: tup[0][1],
         )
         min_energy_confid = sorted_energies[0][1]
@@ -174,6 +196,12 @@ def GenerateAndMinimiseConformers(mol, max_confs=10, MaxIters=1000):
             + str(sorted_energies[0][0][1])
             + " kcal/mol"
         )
+        if energy_window is not None:
+            min_energy = sorted_energies[0][0][1]
+            for (not_converged, energy), conf_id in sorted_energies:
+                if energy - min_energy > energy_window:
+                    mol.RemoveConformer(conf_id)
+            LOGGER.debug("%i conformers within energy window.", mol.GetNumConformers())
         return mol, min_energy_confid
 
 
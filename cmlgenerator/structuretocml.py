@@ -33,6 +33,130 @@ LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.WARN)
 
 
+class StructureConversion:
+    """Molecule parsed once by openbabel.
+
+    The CML, sybyl atom types and InChIKey are all derived from the same
+    in-memory molecule, rather than by converting text output of one openbabel
+    conversion back through another. Each derivation works on a copy, so the
+    perception done for one output cannot change another.
+
+    Parameters
+    ----------
+    ob_mol : openbabel.OBMol
+        parsed molecule.
+
+    """
+
+    def __init__(self, ob_mol):
+        self.ob_mol = ob_mol
+
+    @classmethod
+    def from_string(cls, input_string, in_format):
+        """Parse molecule from string.
+
+        Parameters
+        ----------
+        input_string : str
+            input representation.
+        in_format : str
+            string format.
+
+        Returns
+        -------
+        StructureConversion
+
+        Raises
+        ------
+        ValueError
+            if openbabel cannot read a molecule from the string.
+
+        """
+        conversion = openbabel.OBConversion()
+        conversion.SetInFormat(in_format)
+        ob_mol = openbabel.OBMol()
+        LOGGER.debug("Attempting to read %s string.", in_format)
+        if not conversion.ReadString(ob_mol, input_string):
+            raise ValueError("openbabel could not read {} string".format(in_format))
+        return cls(ob_mol)
+
+    @classmethod
+    def from_file(cls, infile_name, in_format):
+        """Parse first molecule of input file.
+
+        Parameters
+        ----------
+        infile_name : str
+            filename.
+        in_format : str
+            file format.
+
+        Returns
+        -------
+        StructureConversion
+
+        Raises
+        ------
+        ValueError
+            if openbabel cannot read a molecule from the file.
+
+        """
+        conversion = openbabel.OBConversion()
+        conversion.SetInFormat(in_format)
+        ob_mol = openbabel.OBMol()
+        LOGGER.debug("Attempting to read %s file: %s", in_format, infile_name)
+        if not conversion.ReadFile(ob_mol, infile_name):
+            raise ValueError("openbabel could not read {} file {}".format(in_format, infile_name))
+        return cls(ob_mol)
+
+    def cml(self, aromatic=False):
+        """CML with unqualified attributes, as perform_conversion_from_string writes it.
+
+        Parameters
+        ----------
+        aromatic : bool, optional
+            write aromatic bonds. The default is False.
+
+        Returns
+        -------
+        str
+            CML molecule representation.
+
+        """
+        return create_cml_conversion("cml", aromatic).WriteString(openbabel.OBMol(self.ob_mol))
+
+    def sybyl_types(self):
+        """Sybyl atom types by CML atom id, as written to mol2 by openbabel.
+
+        Returns
+        -------
+        dict
+            sybyl atom type of each atom, keyed by its CML id a1, a2, ...
+
+        """
+        ob_mol = openbabel.OBMol(self.ob_mol)
+        type_table = openbabel.OBTypeTable()
+        type_table.SetFromType("INT")
+        type_table.SetToType("SYB")
+        return {"a{}".format(atom.GetIdx()): type_table.Translate(atom.GetType())
+                for atom in openbabel.OBMolAtomIter(ob_mol)}
+
+    def inchikey(self):
+        """InChIKey, with stereochemistry perceived from the 3D coordinates as
+        when reading CML.
+
+        Returns
+        -------
+        str
+            InChIKey.
+
+        """
+        ob_mol = openbabel.OBMol(self.ob_mol)
+        if ob_mol.GetDimension() == 3:
+            openbabel.StereoFrom3D(ob_mol, True)
+        return create_inchikey_conversion("cml").WriteString(ob_mol).strip()
+
+
 def generate_inchikey_for_cml(input_cml):
     """Generate InChIKey for cml in string.
 
@@ -124,6 +248,33 @@ def perform_conversion_from_file(infile_name, in_format, aromatic=False):
         return conversion.WriteString(ob_mol)
 
 
+def read_records_from_file(infile_name, in_format):
+    """Convert every molecule of a multi-record input file to CML with unqualified attributes.
+
+    Parameters
+    ----------
+    infile_name : str
+        filename.
+    in_format : str
+        file format.
+
+    Yields
+    ------
+    str
+        CML molecule representation of each record, in file order.
+
+    """
+    conversion = create_cml_conversion(in_format, False)
+    ob_mol = openbabel.OBMol()
+    LOGGER.debug("Attempting conversion of all records from %s.", in_format)
+    LOGGER.debug("filename: %s", infile_name)
+    not_at_end = conversion.ReadFile(ob_mol, infile_name)
+    while not_at_end:
+        yield conversion.WriteString(ob_mol)
+        ob_mol = openbabel.OBMol()
+        not_at_end = conversion.Read(ob_mol)
+
+
 def create_cml_conversion(in_format, aromatic):
     """Create converter object which generates CML.
 
@@ -0,0 +1,165 @@
+"""
+Bulk reader of aip.xml files into columns. Each file is streamed once with lxml iterparse,
+picking up the SSIP attributes and the first surface description as the elements end, instead
+of building AipReader's Aip objects and running an XPath query per field. The columns of all
+files are concatenated into NumPy arrays, with a molecule index linking every AIP to its file.
+Files are read in parallel over a process pool.
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree
+import numpy as np
+from filereader.cml_reader import CML_NS
+from filereader.aip_reader import SSIP_NS
+
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
+
+SSIP_TAG = f"{{{SSIP_NS}}}SSIP"
+MOLECULE_TAG = f"{{{CML_NS}}}molecule"
+SURFACE_TAG = f"{{{SSIP_NS}}}Surface"
+# SSIP attribute: (column, type)
+AIP_ATTRIBUTES = {f"{{{SSIP_NS}}}value": ("value", float),
+                  f"{{{CML_NS}}}x3": ("x", float),
+                  f"{{{CML_NS}}}y3": ("y", float),
+                  f"{{{CML_NS}}}z3": ("z", float),
+                  f"{{{SSIP_NS}}}MEPvalue": ("mepsvalue", float),
+                  f"{{{SSIP_NS}}}isosurface": ("isosurface", float),
+                  f"{{{SSIP_NS}}}aipAreaFraction": ("fraction", float),
+                  f"{{{SSIP_NS}}}aipAtomType": ("atom_type", str),
+                  f"{{{SSIP_NS}}}nearestAtomID": ("atom_name", str)}
+# Surface child element: (column, type), as read by AipSurface
+SURFACE_FIELDS = {f"{{{SSIP_NS}}}TotalSurfaceArea": ("total", float),
+                  f"{{{SSIP_NS}}}PositiveSurfaceArea": ("positive", float),
+                  f"{{{SSIP_NS}}}NegativeSurfaceArea": ("negative", float),
+                  f"{{{SSIP_NS}}}PositivePolarSurfaceArea": ("positive_polar", float),
+                  f"{{{SSIP_NS}}}NegativePolarSurfaceArea": ("negative_polar", float),
+                  f"{{{SSIP_NS}}}TotalNonPolarSurfaceArea": ("total_nonpolar", float),
+                  f"{{{SSIP_NS}}}PositiveNonPolarSurfaceArea": ("positive_nonpolar", float),
+                  f"{{{SSIP_NS}}}NegativeNonPolarSurfaceArea": ("negative_nonpolar", float),
+                  f"{{{SSIP_NS}}}NumberOFMEPSPoints": ("numberOFMEPSPoints", int),
+                  f"{{{SSIP_NS}}}ElectrostaticPotentialMax": ("electrostaticPotentialMax", float),
+                  f"{{{SSIP_NS}}}ElectrostaticPotentialMin": ("electrostaticPotentialMin", float),
+                  f"{{{SSIP_NS}}}VdWVolume": ("VdWVolume", float)}
+AIP_COLUMNS = [column for column, _ in AIP_ATTRIBUTES.values()]
+SURFACE_COLUMNS = [column for column, _ in SURFACE_FIELDS.values()]
+
+
+class AipColumns:
+    """AIPs of many aip.xml files as columns.
+
+    Attributes
+    ----------
+    aips : dict
+        per-AIP arrays: molecule_index, value, xyz (n, 3), mepsvalue, isosurface, fraction,
+        atom_type and atom_name
+    molecules : dict
+        per-file arrays: file, inchikey, the surface fields of AipSurface (NaN if missing)
+        and error (empty if the file was read)
+    """
+
+    def __init__(self, aips, molecules):
+        self.aips = aips
+        self.molecules = molecules
+
+    def __len__(self):
+        return len(self.aips["value"])
+
+    def to_dataframe(self):
+        """Per-AIP DataFrame with the molecule columns joined on molecule_index"""
+        import pandas as pd
+        aips = {k: v for k, v in self.aips.items() if k != "xyz"}
+        aips["x"], aips["y"], aips["z"] = self.aips["xyz"].T
+        molecules = pd.DataFrame(self.molecules)
+        return pd.DataFrame(aips).join(molecules, on="molecule_index")
+
+
+def read_aip_file(aip_file):
+    """Streams a single aip.xml file. Returns the InChIKey, a list of values per AIP column and
+       the surface fields, or raises if the file cannot be parsed."""
+    inchikey = None
+    aips = {column: [] for column in AIP_COLUMNS}
+    surface = {}
+    surface_done = False
+    in_surface = False
+    context = etree.iterparse(aip_file, events=("start", "end"))
+    for event, elem in context:
+        tag = elem.tag
+        if event == "start":
+            if tag == MOLECULE_TAG and inchikey is None:
+                inchikey = elem.get(f"{{{SSIP_NS}}}stdInChIKey", elem.get(f"{{{CML_NS}}}id"))
+            elif tag == SURFACE_TAG and not surface_done:
+                in_surface = True
+            continue
+        if tag == SSIP_TAG:
+            attrib = elem.attrib
+            for name, (column, _) in AIP_ATTRIBUTES.items():
+                aips[column].append(attrib[name])
+            elem.clear()
+        elif in_surface and tag in SURFACE_FIELDS:
+            column, convert = SURFACE_FIELDS[tag]
+            surface[column] = convert(elem.text)
+        elif tag == SURFACE_TAG and in_surface:
+            in_surface = False
+            surface_done = True
+    return inchikey, aips, surface
+
+
+def _read_aip_file_safe(aip_file):
+    try:
+        return read_aip_file(aip_file), ""
+    except (OSError, etree.XMLSyntaxError, KeyError, ValueError, TypeError) as err:
+        return (None, {column: [] for column in AIP_COLUMNS}, {}), f"{type(err).__name__}: {err}"
+
+
+def read_aip_files(aip_files, n_processes=None, chunksize=16):
+    """Reads many aip.xml files into columns.
+
+    Parameters
+    ----------
+    aip_files : list
+        paths of the aip.xml files
+    n_processes : int
+        default: None; size of the process pool, number of CPUs if None, 1 reads serially
+    chunksize : int
+        default: 16; number of files handed to a worker at a time
+
+    Returns
+    -------
+    columns : AipColumns
+        files that cannot be read have no AIPs and the reason in molecules["error"]
+    """
+    aip_files = list(aip_files)
+    if n_processes == 1 or len(aip_files) <= 1:
+        results = [_read_aip_file_safe(aip_file) for aip_file in aip_files]
+    else:
+        with ProcessPoolExecutor(n_processes) as pool:
+            results = list(pool.map(_read_aip_file_safe, aip_files, chunksize=chunksize))
+
+    lists = {column: [] for column in AIP_COLUMNS}
+    counts = []
+    molecules = {"file": aip_files, "inchikey": [], "error": []}
+    molecules.update({column: [] for column in SURFACE_COLUMNS})
+    for (inchikey, aips, surface), error in results:
+        for column in AIP_COLUMNS:
+            lists[column] += aips[column]
+        counts.append(len(aips["value"]))
+        molecules["inchikey"].append(inchikey)
+        molecules["error"].append(error)
+        for column in SURFACE_COLUMNS:
+            molecules[column].append(surface.get(column, np.nan))
+    failed = sum(error != "" for error in molecules["error"])
+    if failed > 0:
+        LOGGER.warning(f"\n Could not read {failed} of {len(aip_files)} aip files")
+
+    columns = {"molecule_index": np.repeat(np.arange(len(aip_files)), counts)}
+    for column, convert in AIP_ATTRIBUTES.values():
+        columns[column] = np.array(lists[column], dtype=np.float64 if convert is float else str)
+    columns["xyz"] = np.column_stack([columns.pop("x"), columns.pop("y"), columns.pop("z")]) \
+        if len(columns["value"]) > 0 else np.empty((0, 3))
+    for column in molecules:
+        dtype = np.float64 if column in SURFACE_COLUMNS else object
+        molecules[column] = np.array(molecules[column], dtype=dtype)
+    return AipColumns(columns, molecules)
@@ -1,6 +1,5 @@
 from filereader.cml_reader import CmlReader, CML_NS 
 import numpy as np
-import networkx as nx
 
 SSIP_NS = "http://www-hunter.ch.cam.ac.uk/SSIP"
 
@@ -38,7 +37,16 @@ class AipReader(CmlReader):
         aip.set_fraction(float(aip_elem.attrib[f"{{{SSIP_NS}}}aipAreaFraction"]))
         return aip
 
+    @staticmethod
+    def query_store(db_file, **conditions):
+        """Queries the AIPs of a consolidated store (filereader.aip_store) without reading any
+           aip.xml files, e.g. AipReader.query_store("aip_store.db", atom_type="O.2.am", value_below=-8)"""
+        from filereader.aip_store import AipStore
+        with AipStore(db_file) as store:
+            return store.query_aips(**conditions)
+
     def get_cml_network_all(self):
+        import networkx as nx
         network = nx.Graph()
         network.name = self.inchikey
         for atom in self.list_atoms:
@@ -0,0 +1,271 @@
+"""
+Consolidated SQLite store of AIP results. One database holds a row per molecule with its
+surface description and a row per AIP (value, MEP value, xyz, aipAtomType, isosurface,
+fraction, nearestAtomID and InChIKey), with indexes on the InChIKey and on aipAtomType and
+value, so that queries across a dataset do not need to parse any aip.xml files.
+
+Molecules are added by AIPWriter.write_file(..., store=store) as they are written, or imported
+from existing aip.xml files with add_aip_files.
+
+Run with: python -m filereader.aip_store -d aip_store.db -i aip_dir/*_aip.xml
+"""
+
+import argparse
+import logging
+import sqlite3
+import numpy as np
+from filereader.aip_reader import Aip
+from filereader.aip_bulk_reader import SURFACE_COLUMNS, read_aip_files
+
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
+
+AIP_STORE_COLUMNS = ["inchikey", "value", "mepsvalue", "x", "y", "z", "atom_type", "isosurface",
+                     "fraction", "atom_name"]
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS molecules (
+    inchikey TEXT PRIMARY KEY,
+    source TEXT,
+    {surface_columns}
+);
+CREATE TABLE IF NOT EXISTS aips (
+    inchikey TEXT NOT NULL REFERENCES molecules(inchikey) ON DELETE CASCADE,
+    value REAL,
+    mepsvalue REAL,
+    x REAL,
+    y REAL,
+    z REAL,
+    atom_type TEXT,
+    isosurface REAL,
+    fraction REAL,
+    atom_name TEXT
+);
+CREATE INDEX IF NOT EXISTS aips_inchikey ON aips (inchikey);
+CREATE INDEX IF NOT EXISTS aips_atom_type_value ON aips (atom_type, value);
+""".format(surface_columns=",\n    ".join("{} REAL".format(c) for c in SURFACE_COLUMNS))
+
+
+class StoredSurface:
+    """Surface description read from the store, with the attributes of AipSurface"""
+
+    def __init__(self, row):
+        for column, value in zip(SURFACE_COLUMNS, row):
+            setattr(self, column, value)
+
+
+def surface_values(surface):
+    """Surface columns of an AipSurface or of a foot-printing Surface, which names the non-polar
+       areas positive_non_polar and negative_non_polar"""
+    values = []
+    for column in SURFACE_COLUMNS:
+        if hasattr(surface, column):
+            value = getattr(surface, column)
+        elif column == "total_nonpolar":
+            value = surface.positive_non_polar + surface.negative_non_polar
+        else:
+            value = getattr(surface, column.replace("nonpolar", "non_polar"), None)
+        values.append(None if value is None else float(value))
+    return values
+
+
+class AipStore:
+    """SQLite database of the AIPs and surfaces of many molecules.
+
+    Parameters
+    ----------
+    db_file : string
+        path of the database, created with its tables and indexes if it does not exist
+    """
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self.connection = sqlite3.connect(db_file)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def add_molecule(self, inchikey, surface, list_aips, source=None):
+        """Adds a molecule with its surface and AIPs, replacing any earlier entry of the
+           InChIKey. list_aips holds foot-printing AIP or AipReader Aip objects."""
+        rows = [(inchikey, float(aip.value), float(aip.mepsvalue), float(aip.xyz[0][0]),
+                 float(aip.xyz[0][1]), float(aip.xyz[0][2]), str(aip.atom_type),
+                 float(aip.isosurface), float(aip.fraction), str(aip.atom_name))
+                for aip in list_aips]
+        with self.connection:
+            self.connection.execute("DELETE FROM molecules WHERE inchikey = ?", (inchikey,))
+            self._insert_molecule(inchikey, source, surface_values(surface))
+            self.connection.executemany(self._insert_aip_statement(), rows)
+
+    def add_aip_files(self, aip_files, n_processes=None):
+        """Imports aip.xml files through the bulk reader, returns the number of molecules added"""
+        columns = read_aip_files(aip_files, n_processes=n_processes)
+        molecules = columns.molecules
+        aips = columns.aips
+        added = 0
+        with self.connection:
+            for i, inchikey in enumerate(molecules["inchikey"]):
+                if molecules["error"][i] != "":
+                    LOGGER.warning("\n Skipping {}: {}".format(molecules["file"][i], molecules["error"][i]))
+                    continue
+                mask = aips["molecule_index"] == i
+                self.connection.execute("DELETE FROM molecules WHERE inchikey = ?", (inchikey,))
+                self._insert_molecule(inchikey, molecules["file"][i],
+                                      [None if np.isnan(molecules[c][i]) else float(molecules[c][i])
+                                       for c in SURFACE_COLUMNS])
+                xyz = aips["xyz"][mask]
+                self.connection.executemany(self._insert_aip_statement(), zip(
+                    [inchikey] * int(mask.sum()), aips["value"][mask].tolist(),
+                    aips["mepsvalue"][mask].tolist(), xyz[:, 0].tolist(), xyz[:, 1].tolist(),
+                    xyz[:, 2].tolist(), aips["atom_type"][mask].tolist(),
+                    aips["isosurface"][mask].tolist(), aips["fraction"][mask].tolist(),
+                    aips["atom_name"][mask].tolist()))
+                added += 1
+        return added
+
+    def _insert_molecule(self, inchikey, source, values):
+        self.connection.execute(
+            "INSERT INTO molecules (inchikey, source, {}) VALUES (?, ?, {})".format(
+                ", ".join(SURFACE_COLUMNS), ", ".join("?" * len(SURFACE_COLUMNS))),
+            [inchikey, source] + values)
+
+    @staticmethod
+    def _insert_aip_statement():
+        return "INSERT INTO aips ({}) VALUES ({})".format(
+            ", ".join(AIP_STORE_COLUMNS), ", ".join("?" * len(AIP_STORE_COLUMNS)))
+
+    def remove_molecule(self, inchikey):
+        with self.connection:
+            self.connection.execute("DELETE FROM molecules WHERE inchikey = ?", (inchikey,))
+
+    def inchikeys(self):
+        return [row[0] for row in self.connection.execute("SELECT inchikey FROM molecules ORDER BY inchikey")]
+
+    def query_aips(self, atom_type=None, inchikey=None, value_below=None, value_above=None,
+                   isosurface=None):
+        """AIPs matching all the given conditions as columns: inchikey, value, mepsvalue,
+           xyz (n, 3), atom_type, isosurface, fraction and atom_name.
+
+        Parameters
+        ----------
+        atom_type : string or list
+            default: None; aipAtomType(s) of the AIPs
+        inchikey : string or list
+            default: None; InChIKey(s) of the molecules
+        value_below : float
+            default: None; only AIPs with a value strictly below this
+        value_above : float
+            default: None; only AIPs with a value strictly above this
+        isosurface : float
+            default: None; only AIPs on this isosurface
+        """
+        conditions = []
+        parameters = []
+        for column, selection in [("atom_type", atom_type), ("inchikey", inchikey)]:
+            if selection is None:
+                continue
+            if isinstance(selection, str):
+                selection = [selection]
+            conditions.append("{} IN ({})".format(column, ", ".join("?" * len(selection))))
+            parameters += list(selection)
+        for condition, value in [("value < ?", value_below), ("value > ?", value_above),
+                                 ("isosurface = ?", isosurface)]:
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        query = "SELECT {} FROM aips".format(", ".join(AIP_STORE_COLUMNS))
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        rows = self.connection.execute(query + " ORDER BY rowid", parameters).fetchall()
+
+        columns = dict(zip(AIP_STORE_COLUMNS, zip(*rows))) if rows else \
+            {column: () for column in AIP_STORE_COLUMNS}
+        result = {}
+        for column in AIP_STORE_COLUMNS:
+            if column in ["x", "y", "z"]:
+                continue
+            dtype = str if column in ["inchikey", "atom_type", "atom_name"] else np.float64
+            result[column] = np.array(columns[column], dtype=dtype)
+        result["xyz"] = np.column_stack([np.array(columns[c], dtype=np.float64) for c in "xyz"]) \
+            if rows else np.empty((0, 3))
+        return result
+
+    def get_aips(self, inchikey):
+        """AIPs of a molecule as AipReader Aip objects, in the order they were added"""
+        list_aips = []
+        for value, mepsvalue, x, y, z, atom_type, isosurface, fraction, atom_name in self.connection.execute(
+                "SELECT {} FROM aips WHERE inchikey = ? ORDER BY rowid".format(", ".join(AIP_STORE_COLUMNS[1:])),
+                (inchikey,)):
+            aip = Aip()
+            aip.set_value(value)
+            aip.set_mepsvalue(mepsvalue)
+            aip.set_xyz(x, y, z)
+            aip.set_atom_type(atom_type)
+            aip.set_isosurface(isosurface)
+            aip.set_fraction(fraction)
+            aip.set_atom_name(atom_name)
+            list_aips.append(aip)
+        return list_aips
+
+    def get_surface(self, inchikey):
+        """Surface description of a molecule, or None if it is not in the store"""
+        row = self.connection.execute("SELECT {} FROM molecules WHERE inchikey = ?".format(
+            ", ".join(SURFACE_COLUMNS)), (inchikey,)).fetchone()
+        return None if row is None else StoredSurface(row)
+
+
+def create_parser():
+    help_text = 'Imports aip.xml files into a consolidated SQLite store of AIPs and surfaces.'
+    sign_off = 'Author: Katarzyna Joanna Zator <kz265>'
+
+    parser = argparse.ArgumentParser(description=help_text, epilog=sign_off)
+
+    parser.add_argument(
+        '--database',
+        '-d',
+        dest='database',
+        type=str,
+        default="aip_store.db",
+        action='store',
+        help='SQLite database of the store, created if it does not exist'
+    )
+    parser.add_argument(
+        '--aip_files',
+        '-i',
+        dest='aip_files',
+        type=str,
+        nargs='+',
+        default=[],
+        action='store',
+        help='aip.xml files to import, replacing earlier entries of the same InChIKey'
+    )
+    parser.add_argument(
+        '--processes',
+        '-np',
+        dest='processes',
+        type=int,
+        default=None,
+        action='store',
+        help='number of worker processes reading the files, default number of CPUs'
+    )
+    return parser
+
+
+def main():
+    args = create_parser().parse_args()
+    with AipStore(args.database) as store:
+        added = store.add_aip_files(args.aip_files, n_processes=args.processes)
+        LOGGER.info("\n Imported {} of {} aip files, {} molecules in {}".format(
+            added, len(args.aip_files), len(store.inchikeys()), args.database))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,9 @@ import logging
 import copy
 from lxml import etree
 import math
-from mendeleev import element
+from filereader.element_table import cpk_color
 import numpy as np
 import pandas as pd
-import networkx as nx
-from aip_atom_types.assign_aip_atom_types import assign_aip_atom_types
 
 logging.basicConfig()
 LOGGER = logging.getLogger(__name__)
@@ -127,11 +125,15 @@ class CmlReader:
 
 
     def _get_sybyl_dict_(self, mol2):
-        sybyl_dict = {}
-        for i in self.list_atoms:
-            for j in mol2.list_atoms:
-                if self._compare_atoms_(i, j):
-                    sybyl_dict[i.aname] = j.sybyl
+        # mol2 is a Mol2Reader matched on coordinates, or a dict of sybyl types by atom id
+        if isinstance(mol2, dict):
+            sybyl_dict = {i.aname: mol2[i.aname] for i in self.list_atoms if i.aname in mol2}
+        else:
+            sybyl_dict = {}
+            for i in self.list_atoms:
+                for j in mol2.list_atoms:
+                    if self._compare_atoms_(i, j):
+                        sybyl_dict[i.aname] = j.sybyl
         for i in [j.aname for j in self.list_atoms]:
             if i not in sybyl_dict.keys():
                 LOGGER.error(f"Atom {i} has not been assigned a sybyl atom type")
@@ -153,6 +155,7 @@ class CmlReader:
         return new_tree
     
     def get_cml_network(self, extra_info = False):
+        import networkx as nx
         network = nx.Graph()
         if extra_info:
             for atom in self.list_atoms:
@@ -167,6 +170,7 @@ class CmlReader:
         return network
     
     def get_cml_network_with_sybyl(self, mol2):
+        import networkx as nx
         sybyl_dict = self._get_sybyl_dict_(mol2)
         network = nx.Graph()
         for atom in self.list_atoms:
@@ -176,6 +180,7 @@ class CmlReader:
         return network
     
     def get_cml_with_sybyl_and_aip_atom_types(self, mol2, aromatic=False):
+        from aip_atom_types.assign_aip_atom_types import assign_aip_atom_types
         network = self.get_cml_network_with_sybyl(mol2)
         new_tree = copy.deepcopy(self.tree)
         sybyl_dict = self._get_sybyl_dict_(mol2)
@@ -218,7 +223,7 @@ class Atom:
     def set_element(self, elem):
         self.element = elem
     def set_color(self, elem):
-        self.color = str(element(elem).cpk_color)
+        self.color = str(cpk_color(elem))
     def set_xyz(self, x, y, z):
         self.xyz = np.array([x,y,z])
     def set_sybyl(self, sybyl):
@@ -1,7 +1,7 @@
 import numpy as np
 import pandas as pd
 from filereader.cml_reader import CmlReader
-import mendeleev
+from filereader.element_table import atomic_number
 
 
 class CubeReader:
@@ -102,7 +102,7 @@ class TMesh:
         cml = CmlReader(cml_file)
         string_total = ""
         for n, i in enumerate(cml.list_atoms):
-            atomic_number = str(mendeleev.element(i.element).atomic_number)
+            atomic_no = str(atomic_number(i.element))
             x = "{:.6f}".format(i.xyz[0]*scale)
             y = "{:.6f}".format(i.xyz[1]*scale)
             z = "{:.6f}".format(i.xyz[2]*scale)
@@ -112,9 +112,9 @@ class TMesh:
                 y=" "+y
             if len(z) == 8:
                 z = " " + z
-            if len(atomic_number) == 1:
-                atomic_number = " "+atomic_number
-            string_total += f"   {atomic_number}    0.000000   {x}   {y}   {z}"
+            if len(atomic_no) == 1:
+                atomic_no = " "+atomic_no
+            string_total += f"   {atomic_no}    0.000000   {x}   {y}   {z}"
             string_total += "\n"
         return string_total, len(cml.list_atoms)
     
@@ -0,0 +1,183 @@
+"""
+Precomputed element properties, shared by the readers and writers so that the mendeleev database
+is only queried for elements or properties missing from the table. Values are those of mendeleev:
+vdW and covalent (Pyykko) radii in pm, CPK colour and standard atomic weight.
+@author: Katarzyna Joanna Zator (kz265)
+"""
+
+import functools
+import numpy as np
+
+# atomic number, symbol, vdW radius, covalent radius, CPK colour, atomic weight
+ELEMENTS = (
+    (1, 'H', 110.00000000000001, 32.0, '#ffffff', 1.008),
+    (2, 'He', 140.0, 46.0, '#ffc0cb', 4.002602),
+    (3, 'Li', 182.0, 133.0, '#b22222', 6.94),
+    (4, 'Be', 153.0, 102.0, '#ff1493', 9.0121831),
+    (5, 'B', 192.0, 85.0, '#00ff00', 10.81),
+    (6, 'C', 170.0, 75.0, '#c8c8c8', 12.011),
+    (7, 'N', 155.0, 71.0, '#8f8fff', 14.007),
+    (8, 'O', 152.0, 63.0, '#f00000', 15.999),
+    (9, 'F', 147.0, 64.0, '#daa520', 18.998403163),
+    (10, 'Ne', 154.0, 67.0, '#ff1493', 20.1797),
+    (11, 'Na', 227.0, 155.0, '#0000ff', 22.98976928),
+    (12, 'Mg', 173.0, 139.0, '#228b22', 24.305),
+    (13, 'Al', 184.0, 126.0, '#808090', 26.9815385),
+    (14, 'Si', 210.0, 115.99999999999999, '#daa520', 28.085),
+    (15, 'P', 180.0, 111.00000000000001, '#ffa500', 30.973761998),
+    (16, 'S', 180.0, 103.0, '#ffc832', 32.06),
+    (17, 'Cl', 175.0, 99.0, '#00ff00', 35.45),
+    (18, 'Ar', 188.0, 96.0, '#ff1493', 39.948),
+    (19, 'K', 275.0, 196.0, '#ff1493', 39.0983),
+    (20, 'Ca', 231.0, 171.0, '#808090', 40.078),
+    (21, 'Sc', 215.0, 148.0, '#ff1493', 44.955908),
+    (22, 'Ti', 211.0, 136.0, '#808090', 47.867),
+    (23, 'V', 206.99999999999997, 134.0, '#ff1493', 50.9415),
+    (24, 'Cr', 206.0, 122.0, '#808090', 51.9961),
+    (25, 'Mn', 204.99999999999997, 119.0, '#808090', 54.938044),
+    (26, 'Fe', 204.0, 115.99999999999999, '#ffa500', 55.845),
+    (27, 'Co', 200.0, 111.00000000000001, '#ff1493', 58.933194),
+    (28, 'Ni', 197.0, 110.00000000000001, '#a52a2a', 58.6934),
+    (29, 'Cu', 196.0, 112.00000000000001, '#a52a2a', 63.546),
+    (30, 'Zn', 200.99999999999997, 118.0, '#a52a2a', 65.38),
+    (31, 'Ga', 187.0, 124.0, '#ff1493', 69.723),
+    (32, 'Ge', 211.0, 121.0, '#ff1493', 72.63),
+    (33, 'As', 185.0, 121.0, '#ff1493', 74.921595),
+    (34, 'Se', 190.0, 115.99999999999999, '#ff1493', 78.971),
+    (35, 'Br', 185.0, 113.99999999999999, '#a52a2a', 79.904),
+    (36, 'Kr', 202.0, 117.0, '#ff1493', 83.798),
+    (37, 'Rb', 303.0, 210.0, '#ff1493', 85.4678),
+    (38, 'Sr', 249.00000000000003, 185.0, '#ff1493', 87.62),
+    (39, 'Y', 231.99999999999997, 163.0, '#ff1493', 88.90584),
+    (40, 'Zr', 223.0, 154.0, '#ff1493', 91.224),
+    (41, 'Nb', 218.00000000000003, 147.0, '#ff1493', 92.90637),
+    (42, 'Mo', 217.0, 138.0, '#ff1493', 95.95),
+    (43, 'Tc', 216.0, 128.0, '#ff1493', 97.90721),
+    (44, 'Ru', 213.0, 125.0, '#ff1493', 101.07),
+    (45, 'Rh', 210.0, 125.0, '#ff1493', 102.9055),
+    (46, 'Pd', 210.0, 120.0, '#ff1493', 106.42),
+    (47, 'Ag', 211.0, 128.0, '#808090', 107.8682),
+    (48, 'Cd', 218.00000000000003, 136.0, '#ff1493', 112.414),
+    (49, 'In', 193.0, 142.0, '#ff1493', 114.818),
+    (50, 'Sn', 217.0, 140.0, '#ff1493', 118.71),
+    (51, 'Sb', 206.0, 140.0, '#ff1493', 121.76),
+    (52, 'Te', 206.0, 136.0, '#ff1493', 127.6),
+    (53, 'I', 198.0, 133.0, '#a020f0', 126.90447),
+    (54, 'Xe', 216.0, 131.0, '#ff1493', 131.293),
+    (55, 'Cs', 343.0, 231.99999999999997, '#ff1493', 132.90545196),
+    (56, 'Ba', 268.0, 196.0, '#ffa500', 137.327),
+    (57, 'La', 243.00000000000003, 180.0, '#ff1493', 138.90547),
+    (58, 'Ce', 242.0, 163.0, '#ff1493', 140.116),
+    (59, 'Pr', 240.0, 176.0, '#ff1493', 140.90766),
+    (60, 'Nd', 239.0, 174.0, '#ff1493', 144.242),
+    (61, 'Pm', 238.0, 173.0, '#ff1493', 144.91276),
+    (62, 'Sm', 236.0, 172.0, '#ff1493', 150.36),
+    (63, 'Eu', 235.0, 168.0, '#ff1493', 151.964),
+    (64, 'Gd', 234.0, 169.0, '#ff1493', 157.25),
+    (65, 'Tb', 233.0, 168.0, '#ff1493', 158.92535),
+    (66, 'Dy', 231.0, 167.0, '#ff1493', 162.5),
+    (67, 'Ho', 229.99999999999997, 166.0, '#ff1493', 164.93033),
+    (68, 'Er', 229.0, 165.0, '#ff1493', 167.259),
+    (69, 'Tm', 227.0, 164.0, '#ff1493', 168.93422),
+    (70, 'Yb', 225.99999999999997, 170.0, '#ff1493', 173.045),
+    (71, 'Lu', 224.00000000000003, 162.0, '#ff1493', 174.9668),
+    (72, 'Hf', 223.0, 152.0, '#ff1493', 178.49),
+    (73, 'Ta', 222.00000000000003, 146.0, '#ff1493', 180.94788),
+    (74, 'W', 218.00000000000003, 137.0, '#ff1493', 183.84),
+    (75, 'Re', 216.0, 131.0, '#ff1493', 186.207),
+    (76, 'Os', 216.0, 129.0, '#ff1493', 190.23),
+    (77, 'Ir', 213.0, 122.0, '#ff1493', 192.217),
+    (78, 'Pt', 213.0, 123.0, '#ff1493', 195.084),
+    (79, 'Au', 214.0, 124.0, '#daa520', 196.966569),
+    (80, 'Hg', 223.0, 133.0, '#ff1493', 200.592),
+    (81, 'Tl', 196.0, 144.0, '#ff1493', 204.38),
+    (82, 'Pb', 202.0, 144.0, '#ff1493', 207.2),
+    (83, 'Bi', 206.99999999999997, 151.0, '#ff1493', 208.9804),
+    (84, 'Po', 197.0, 145.0, '#ff1493', 209.0),
+    (85, 'At', 202.0, 147.0, '#ff1493', 210.0),
+    (86, 'Rn', 220.00000000000003, 142.0, '#ffffff', 222.0),
+    (87, 'Fr', 348.0, 223.0, '#ffffff', 223.0),
+    (88, 'Ra', 283.0, 200.99999999999997, '#ffffff', 226.0),
+    (89, 'Ac', 247.00000000000003, 186.0, '#ffffff', 227.0),
+    (90, 'Th', 245.00000000000003, 175.0, '#ff1493', 232.0377),
+    (91, 'Pa', 243.00000000000003, 169.0, '#ffffff', 231.03588),
+    (92, 'U', 241.0, 170.0, '#ff1493', 238.02891),
+    (93, 'Np', 239.0, 171.0, '#ffffff', 237.0),
+    (94, 'Pu', 243.00000000000003, 172.0, '#ffffff', 244.0),
+    (95, 'Am', 244.0, 166.0, '#ffffff', 243.0),
+    (96, 'Cm', 245.00000000000003, 166.0, '#ffffff', 247.0),
+    (97, 'Bk', 244.0, 168.0, '#ffffff', 247.0),
+    (98, 'Cf', 245.00000000000003, 168.0, '#ffffff', 251.0),
+    (99, 'Es', 245.00000000000003, 165.0, '#ffffff', 252.0),
+    (100, 'Fm', 245.00000000000003, 167.0, '#ffffff', 257.0),
+    (101, 'Md', 246.0, 173.0, '#ffffff', 258.0),
+    (102, 'No', 246.0, 176.0, '#ffffff', 259.0),
+    (103, 'Lr', 246.0, 161.0, '#ffffff', 262.0),
+    (104, 'Rf', None, 157.0, None, 267.0),
+    (105, 'Db', None, 149.0, None, 268.0),
+    (106, 'Sg', None, 143.0, None, 271.0),
+    (107, 'Bh', None, 141.0, None, 274.0),
+    (108, 'Hs', None, 134.0, None, 269.0),
+    (109, 'Mt', None, 129.0, None, 276.0),
+    (110, 'Ds', None, 128.0, None, 281.0),
+    (111, 'Rg', None, 121.0, None, 281.0),
+    (112, 'Cn', None, 122.0, None, 285.0),
+    (113, 'Nh', None, 136.0, None, 286.0),
+    (114, 'Fl', None, 143.0, None, 289.0),
+    (115, 'Mc', None, 162.0, None, 288.0),
+    (116, 'Lv', None, 175.0, None, 293.0),
+    (117, 'Ts', None, 165.0, None, 294.0),
+    (118, 'Og', None, 157.0, None, 294.0),
+)
+
+SYMBOLS = [""] + [e[1] for e in ELEMENTS]
+ATOMIC_NUMBERS = {e[1]: e[0] for e in ELEMENTS}
+# arrays indexed by atomic number, NaN where the value is not known
+VDW_RADIUS = np.array([np.nan] + [np.nan if e[2] is None else e[2] for e in ELEMENTS])
+COVALENT_RADIUS = np.array([np.nan] + [np.nan if e[3] is None else e[3] for e in ELEMENTS])
+ATOMIC_WEIGHT = np.array([np.nan] + [np.nan if e[5] is None else e[5] for e in ELEMENTS])
+CPK_COLOR = [None] + [e[4] for e in ELEMENTS]
+
+_COLUMNS = {"vdw_radius": 2, "covalent_radius": 3, "cpk_color": 4, "atomic_weight": 5}
+
+
+def atomic_number(elem):
+    """Atomic number of an element given by symbol or atomic number"""
+    if isinstance(elem, str):
+        if elem in ATOMIC_NUMBERS:
+            return ATOMIC_NUMBERS[elem]
+        return _mendeleev_property(elem, "atomic_number")
+    return int(elem)
+
+
+def get_property(elem, name):
+    """Property of an element given by symbol or atomic number, looked up in the table
+       and otherwise in mendeleev"""
+    z = ATOMIC_NUMBERS.get(elem) if isinstance(elem, str) else int(elem)
+    if z is not None and 0 < z <= len(ELEMENTS):
+        value = ELEMENTS[z - 1][_COLUMNS[name]]
+        if value is not None:
+            return value
+    return _mendeleev_property(elem, name)
+
+
+def vdw_radius(elem):
+    return get_property(elem, "vdw_radius")
+
+
+def covalent_radius(elem):
+    return get_property(elem, "covalent_radius")
+
+
+def cpk_color(elem):
+    return get_property(elem, "cpk_color")
+
+
+def atomic_weight(elem):
+    return get_property(elem, "atomic_weight")
+
+
+@functools.lru_cache(maxsize=None)
+def _mendeleev_property(elem, name):
+    from mendeleev import element
+    return getattr(element(elem), name)
@@ -1,5 +1,5 @@
 import copy
-from mendeleev import element
+from filereader.element_table import cpk_color
 import pandas as pd
 import numpy as np
 
@@ -119,6 +119,6 @@ class Atom:
     def set_element(self, elem):
         self.element = elem
     def set_color(self, elem):
-        self.color = str(element(elem).cpk_color)
+        self.color = str(cpk_color(elem))
     def set_xyz(self, x, y, z):
         self.xyz = np.array([x,y,z])
@@ -16,14 +16,20 @@ XSI_NAME = "{{{}}}".format(CML_NAMESPACE_DICT["xsi"])
 class AIPWriter():
     def __init__(self, cml_file):
         parser = etree.XMLParser(remove_blank_text=True)
-        parsed_tree = copy.deepcopy(etree.parse(cml_file, parser))
+        parsed_tree = etree.parse(cml_file, parser)
+        super_element = self.new_root_element()
+        super_element.append(parsed_tree.getroot())
+        self.tree = etree.ElementTree(super_element)
+        self.inchikey = self.get_inchikey()
+
+    @staticmethod
+    def new_root_element():
+        """Empty SSIPMolecule element that wraps the molecule in an AIP file"""
         super_element = etree.Element(SSIP_NAME+"SSIPMolecule", nsmap=CML_NAMESPACE_DICT)
         super_element.attrib[SSIP_NAME + "ssipSoftwareVersion"] = "0.0.0-newssip"
         super_element.attrib[SSIP_NAME + "parameterVersion"] = "3.0.0"
         super_element.attrib[XSI_NAME + "schemaLocation"] = "http://www.xml-cml.org/schema http://www-hunter.ch.cam.ac.uk/schema/cmlschema_KMC.xsd http://www-hunter.ch.cam.ac.uk/SSIP http://www-hunter.ch.cam.ac.uk/schema/SSIP_KMC.xsd"
-        super_element.append(parsed_tree.getroot())
-        self.tree = etree.ElementTree(super_element)
-        self.inchikey = self.get_inchikey()
+        return super_element
 
     def get_inchikey(self):
         molecule_elem = self.tree.xpath("//cml:molecule", namespaces=CML_NAMESPACE_DICT)
@@ -31,7 +37,12 @@ class AIPWriter():
 
     def add_surface_information(self, tree, surface):
         new_tree = copy.deepcopy(tree)
-        root = new_tree.getroot()
+        self.append_surface_element(new_tree.getroot(), surface)
+        return new_tree
+
+    @staticmethod
+    def append_surface_element(root, surface):
+        """Appends the SurfaceInformation element to root in place and returns it"""
         aips_element = etree.SubElement(root, SSIP_NAME+"SurfaceInformation", nsmap=CML_NAMESPACE_DICT)
         surfaces_element = etree.SubElement(aips_element, SSIP_NAME+"Surfaces", nsmap=CML_NAMESPACE_DICT)
         surface_element = etree.SubElement(surfaces_element, SSIP_NAME+"Surface", nsmap=CML_NAMESPACE_DICT)
@@ -70,11 +81,15 @@ class AIPWriter():
         vdw_volume_element = etree.SubElement(surface_element, SSIP_NAME+"VdWVolume", nsmap=CML_NAMESPACE_DICT)
         vdw_volume_element.text = str(surface.VdWVolume)
         vdw_volume_element.attrib[SSIP_NAME + "unit"] = "Å^3"
-        return new_tree
+        return aips_element
 
     def add_aip_information(self, tree, list_aips, dual=False):
         new_tree = copy.deepcopy(tree)
-        root = new_tree.getroot()
+        self.append_aip_elements(new_tree.getroot(), list_aips, dual)
+        return new_tree
+
+    def append_aip_elements(self, root, list_aips, dual=False):
+        """Appends the SSIPs element with one SSIP per AIP to root in place and returns it"""
         aips_element = etree.SubElement(root, SSIP_NAME+"SSIPs", nsmap=CML_NAMESPACE_DICT)
         for i, aip in enumerate(list_aips):
             if dual is not False:
@@ -85,21 +100,38 @@ class AIPWriter():
                 self.add_aip_element(aips_element, aip, dual=True)
             else:
                 self.add_aip_element(aips_element, aip)
-        return new_tree
+        return aips_element
 
     def get_surface_aip_tree(self, surface, list_aips, dual=False):
-        surface_tree = self.add_surface_information(self.tree, surface)
-        aip_tree = self.add_aip_information(surface_tree, list_aips, dual)
+        aip_tree = copy.deepcopy(self.tree)
+        root = aip_tree.getroot()
+        self.append_surface_element(root, surface)
+        self.append_aip_elements(root, list_aips, dual)
         return aip_tree
 
-    def write_file(self, surface, list_aips, filename, dual=False):
-        if dual is not False: 
-            new_tree = self.get_surface_aip_tree(surface, list_aips, dual)
-        else:
-            new_tree = self.get_surface_aip_tree(surface, list_aips)
-        new_tree.write(filename, encoding="UTF-8", xml_declaration=True, pretty_print=True)
-    
-    
+    def write_file(self, surface, list_aips, filename, dual=False, store=None):
+        """Writes the molecule with its surface and AIP information. The molecule element is
+           moved into a fresh root for serialisation and moved back afterwards, so neither the
+           parsed tree nor the new elements are copied. With a store (filereader.aip_store.AipStore)
+           the molecule is also added to it."""
+        root = self.tree.getroot()
+        molecule_elements = list(root)
+        file_root = self.new_root_element()
+        file_root.extend(molecule_elements)
+        try:
+            self.append_surface_element(file_root, surface)
+            self.append_aip_elements(file_root, list_aips, dual)
+            etree.ElementTree(file_root).write(filename, encoding="UTF-8", xml_declaration=True,
+                                               pretty_print=True)
+        finally:
+            root.extend(molecule_elements)
+        if store is not None:
+            self.append_to_store(store, surface, list_aips, source=filename)
+
+    def append_to_store(self, store, surface, list_aips, source=None):
+        """Adds the molecule's surface and AIPs to an AipStore under its InChIKey"""
+        store.add_molecule(self.inchikey, surface, list_aips, source=source)
+
     @staticmethod
     def add_aip_element(aips_elem, aip, dual=False):
         element = etree.SubElement(aips_elem, SSIP_NAME+"SSIP", nsmap=CML_NAMESPACE_DICT)
@@ -121,3 +153,27 @@ class AIPWriter():
             element.attrib[SSIP_NAME +"MEPvalueMax"] = str(aip.mepsvalue_max)
         return
 
+
+def write_aip_files(molecules):
+    """Writes the AIP files of many molecules in one call.
+
+    Parameters
+    ----------
+    molecules : iterable
+        tuples of (cml_file, surface, list_aips, filename) or
+        (cml_file, surface, list_aips, filename, dual); the molecules sharing a .cml file
+        also share its parsed tree
+
+    Returns
+    -------
+    filenames : list
+        the files written, in input order
+    """
+    writers = {}
+    filenames = []
+    for cml_file, surface, list_aips, filename, *dual in molecules:
+        if cml_file not in writers:
+            writers[cml_file] = AIPWriter(cml_file)
+        writers[cml_file].write_file(surface, list_aips, filename, *dual)
+        filenames.append(filename)
+    return filenames
@@ -1,14 +1,11 @@
-import networkx as nx
-from networkx.algorithms import shortest_path_length
 import numpy as np
 from lxml import etree
 import logging
 import copy
 import time
-import networkx.algorithms.isomorphism as iso
-from mendeleev import element
+from filereader.element_table import atomic_weight
 from filereader.aip_reader import AipReader, SSIP_NS, CML_NS
-from filewriter.compute_virtual_sites import get_weights, get_anchors
+from filewriter.compute_virtual_sites import get_weights, get_anchors, get_hop_distances
 
 
 logging.basicConfig()
@@ -122,7 +119,7 @@ class AipFFWriter(AipReader):
             types.attrib["name"] = "ligand-{}".format(k)
             types.attrib["element"] = "{}".format(v.element)
             types.attrib["mass"] = "{}".format(
-                element(v.element).atomic_weight)
+                atomic_weight(v.element))
         residues = etree.SubElement(tree, "Residues")
         residue = etree.SubElement(residues, "Residue")
         residue.attrib["name"] = self.resname
@@ -188,9 +185,10 @@ class AipFFWriter(AipReader):
     def set_anchors_weights(self, list_aips):
         virtual_site_ssip_list = []
         ssip_none = []
+        hop_distances = get_hop_distances(self.network)
         for aip in list_aips:
             anchor1, anchor2, anchor3 = get_anchors(
-                aip.atom_neigh, self.network, self.dict_atoms)
+                aip.atom_neigh, self.network, self.dict_atoms, hop_distances)
             weights = get_weights(aip, anchor1, anchor2, anchor3)
             aip.set_anchors(anchor1, anchor2, anchor3)
             aip.set_weights(weights)
@@ -1,14 +1,11 @@
-import networkx as nx
-from networkx.algorithms import shortest_path_length
 import numpy as np
 from lxml import etree
 import logging
 import copy
 import time
-import networkx.algorithms.isomorphism as iso
-from mendeleev import element
+from filereader.element_table import atomic_weight
 from filereader.aip_reader import AipReader, SSIP_NS, CML_NS
-from filewriter.compute_virtual_sites import get_average_weights, get_average_anchors
+from filewriter.compute_virtual_sites import get_average_weights_batch, get_average_anchors, format_weight
 
 
 logging.basicConfig()
@@ -100,9 +97,9 @@ class AipFFWriter(AipReader):
             vs_element.attrib["atomName1"] = ssip.anchor1.aname
             vs_element.attrib["atomName2"] = ssip.anchor2.aname
             vs_element.attrib["atomName3"] = ssip.anchor3.aname
-            vs_element.attrib["weight1"] = str(round(ssip.weights[0], 3))
-            vs_element.attrib["weight2"] = str(round(ssip.weights[1], 3))
-            vs_element.attrib["weight3"] = str(round(ssip.weights[2], 3))
+            vs_element.attrib["weight1"] = format_weight(ssip.weights[0])
+            vs_element.attrib["weight2"] = format_weight(ssip.weights[1])
+            vs_element.attrib["weight3"] = format_weight(ssip.weights[2])
         return vs_tree
 
     def get_atom_tree(self, ssip_file):
@@ -122,7 +119,7 @@ class AipFFWriter(AipReader):
             types.attrib["name"] = "ligand-{}".format(k)
             types.attrib["element"] = "{}".format(v.element)
             types.attrib["mass"] = "{}".format(
-                element(v.element).atomic_weight)
+                atomic_weight(v.element))
         residues = etree.SubElement(tree, "Residues")
         residue = etree.SubElement(residues, "Residue")
         residue.attrib["name"] = self.resname
@@ -191,10 +188,12 @@ class AipFFWriter(AipReader):
     staticmethod
 
     def set_anchors_weights(self, list_aips):
-        virtual_site_ssip_list = []
-        ssip_none = []
-        for aip in list_aips:
-            anchor1, anchor2, anchor3 = get_average_anchors(self.dict_atoms)
-            weights = get_average_weights(aip, anchor1, anchor2, anchor3)
+        anchor1, anchor2, anchor3 = get_average_anchors(self.dict_atoms)
+        if len(list_aips) == 0:
+            return
+        weights = get_average_weights_batch(
+            np.vstack([aip.xyz for aip in list_aips]),
+            np.vstack([anchor1.xyz, anchor2.xyz, anchor3.xyz]))
+        for aip, aip_weights in zip(list_aips, weights):
             aip.set_anchors(anchor1, anchor2, anchor3)
-            aip.set_weights(weights)
+            aip.set_weights(aip_weights)
@@ -1,8 +1,8 @@
-from networkx.algorithms import shortest_path_length
+import math
 import numpy as np
-import sympy as sym
 import logging
 import time
+from decimal import Decimal, ROUND_HALF_EVEN
 
 
 logging.basicConfig()
@@ -29,35 +29,52 @@ def compute_weights(ssip_coord, r1, r12, r13, rcross):
     return np.dot(transf_matrix, a)
 
 
-def get_anchors(neigh, network, dict_atom):
+def get_hop_distances(network):
+    """Number of bonds between every pair of atoms of the network, from one breadth-first search
+       per atom: {source: {target: hops}}"""
+    from networkx import all_pairs_shortest_path_length
+    return dict(all_pairs_shortest_path_length(network))
+
+
+def get_anchors(neigh, network, dict_atom, hop_distances=None):
+    """Anchor atoms of the virtual site of an AIP on neigh: neigh itself and the two atoms
+       closest to it in the bond network (at most one of them a hydrogen), replacing the second
+       one if the three are collinear. Atoms at the same distance are taken in network order.
+       hop_distances (see get_hop_distances) can be shared between the AIPs of a molecule,
+       otherwise a single breadth-first search from neigh is run."""
+    if hop_distances is None:
+        from networkx import single_source_shortest_path_length
+        hops = single_source_shortest_path_length(network, neigh.aname)
+    else:
+        hops = hop_distances[neigh.aname]
+    # atoms grouped by their distance to neigh, in network order
+    levels = {}
+    for i in network.nodes:
+        levels.setdefault(hops.get(i), []).append(i)
     anchor_list = []
     h_num = 0
     j = 0
     if neigh.element == 'H':
         h_num += 1
-    #start = time.time()
     while len(anchor_list) < 2 and j < 3:
         j += 1
-        for i in list(network.nodes):
-            if shortest_path_length(network, source=neigh.aname, target=i, weight=None, method='dijkstra') == j:
-                if dict_atom[i].element == 'H':
-                    h_num += 1
-                if h_num < 2 and dict_atom[i].element == 'H':
-                    anchor_list.append(i)
-                elif dict_atom[i].element != 'H':
-                    anchor_list.append(i)
+        for i in levels.get(j, []):
+            if dict_atom[i].element == 'H':
+                h_num += 1
+            if h_num < 2 and dict_atom[i].element == 'H':
+                anchor_list.append(i)
+            elif dict_atom[i].element != 'H':
+                anchor_list.append(i)
     if len(anchor_list) < 2:
         j = 0
         while len(anchor_list) < 2 and j < 3:
             j += 1
-            for i in list(network.nodes):
-                if shortest_path_length(network, source=neigh.aname, target=i, weight=None, method='dijkstra') == j and i not in anchor_list:
+            for i in levels.get(j, []):
+                if i not in anchor_list:
                     anchor_list.append(i)
     if len(anchor_list) >= 2 and 0.0 < compute_cross(neigh.xyz, dict_atom[anchor_list[0]].xyz, dict_atom[anchor_list[1]].xyz) < 0.01:
-        for i in list(network.nodes):
-            short_path = shortest_path_length(
-                network, source=neigh.aname, target=i, weight=None, method='dijkstra')
-            if short_path > 1 and i not in anchor_list:
+        for i in network.nodes:
+            if i in hops and hops[i] > 1 and i not in anchor_list:
                 anchor_list.append(i)
         anchor_list.remove(anchor_list[1])
     elif len(anchor_list) < 2:
@@ -86,14 +103,73 @@ def get_average_anchors(dict_atom):
 
 
 def get_average_weights(ssip, anchor1, anchor2, anchor3):
-    A, B, C = sym.symbols('A,B,C')
-    eq1 = sym.Eq(A*anchor1.xyz[0] + B*anchor2.xyz[0] +
-                 C*anchor3.xyz[0], ssip.xyz[0][0])
-    eq2 = sym.Eq(A*anchor1.xyz[1] + B*anchor2.xyz[1] +
-                 C*anchor3.xyz[1], ssip.xyz[0][1])
-    eq3 = sym.Eq(A*anchor1.xyz[2] + B*anchor2.xyz[2] +
-                 C*anchor3.xyz[2], ssip.xyz[0][2])
-    result = sym.solve([eq1, eq2, eq3], (A, B, C))
-    weights = np.array([v for v in result.values()])
-
+    weights = get_average_weights_batch(
+        ssip.xyz, np.vstack([anchor1.xyz, anchor2.xyz, anchor3.xyz]))
+    return weights[0]
+
+
+def get_average_weights_batch(ssip_xyz, anchor_xyz, max_condition=1e12):
+    """Weights A, B and C of the average3 virtual sites, A*r1 + B*r2 + C*r3 = r_ssip, for
+       many SSIPs in one numpy.linalg.solve call.
+
+    Parameters
+    ----------
+    ssip_xyz : np.array
+        (n, 3) coordinates of the SSIPs
+    anchor_xyz : np.array
+        (3, 3) coordinates of the anchors shared by all SSIPs, one anchor per row,
+        or (n, 3, 3) anchors of each SSIP
+    max_condition : float
+        default: 1e12; anchor sets with a larger condition number, collinear or coplanar
+        with the origin, have no unique weights and are given the minimum-norm
+        least-squares weights instead
+
+    Returns
+    -------
+    weights : np.array
+        (n, 3) weights of the three anchors
+    """
+    ssip_xyz = np.asarray(ssip_xyz, dtype=float).reshape(-1, 3)
+    anchor_xyz = np.asarray(anchor_xyz, dtype=float)
+    matrices = np.broadcast_to(np.swapaxes(anchor_xyz, -1, -2), (len(ssip_xyz), 3, 3))
+    weights = np.empty((len(ssip_xyz), 3))
+    if len(ssip_xyz) == 0:
+        return weights
+    with np.errstate(divide="ignore", invalid="ignore"):
+        condition = np.linalg.cond(matrices)
+    regular = np.isfinite(condition) & (condition < max_condition)
+    if regular.any():
+        weights[regular] = np.linalg.solve(matrices[regular], ssip_xyz[regular][:, :, None])[:, :, 0]
+    degenerate = np.flatnonzero(~regular)
+    if len(degenerate) > 0:
+        LOGGER.warning("\n Degenerate anchors for virtual sites {}, using least-squares weights".format(
+            degenerate.tolist()))
+    for i in degenerate:
+        weights[i] = np.linalg.lstsq(matrices[i], ssip_xyz[i], rcond=None)[0]
     return weights
+
+
+def format_weight(weight, decimals=3):
+    """Weight rounded to decimals places, written as str(round(sympy.Float(weight), decimals))
+       wrote it: 15 significant digits for whole numbers and the significant digits up to the
+       rounding position otherwise"""
+    weight = float(weight)
+    if weight == 0.0:
+        return "0.0"
+    magnitude = math.floor(math.log10(abs(weight))) + 1
+    if abs(weight) / 10.0**magnitude >= 1:
+        magnitude += 1
+    # the weight is known to 15 significant digits, the 16th only decides ties
+    shift = 15 - magnitude
+    known = Decimal("{:.15e}".format(weight)).scaleb(shift).to_integral_value(rounding=ROUND_HALF_EVEN)
+    rounded = known.scaleb(-shift).quantize(Decimal(1).scaleb(-decimals), rounding=ROUND_HALF_EVEN)
+    if rounded == 0:
+        return "0.0"
+    if rounded == rounded.to_integral_value():
+        return "{:.{}f}".format(rounded, max(14 - rounded.adjusted(), 0))
+    significant = magnitude + decimals
+    if significant == 0 and rounded > Decimal(weight):
+        significant = 1
+    if significant <= 0:
+        return "{}0.e{}".format("-" if rounded < 0 else "", rounded.adjusted())
+    return "{:.{}f}".format(rounded, significant - rounded.adjusted() - 1)
@@ -1,6 +1,7 @@
 from lxml import etree
 import copy
 import os
+import numpy as np
 from filereader.aip_reader import AipReader
 
 CML_NAMESPACE_DICT = {
@@ -27,21 +28,31 @@ class PhaseTransferSsipWriter():
     def __init__(self, ssip_file):
         parser = etree.XMLParser(remove_blank_text=True)
         self.aip= AipReader(ssip_file)
+        self.tree = etree.ElementTree(self.new_root_element())
+        self._molecule_root = None
+
+    @staticmethod
+    def new_root_element():
+        """Empty SSIPMolecule element that wraps the molecule in an SSIP file"""
         super_element = etree.Element(SSIP_NAME+"SSIPMolecule", nsmap=CML_NAMESPACE_DICT)
         super_element.attrib[SSIP_NAME + "ssipSoftwareVersion"] = "0.0.0-newssip"
         super_element.attrib[SSIP_NAME + "parameterVersion"] = "3.0.0"
         super_element.attrib[XSI_NAME + "schemaLocation"] = "http://www.xml-cml.org/schema http://www-hunter.ch.cam.ac.uk/schema/cmlschema.xsd http://www-hunter.ch.cam.ac.uk/SSIP http://www-hunter.ch.cam.ac.uk/schema/SSIP.xsd"
-        self.tree = etree.ElementTree(super_element)
+        return super_element
     
     def add_molecule(self, tree):
         new_tree = copy.deepcopy(tree)
-        root = new_tree.getroot()
+        self.append_molecule_element(new_tree.getroot())
+        return new_tree
+
+    def append_molecule_element(self, root):
+        """Appends the molecule element with its atom and bond arrays to root in place and returns it"""
         molecule_element = etree.SubElement(root, CML_NAME+"molecule", nsmap=CML_NAMESPACE_DICT)
         molecule_element.attrib[CML_NAME + "id"] = str(self.aip.inchikey)
         molecule_element.attrib[SSIP_NAME + "stdInChIKey"] = str(self.aip.inchikey)
         self.add_atom_array(molecule_element)
         self.add_bond_array(molecule_element)
-        return new_tree
+        return molecule_element
 
     def add_atom_array(self, molecule_element):
         atom_array_element = etree.SubElement(molecule_element, CML_NAME+"atomArray", nsmap=CML_NAMESPACE_DICT)
@@ -78,7 +89,12 @@ class PhaseTransferSsipWriter():
         
     def add_surface_information(self, tree, surface):
         new_tree = copy.deepcopy(tree)
-        root = new_tree.getroot()
+        self.append_surface_element(new_tree.getroot(), surface)
+        return new_tree
+
+    @staticmethod
+    def append_surface_element(root, surface):
+        """Appends the SurfaceInformation element to root in place and returns it"""
         aips_element = etree.SubElement(root, SSIP_NAME+"SurfaceInformation", nsmap=CML_NAMESPACE_DICT)
         surfaces_element = etree.SubElement(aips_element, SSIP_NAME+"Surfaces", nsmap=CML_NAMESPACE_DICT)
         surface_element = etree.SubElement(surfaces_element, SSIP_NAME+"Surface", nsmap=CML_NAMESPACE_DICT)
@@ -106,40 +122,63 @@ class PhaseTransferSsipWriter():
         minimum_element.text = str(surface.electrostaticPotentialMin)
         minimum_element.attrib[SSIP_NAME + "unit"] = "hartree"
 
-        return new_tree
+        return aips_element
 
     def add_aip_information(self, tree, list_aips):
         new_tree = copy.deepcopy(tree)
-        root = new_tree.getroot()
+        self.append_aip_elements(new_tree.getroot(), list_aips)
+        return new_tree
+
+    def append_aip_elements(self, root, list_aips):
+        """Appends the SSIPs element with one SSIP per AIP to root in place and returns it"""
         aips_element = etree.SubElement(root, SSIP_NAME+"SSIPs", nsmap=CML_NAMESPACE_DICT)
         for aip in list_aips:
             self.add_aip_element(aips_element, aip)
-        return new_tree
+        return aips_element
     
     @staticmethod
     def add_aip_element(aips_elem, aip):
         element = etree.SubElement(aips_elem, SSIP_NAME+"SSIP", nsmap=CML_NAMESPACE_DICT)
         element.attrib[SSIP_NAME + "value"] = str(aip.value)
         element.attrib[SSIP_NAME + "nearestAtomID"] = str(aip.atom_neigh.aname)
-        element.attrib[CML_NAME + "x3"] = str(aip.xyz[0])
-        element.attrib[CML_NAME + "y3"] = str(aip.xyz[1])
-        element.attrib[CML_NAME + "z3"] = str(aip.xyz[2])
+        xyz = np.ravel(aip.xyz)
+        element.attrib[CML_NAME + "x3"] = str(xyz[0])
+        element.attrib[CML_NAME + "y3"] = str(xyz[1])
+        element.attrib[CML_NAME + "z3"] = str(xyz[2])
         return
     
     
     def get_aip_tree(self, surface, list_aips):
-        tree = copy.deepcopy(self.tree)
-        molecule_tree = self.add_molecule(tree)
-        surface_tree = self.add_surface_information(molecule_tree, surface)
-        aip_tree = self.add_aip_information(surface_tree, list_aips)
+        aip_tree = copy.deepcopy(self.tree)
+        root = aip_tree.getroot()
+        self.append_molecule_element(root)
+        self.append_surface_element(root, surface)
+        self.append_aip_elements(root, list_aips)
         return aip_tree
 
+    def write_aip_file(self, list_aips, filename):
+        """Writes the molecule, surface and list_aips. The molecule and surface elements are built
+           once per writer and moved into a fresh root for each file, so no tree is copied."""
+        if self._molecule_root is None:
+            self._molecule_root = self.new_root_element()
+            self.append_molecule_element(self._molecule_root)
+            self.append_surface_element(self._molecule_root, self.aip.surface)
+        molecule_elements = list(self._molecule_root)
+        file_root = self.new_root_element()
+        file_root.extend(molecule_elements)
+        try:
+            self.append_aip_elements(file_root, list_aips)
+            etree.ElementTree(file_root).write(filename, encoding="UTF-8", xml_declaration=True,
+                                               pretty_print=True)
+        finally:
+            self._molecule_root.extend(molecule_elements)
+
     def get_all_aips_tree(self):
         new_tree = self.get_aip_tree(self.aip.surface, self.aip.list_aips)
         return new_tree
     
     def get_whole_aips_tree(self):
-        list_whole = [i for i in self.aip.list_aips if i.aipAreaFraction == 1.0]
+        list_whole = [i for i in self.aip.list_aips if i.fraction == 1.0]
         new_tree = self.get_aip_tree(self.aip.surface, list_whole)
         return new_tree
     
@@ -149,17 +188,15 @@ class PhaseTransferSsipWriter():
         return new_tree0, new_tree1
     
     def write_all_aips_file(self, filename):
-        new_tree = self.get_all_aips_tree()
-        new_tree.write(filename, encoding="UTF-8", xml_declaration=True, pretty_print=True)        
+        self.write_aip_file(self.aip.list_aips, filename)
 
     def write_whole_aips_file(self, filename):
-        new_tree = self.get_whole_aips_tree()
-        new_tree.write(filename, encoding="UTF-8", xml_declaration=True, pretty_print=True)
+        list_whole = [i for i in self.aip.list_aips if i.fraction == 1.0]
+        self.write_aip_file(list_whole, filename)
         
     def write_split_half_aips_file(self, filename0, filename1):
-        new_tree0, new_tree1 = self.get_split_half_aips_tree()
-        new_tree0.write(filename0, encoding="UTF-8", xml_declaration=True, pretty_print=True)
-        new_tree1.write(filename1, encoding="UTF-8", xml_declaration=True, pretty_print=True)
+        self.write_aip_file([self.aip.list_aips[0]], filename0)
+        self.write_aip_file(self.aip.list_aips[1:], filename1)
     
     def write_files(self, directory):
         isExist = os.path.exists(directory)
@@ -167,10 +204,21 @@ class PhaseTransferSsipWriter():
             os.makedirs(directory)
         filename_a = self.aip.inchikey[:26] + "A" + "_ssip.xml"
         filename_b = self.aip.inchikey[:26] + "B" + "_ssip.xml"
-        list_whole = [i for i in self.aip.list_aips if i.aipAreaFraction == 1.0]
+        list_whole = [i for i in self.aip.list_aips if i.fraction == 1.0]
         if len(list_whole) > 0: 
             self.write_all_aips_file(directory + "/" + filename_a)
             self.write_whole_aips_file(directory + "/" + filename_b)
         else:
             self.write_split_half_aips_file(directory + "/" + filename_a, directory + "/" + filename_b)
 
+
+def write_phase_transfer_files(ssip_files, directory):
+    """Writes the A and B phase transfer SSIP files of many molecules into directory in one call
+       and returns the input files that could not be converted, with the error raised"""
+    failed = []
+    for ssip_file in ssip_files:
+        try:
+            PhaseTransferSsipWriter(ssip_file).write_files(directory)
+        except Exception as err:
+            failed.append((ssip_file, err))
+    return failed
@@ -0,0 +1,56 @@
+"""
+Benchmark of assign_aip_atom_types with the compiled functional group patterns against the
+previous GraphMatcher enumeration of every embedding of every pattern, for the test molecules
+with a cml and mol2 file.
+Run from the repository root with: python -m tests.benchmark_aip_atom_types
+"""
+
+import glob
+import os
+import timeit
+from filereader.cml_reader import CmlReader
+from filereader.mol2reader import Mol2Reader
+from aip_atom_types.assign_aip_atom_types import assign_aip_atom_types, AROMATIC_FG_GRAPHS, \
+    FG_GRAPHS, match_atoms_by_fg_description, update_dict_atoms_with_sybyl
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "test_files")
+
+
+def legacy_assign_aip_atom_types(network, aromatic=False):
+    """The sequential GraphMatcher searches that the compiled patterns replaced"""
+    dict_atoms = {}
+    for fg_graph in (AROMATIC_FG_GRAPHS if aromatic else []) + FG_GRAPHS:
+        match = match_atoms_by_fg_description(network, fg_graph, dict_atoms)
+        for k, v in match.items():
+            dict_atoms[k] = v
+    return update_dict_atoms_with_sybyl(network, dict_atoms)
+
+
+def main(repeat=5):
+    print("{:<22} {:>6} {:>14} {:>14} {:>8}".format(
+        "molecule", "atoms", "legacy / ms", "compiled / ms", "speedup"))
+    total_legacy = 0.0
+    total_compiled = 0.0
+    for mol2_file in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.mol2"))):
+        cml_file = mol2_file.replace(".mol2", ".cml")
+        if not os.path.isfile(cml_file):
+            continue
+        network = CmlReader(cml_file, ns=None).get_cml_network_with_sybyl(
+            Mol2Reader(mol2_file, from_file=True))
+        for aromatic in [False, True]:
+            assert assign_aip_atom_types(network, aromatic) == \
+                legacy_assign_aip_atom_types(network, aromatic), mol2_file
+        legacy = min(timeit.repeat(lambda: legacy_assign_aip_atom_types(network), number=1,
+                                   repeat=repeat))
+        compiled = min(timeit.repeat(lambda: assign_aip_atom_types(network), number=1,
+                                     repeat=repeat))
+        total_legacy += legacy
+        total_compiled += compiled
+        print("{:<22} {:>6} {:>14.2f} {:>14.2f} {:>7.1f}x".format(
+            os.path.basename(cml_file), len(network), legacy*1000, compiled*1000, legacy/compiled))
+    print("{:<22} {:>6} {:>14.2f} {:>14.2f} {:>7.1f}x".format(
+        "total", "", total_legacy*1000, total_compiled*1000, total_legacy/total_compiled))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark of reading many aip.xml files into columns with the streaming bulk reader, serially
+and over a process pool, against building an AipReader per file.
+Run from the repository root with: python -m tests.benchmark_aip_bulk_reader
+"""
+
+import os
+import shutil
+import tempfile
+import timeit
+import numpy as np
+from filereader.aip_reader import AipReader
+from filereader.aip_bulk_reader import read_aip_files
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "test_files")
+AIP_FILE = os.path.join(FIXTURE_DIR, "water_ssip.xml")
+
+
+def legacy_read(aip_files):
+    """Values of all AIPs read through AipReader objects"""
+    values = []
+    for aip_file in aip_files:
+        reader = AipReader(aip_file)
+        values += [aip.value for aip in reader.list_aips]
+    return np.array(values)
+
+
+def main(repeat=3, n_files=2000):
+    directory = tempfile.mkdtemp()
+    try:
+        aip_files = [shutil.copy(AIP_FILE, os.path.join(directory, f"{i}_ssip.xml"))
+                     for i in range(n_files)]
+        assert np.array_equal(legacy_read(aip_files), read_aip_files(aip_files, n_processes=1).aips["value"])
+        legacy = min(timeit.repeat(lambda: legacy_read(aip_files), number=1, repeat=repeat))
+        serial = min(timeit.repeat(lambda: read_aip_files(aip_files, n_processes=1), number=1,
+                                   repeat=repeat))
+        pool = min(timeit.repeat(lambda: read_aip_files(aip_files), number=1, repeat=repeat))
+        print("{:>8} {:>14} {:>12} {:>12}".format("files", "AipReader / s", "serial / s", "pool / s"))
+        print("{:>8} {:>14.2f} {:>12.2f} {:>12.2f}".format(n_files, legacy, serial, pool))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
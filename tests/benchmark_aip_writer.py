@@ -0,0 +1,75 @@
+"""
+Benchmark of writing AIP files by appending to the writer's tree against the previous path,
+which deep-copied the parsed cml tree on construction and again for the surface and the AIPs.
+Run from the repository root with: python -m tests.benchmark_aip_writer
+"""
+
+import copy
+import os
+import tempfile
+import timeit
+from lxml import etree
+from filewriter.AIP_writer import AIPWriter, write_aip_files
+from aip_footprinting.AIP_class import AIP
+from aip_footprinting.surface_class import Surface
+from aip_footprinting.read_MEPS import MEPS
+from aip_footprinting.footprinting import Footprinting
+from aip_footprinting.atom_class import AtomSet
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "test_files")
+CML_FILE = os.path.join(FIXTURE_DIR, "methane_nwchem_out.cml")
+CUBE_FILE = os.path.join(FIXTURE_DIR, "methane_merged.cube")
+CUBE_MIDDLE = os.path.join(FIXTURE_DIR, "methane_0104_merged.cube")
+
+
+def legacy_write(cml_file, surface, list_aips, filename):
+    """The deep-copying composition that write_file replaced"""
+    writer = AIPWriter(cml_file)
+    writer.tree = copy.deepcopy(writer.tree)
+    tree = writer.add_aip_information(writer.add_surface_information(writer.tree, surface), list_aips)
+    tree.write(filename, encoding="UTF-8", xml_declaration=True, pretty_print=True)
+
+
+def make_aips(n_aips):
+    list_aips = []
+    for i in range(n_aips):
+        aip = AIP()
+        aip.set_value(float(i))
+        aip.set_xyz(i, i, i)
+        aip.set_nearest_atom("a1")
+        aip.set_atom_type("H.O")
+        aip.set_mepsvalue(0.001)
+        aip.set_isosurface("0.0300")
+        aip.set_AIP_area_fraction(1.0)
+        list_aips.append(aip)
+    return list_aips
+
+
+def main(n_files=200, repeat=3):
+    meps = MEPS(CUBE_FILE, CML_FILE)
+    atoms = AtomSet()
+    atoms._create_from_MEPS(meps)
+    surface = Surface(meps, Footprinting(meps, 0, MEPS(CUBE_MIDDLE, CML_FILE), atoms), atoms)
+
+    print("{:>6} {:>8} {:>12} {:>12} {:>8}".format("aips", "files", "legacy / ms", "bulk / ms",
+                                                 "speedup"))
+    with tempfile.TemporaryDirectory() as directory:
+        for n_aips in [5, 50, 500]:
+            list_aips = make_aips(n_aips)
+            filenames = [os.path.join(directory, "{}.xml".format(i)) for i in range(n_files)]
+            molecules = [(CML_FILE, surface, list_aips, f) for f in filenames]
+            write_aip_files(molecules[:1])
+            with open(filenames[0], "rb") as open_file:
+                reference = open_file.read()
+            legacy_write(CML_FILE, surface, list_aips, filenames[0])
+            with open(filenames[0], "rb") as open_file:
+                assert open_file.read() == reference
+            legacy = min(timeit.repeat(lambda: [legacy_write(*m) for m in molecules],
+                                       number=1, repeat=repeat))
+            bulk = min(timeit.repeat(lambda: write_aip_files(molecules), number=1, repeat=repeat))
+            print("{:>6} {:>8} {:>12.1f} {:>12.1f} {:>7.1f}x".format(
+                n_aips, n_files, legacy*1000, bulk*1000, legacy/bulk))
+
+
+if __name__ == "__main__":
+    main()
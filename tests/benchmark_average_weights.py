@@ -0,0 +1,46 @@
+"""
+Benchmark of the average3 virtual-site weights of all AIPs of a molecule from one batched
+numpy.linalg.solve call against the previous sympy.solve of each AIP.
+Run from the repository root with: python -m tests.benchmark_average_weights
+"""
+
+import timeit
+import numpy as np
+from filewriter.compute_virtual_sites import get_average_weights_batch, format_weight
+
+
+def legacy_average_weights(ssip_xyz, anchor_xyz):
+    """The sympy.solve of each AIP that get_average_weights_batch replaced, as written strings"""
+    import sympy as sym
+    A, B, C = sym.symbols('A,B,C')
+    strings = []
+    for xyz in ssip_xyz:
+        equations = [sym.Eq(A*anchor_xyz[0][k] + B*anchor_xyz[1][k] + C*anchor_xyz[2][k], xyz[k])
+                     for k in range(3)]
+        result = sym.solve(equations, (A, B, C))
+        strings.append([str(round(v, 3)) for v in result.values()])
+    return strings
+
+
+def average_weights(ssip_xyz, anchor_xyz):
+    return [[format_weight(w) for w in weights]
+            for weights in get_average_weights_batch(ssip_xyz, anchor_xyz)]
+
+
+def main(repeat=3):
+    random = np.random.RandomState(0)
+    anchor_xyz = random.normal(size=(3, 3))
+    print("{:>6} {:>12} {:>12} {:>8}".format("aips", "sympy / ms", "numpy / ms", "speedup"))
+    for n_aips in [4, 8, 16]:
+        ssip_xyz = random.normal(scale=3.0, size=(n_aips, 3))
+        assert average_weights(ssip_xyz, anchor_xyz) == legacy_average_weights(ssip_xyz, anchor_xyz)
+        legacy = min(timeit.repeat(lambda: legacy_average_weights(ssip_xyz, anchor_xyz), number=1,
+                                   repeat=repeat))
+        batched = min(timeit.repeat(lambda: average_weights(ssip_xyz, anchor_xyz), number=1,
+                                    repeat=repeat))
+        print("{:>6} {:>12.2f} {:>12.2f} {:>7.0f}x".format(
+            n_aips, legacy*1000, batched*1000, legacy/batched))
+
+
+if __name__ == "__main__":
+    main()
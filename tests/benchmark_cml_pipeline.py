@@ -0,0 +1,73 @@
+"""
+Benchmark of the CML conversion in cmlmaker from a single openbabel parse against the previous
+round-trips through CML, mol2 and InChI text, on the same embedded structures, followed by the
+time spent in each stage of the new pipeline, conformer embedding included.
+Run from the repository root with: python -m tests.benchmark_cml_pipeline
+"""
+
+import timeit
+from lxml import etree
+import cmlgenerator.cmlmaker as cmlmaker
+import cmlgenerator.cmlnamespacing as cmlname
+import cmlgenerator.smilestocml as smicml
+import cmlgenerator.structuretocml as structcml
+from filereader.cml_reader import CmlReader
+from filereader.mol2reader import Mol2Reader
+
+SMILES = {
+    "ethanol": "CCO",
+    "paracetamol": "CC(=O)Nc1ccc(O)cc1",
+    "ibuprofen": "CC(C)Cc1ccc(cc1)C(C)C(=O)O",
+    "tenoxicam": "CN1C(=C(O)Nc2ccccn2)C(=O)c2sccc2S1(=O)=O",
+    "triphenylphosphine": "c1ccc(cc1)P(c1ccccc1)c1ccccc1",
+}
+
+
+def legacy_create_cml_from_cml_string(molecule_cml_orig, add_sybyl=False, add_aip_atom_types=False,
+                                      aromatic=False):
+    """The text round-trips that create_cml_from_cml_string replaced"""
+    molecule_cml = structcml.perform_conversion_from_string(molecule_cml_orig, "cml", aromatic)
+    if add_sybyl:
+        cml = CmlReader(molecule_cml, from_file=False, ns=None)
+        molecule_mol2 = structcml.perform_mol2_conversion_from_string(molecule_cml_orig, in_format="cml")
+        mol2 = Mol2Reader(molecule_mol2, from_file=False)
+        if add_aip_atom_types:
+            molecule_cml = etree.tostring(cml.get_cml_with_sybyl_and_aip_atom_types(mol2, aromatic), encoding="unicode")
+        else:
+            molecule_cml = etree.tostring(cml.get_cml_with_sybyl_info(mol2), encoding="unicode")
+    inchikey = structcml.generate_inchikey_for_cml(molecule_cml)
+    return inchikey, cmlname.convert_molecule_from_string(inchikey, molecule_cml)
+
+
+def embedded_cml(smiles_string):
+    rd_mol = smicml.generate_mol_from_smiles(smiles_string)
+    rd_mol, conf_id = smicml.generate_3d_structure_for_mol(rd_mol, max_confs=10, random_seed=7)
+    return smicml.convert_structure_to_cml(rd_mol, conf_id)
+
+
+def main(number=20, repeat=3):
+    options = {"add_sybyl": True, "add_aip_atom_types": True, "aromatic": True}
+    print("{:<20} {:>6} {:>12} {:>12} {:>8}".format(
+        "molecule", "atoms", "legacy / ms", "single / ms", "speedup"))
+    for name, smiles_string in SMILES.items():
+        molecule_cml = embedded_cml(smiles_string)
+        expected = legacy_create_cml_from_cml_string(molecule_cml, **options)
+        actual = cmlmaker.create_cml_from_cml_string(molecule_cml, **options)
+        assert actual[0] == expected[0] and etree.tostring(actual[1]) == etree.tostring(expected[1]), name
+        legacy = min(timeit.repeat(lambda: legacy_create_cml_from_cml_string(molecule_cml, **options),
+                                   number=number, repeat=repeat)) / number
+        single = min(timeit.repeat(lambda: cmlmaker.create_cml_from_cml_string(molecule_cml, **options),
+                                   number=number, repeat=repeat)) / number
+        n_atoms = len(CmlReader(molecule_cml, from_file=False, ns=None).list_atoms)
+        print("{:<20} {:>6} {:>12.2f} {:>12.2f} {:>7.1f}x".format(
+            name, n_atoms, legacy*1000, single*1000, legacy/single))
+
+    cmlmaker.PROFILE.reset()
+    for smiles_string in SMILES.values():
+        cmlmaker.create_cml_from_smiles(smiles_string, max_confs=10, random_seed=7, **options)
+    print()
+    print(cmlmaker.PROFILE.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Benchmark of conformer generation and MMFF minimisation in
+smilestocml.GenerateAndMinimiseConformers, single-threaded as before against RDKit threads
+and RMSD pruning of the embedded conformers before minimisation.
+Run from the repository root with: python -m tests.benchmark_conformers
+"""
+
+import timeit
+import cmlgenerator.smilestocml as smicml
+
+SMILES = {
+    "paracetamol": "CC(=O)Nc1ccc(O)cc1",
+    "ibuprofen": "CC(C)Cc1ccc(cc1)C(C)C(=O)O",
+    "tenoxicam": "CN1C(=C(O)Nc2ccccn2)C(=O)c2sccc2S1(=O)=O",
+}
+SETTINGS = [
+    ("serial", {}),
+    ("threads=0", {"num_threads": 0}),
+    ("threads=0 prune=0.5", {"num_threads": 0, "prune_rms_thresh": 0.5}),
+]
+
+
+def conformers(smiles_string, max_confs, **kwargs):
+    mol = smicml.generate_mol_from_smiles(smiles_string)
+    mol, conf_id = smicml.generate_3d_structure_for_mol(mol, max_confs=max_confs, random_seed=7,
+                                                        **kwargs)
+    return mol.GetNumConformers()
+
+
+def main(repeat=3, max_confs=100):
+    print("{:<14} {:<22} {:>8} {:>10}".format("molecule", "settings", "confs", "time / s"))
+    for name, smiles_string in SMILES.items():
+        for label, kwargs in SETTINGS:
+            n_confs = conformers(smiles_string, max_confs, **kwargs)
+            seconds = min(timeit.repeat(lambda: conformers(smiles_string, max_confs, **kwargs),
+                                        number=1, repeat=repeat))
+            print("{:<14} {:<22} {:>8} {:>10.2f}".format(name, label, n_confs, seconds))
+
+
+if __name__ == "__main__":
+    main()
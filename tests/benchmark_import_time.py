@@ -0,0 +1,60 @@
+"""
+Start-up benchmark of the command line entry points. Each module is imported in a fresh
+interpreter with python -X importtime, and the total time and the heaviest imports are reported.
+Run from the repository root with: python -m tests.benchmark_import_time
+
+@author: Katarzyna Joanna Zator (kz265)
+"""
+
+import re
+import subprocess
+import sys
+
+# modules loaded by the entry points, including the driver imported by each CLI run
+ENTRY_POINTS = {
+    "aip_footprinting": ["aip_footprinting.__main__", "aip_footprinting.AIP_footprinting_script"],
+    "aip_footprinting --dnn": ["aip_footprinting.__main__", "aip_footprinting.DNN_footprinting_script"],
+    "aip_footprinting.batch_footprinting": ["aip_footprinting.batch_footprinting",
+                                            "aip_footprinting.AIP_footprinting_byIn"],
+    "cmlgenerator": ["cmlgenerator.__main__"],
+    "filewriter.aip_ff_writer": ["filewriter.aip_ff_writer"],
+}
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+TRACKED = ["pandas", "scipy", "sklearn_extra", "mendeleev", "networkx", "sympy", "mayavi", "rdkit",
+           "openbabel"]
+
+
+def import_times(modules):
+    """Runs the imports in a fresh interpreter and returns the total time and, for each tracked
+       package, the time spent importing it (both in microseconds)"""
+    code = "; ".join("import {}".format(m) for m in modules)
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, check=True).stderr
+    lines = [(len(m.group(3)), m.group(4), int(m.group(2))) for m in IMPORT_LINE.finditer(output)]
+    total = sum(cumulative for depth, _, cumulative in lines if depth == 1)
+
+    # a module is listed after everything it imports, so walk backwards to find each parent
+    packages = {}
+    stack = []
+    for depth, module, cumulative in reversed(lines):
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        package = module.split(".")[0]
+        parent_package = stack[-1][1].split(".")[0] if stack else None
+        if package in TRACKED and parent_package != package:
+            packages[package] = packages.get(package, 0) + cumulative
+        stack.append((depth, module))
+    return total, packages
+
+
+def main(repeat=3):
+    print("{:<40} {:>10}  {}".format("entry point", "total / ms", "heavy packages loaded (ms)"))
+    for name, modules in ENTRY_POINTS.items():
+        runs = [import_times(modules) for _ in range(repeat)]
+        total, packages = min(runs, key=lambda run: run[0])
+        heavy = ", ".join("{} {:.0f}".format(p, packages[p]/1000) for p in TRACKED if p in packages)
+        print("{:<40} {:>10.0f}  {}".format(name, total/1000, heavy or "-"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark of the anchor selection for virtual sites from breadth-first hop distances against
+the previous per-target Dijkstra searches, for every atom of the test molecules.
+Run from the repository root with: python -m tests.benchmark_virtual_sites
+"""
+
+import glob
+import os
+import timeit
+from filereader.cml_reader import CmlReader
+from filewriter.compute_virtual_sites import get_anchors, get_hop_distances, compute_cross
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "test_files")
+
+
+def legacy_get_anchors(neigh, network, dict_atom):
+    """The shortest_path_length loops that get_anchors replaced"""
+    from networkx.algorithms import shortest_path_length
+    anchor_list = []
+    h_num = 0
+    j = 0
+    if neigh.element == 'H':
+        h_num += 1
+    while len(anchor_list) < 2 and j < 3:
+        j += 1
+        for i in list(network.nodes):
+            if shortest_path_length(network, source=neigh.aname, target=i, weight=None, method='dijkstra') == j:
+                if dict_atom[i].element == 'H':
+                    h_num += 1
+                if h_num < 2 and dict_atom[i].element == 'H':
+                    anchor_list.append(i)
+                elif dict_atom[i].element != 'H':
+                    anchor_list.append(i)
+    if len(anchor_list) < 2:
+        j = 0
+        while len(anchor_list) < 2 and j < 3:
+            j += 1
+            for i in list(network.nodes):
+                if shortest_path_length(network, source=neigh.aname, target=i, weight=None, method='dijkstra') == j and i not in anchor_list:
+                    anchor_list.append(i)
+    if len(anchor_list) >= 2 and 0.0 < compute_cross(neigh.xyz, dict_atom[anchor_list[0]].xyz, dict_atom[anchor_list[1]].xyz) < 0.01:
+        for i in list(network.nodes):
+            short_path = shortest_path_length(
+                network, source=neigh.aname, target=i, weight=None, method='dijkstra')
+            if short_path > 1 and i not in anchor_list:
+                anchor_list.append(i)
+        anchor_list.remove(anchor_list[1])
+    return neigh, dict_atom[anchor_list[0]], dict_atom[anchor_list[1]]
+
+
+def legacy_all_anchors(reader, network):
+    return [[a.aname for a in legacy_get_anchors(atom, network, reader.dict_atoms)]
+            for atom in reader.list_atoms]
+
+
+def all_anchors(reader, network):
+    hop_distances = get_hop_distances(network)
+    return [[a.aname for a in get_anchors(atom, network, reader.dict_atoms, hop_distances)]
+            for atom in reader.list_atoms]
+
+
+def main(repeat=3):
+    print("{:<30} {:>6} {:>12} {:>12} {:>8}".format(
+        "molecule", "atoms", "legacy / ms", "bfs / ms", "speedup"))
+    for cml_file in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.cml"))):
+        try:
+            reader = CmlReader(cml_file)
+            if len(reader.list_atoms) == 0:
+                reader = CmlReader(cml_file, ns=None)
+        except Exception:
+            continue
+        network = reader.get_cml_network()
+        if len(reader.list_atoms) < 3 or len(reader.list_bonds) < 2:
+            continue
+        try:
+            expected = legacy_all_anchors(reader, network)
+        except Exception:
+            # disconnected networks or too few anchors fail in both versions
+            continue
+        assert all_anchors(reader, network) == expected, cml_file
+        legacy = min(timeit.repeat(lambda: legacy_all_anchors(reader, network), number=1, repeat=repeat))
+        bfs = min(timeit.repeat(lambda: all_anchors(reader, network), number=1, repeat=repeat))
+        print("{:<30} {:>6} {:>12.2f} {:>12.2f} {:>7.1f}x".format(
+            os.path.basename(cml_file), len(reader.list_atoms), legacy*1000, bfs*1000, legacy/bfs))
+
+
+if __name__ == "__main__":
+    main()
@@ -157,6 +157,23 @@ class CMLMakerTestCase(unittest.TestCase):
             self.expected_cml, etree.tounicode(actual_cml, pretty_print=True)
         )
 
+    def test_conversion_profile(self):
+        """Test to see if the time of each conversion stage is recorded.
+        """
+        cmlmaker.PROFILE.reset()
+        actual_inchikey, actual_cml = cmlmaker.create_cml_from_file(
+            self.mol_filename, "mol", add_sybyl=True, add_aip_atom_types=True
+        )
+        self.assertEqual(self.inchikey, actual_inchikey)
+        self.assertListEqual(
+            ["parse", "cml", "sybyl", "aip_atom_types", "inchikey", "namespace"],
+            list(cmlmaker.PROFILE.calls),
+        )
+        self.assertTrue(all(calls == 1 for calls in cmlmaker.PROFILE.calls.values()))
+        self.assertEqual(7, len(cmlmaker.PROFILE.report().splitlines()))
+        cmlmaker.PROFILE.reset()
+        self.assertDictEqual({}, cmlmaker.PROFILE.seconds)
+
     def test_create_filename_frominchikey(self):
         """Test to see if expected file name is returned.
         """
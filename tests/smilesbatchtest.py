@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#    cmlgenerator creates fully namespaced CML for molecules from input structures.
+#    Copyright (C) 2019  Mark D. Driver
+#
+#    cmlgenerator is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+Script for tests of the parallel SMILES batch conversion.
+"""
+
+import csv
+import logging
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+import cmlgenerator.cmlmaker as cmlmaker
+import cmlgenerator.smilesbatch as smilesbatch
+from cmlgenerator.cmlgenerator import create_argparser, process_args
+
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.WARN)
+
+ETHANOL_INCHIKEY = "LFQSCWFLJHTTHZ-UHFFFAOYSA-N"
+WATER_INCHIKEY = "XLYOFNOQVPJJNP-UHFFFAOYSA-N"
+CREATE_CML_FROM_SMILES = cmlmaker.create_cml_from_smiles
+
+
+def slow_create_cml_from_smiles(smiles_string, **kwargs):
+    """create_cml_from_smiles that hangs on methane and kills its process on ammonia."""
+    if smiles_string == "C":
+        time.sleep(60)
+    elif smiles_string == "N":
+        os._exit(1)
+    return CREATE_CML_FROM_SMILES(smiles_string, **kwargs)
+
+
+class SmilesBatchTestCase(unittest.TestCase):
+    """Test case for the SMILES batch conversion.
+    """
+
+    def setUp(self):
+        """Set up before tests.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.smiles_list = ["CCO", "not_a_smiles", "O"]
+
+    def tearDown(self):
+        """Clean up after tests.
+        """
+        shutil.rmtree(self.directory)
+
+    def test_batch_generate_cml_from_smiles(self):
+        """Test that failures are collected into the report while other SMILES are converted.
+        """
+        rows = smilesbatch.batch_generate_cml_from_smiles(self.smiles_list, directory=self.directory,
+                                                          max_confs=2)
+        self.assertEqual([row["status"] for row in rows], ["ok", "failed", "ok"])
+        self.assertEqual([row["inchikey"] for row in rows], [ETHANOL_INCHIKEY, "", WATER_INCHIKEY])
+        self.assertTrue(os.path.isfile(os.path.join(self.directory, ETHANOL_INCHIKEY + ".cml")))
+        with open(os.path.join(self.directory, "smiles_report.tsv"), "r") as report_file:
+            report = list(csv.DictReader(report_file, delimiter="\t"))
+        self.assertEqual([row["smiles"] for row in report], self.smiles_list)
+        self.assertNotEqual(report[1]["error"], "")
+
+    def test_resume(self):
+        """Test that SMILES with an existing CML file are skipped.
+        """
+        smilesbatch.batch_generate_cml_from_smiles(["CCO"], directory=self.directory, max_confs=2)
+        with mock.patch.object(smilesbatch, "generate_cml_record",
+                               side_effect=AssertionError("not skipped")):
+            rows = smilesbatch.batch_generate_cml_from_smiles(["CCO"], directory=self.directory,
+                                                              resume=True)
+        self.assertEqual(rows[0]["status"], "skipped")
+        self.assertEqual(rows[0]["inchikey"], ETHANOL_INCHIKEY)
+
+    def test_timeout_and_worker_failure(self):
+        """Test that a hanging or crashing molecule does not stop the other workers.
+        """
+        with mock.patch.object(cmlmaker, "create_cml_from_smiles", slow_create_cml_from_smiles):
+            start = time.perf_counter()
+            rows = smilesbatch.batch_generate_cml_from_smiles(
+                ["C", "N", "CCO", "O"], directory=self.directory, n_workers=2, timeout=5,
+                max_confs=2)
+        self.assertLess(time.perf_counter() - start, 30)
+        self.assertEqual([row["status"] for row in rows], ["failed", "failed", "ok", "ok"])
+        self.assertIn("TimeoutError", rows[0]["error"])
+        self.assertIn("WorkerError", rows[1]["error"])
+
+    def test_process_generator_args(self):
+        """Test that the CLI batch mode returns every failure.
+        """
+        smiles_file = os.path.join(self.directory, "smiles.txt")
+        with open(smiles_file, "w") as open_file:
+            open_file.write("not_a_smiles\nCCO\nalso_not_a_smiles\n")
+        args = create_argparser().parse_args(["generate", "-s", "-b", smiles_file, "--confs", "2",
+                                              "-o", self.directory, "-j", "1"])
+        output_values = process_args(args)
+        self.assertEqual([smiles for smiles, error in output_values],
+                         ["not_a_smiles", "also_not_a_smiles"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -189,6 +189,25 @@ M  END
             type(re.match(self.expected_molblock2, actual_molblock)) is not None
         )
 
+    def test_generate_and_minimise_conformers(self):
+        """Test threaded embedding with RMSD pruning and an energy window.
+        """
+        def conformers(**kwargs):
+            mol = smicml.generate_3d_structure_for_mol(
+                smicml.generate_mol_from_smiles("CCCCCCO"), max_confs=30, random_seed=42, **kwargs
+            )[0]
+            return mol.GetNumConformers()
+
+        all_conformers = conformers()
+        self.assertEqual(30, all_conformers)
+        self.assertEqual(all_conformers, conformers(num_threads=2))
+        self.assertLess(conformers(prune_rms_thresh=1.0), all_conformers)
+        mol, conf_id = smicml.generate_3d_structure_for_mol(
+            smicml.generate_mol_from_smiles("CCCCCCO"), max_confs=30, random_seed=42,
+            energy_window=0.0
+        )
+        self.assertEqual([conf_id], [conf.GetId() for conf in mol.GetConformers()])
+
     def test_generate_mol_from_smiles(self):
         """Test to see if expected molecule is generated.
         """
@@ -162,3 +162,17 @@ GASTEIGER
         """
         actual_mol2 = structcml.perform_mol2_conversion_from_file(self.mol_filename, "mol")
         self.assertMultiLineEqual(self.expected_mol2, actual_mol2)
+
+    def test_structure_conversion(self):
+        """Test to see if CML, sybyl types and InChIKey come from one parse.
+        """
+        structure = structcml.StructureConversion.from_string(self.expected_mol, "mol")
+        self.assertMultiLineEqual(self.expected_cml, structure.cml())
+        expected_sybyl = {"a{}".format(i + 1): line.split()[5] for i, line in enumerate(
+            self.expected_mol2.split("@<TRIPOS>ATOM\n")[1].split("@<TRIPOS>BOND")[0].splitlines())}
+        self.assertDictEqual(expected_sybyl, structure.sybyl_types())
+        self.assertEqual("LFQSCWFLJHTTHZ-UHFFFAOYSA-N", structure.inchikey())
+        from_file = structcml.StructureConversion.from_file(self.mol_filename, "mol")
+        self.assertMultiLineEqual(self.expected_cml, from_file.cml())
+        with self.assertRaises(ValueError):
+            structcml.StructureConversion.from_string("not a molecule", "cml")
@@ -1,7 +1,8 @@
 import unittest
 from filereader.cml_reader import CmlReader
 from filereader.mol2reader import Mol2Reader
-from aip_atom_types.assign_aip_atom_types import assign_aip_atom_types
+from aip_atom_types.assign_aip_atom_types import assign_aip_atom_types, CompiledPattern, \
+    match_atoms_by_fg_description, FG_GRAPHS, AROMATIC_FG_GRAPHS
 import os
 from lxml import etree
 import logging
@@ -347,6 +348,18 @@ class TestCmlMol2Comparison(unittest.TestCase):
         self.assertEqual(match["a6"], "Br")
         self.assertEqual(match["a7"], "H.soft")
 
+    def test_compiled_patterns(self):
+        LOGGER.info("TESTING COMPILED PATTERNS AGAINST GRAPHMATCHER")
+        network = self.cml_tenoxicam.get_cml_network_with_sybyl(
+            self.mol2_tenoxicam)
+        for fg_graph in AROMATIC_FG_GRAPHS + FG_GRAPHS:
+            self.assertEqual(CompiledPattern(fg_graph).update_dict_atoms(network, {}),
+                             match_atoms_by_fg_description(network, fg_graph, {}))
+        # atoms typed by an earlier pattern are kept
+        typed = {"a5": "C.3"}
+        CompiledPattern(FG_GRAPHS[2]).update_dict_atoms(network, typed)
+        self.assertEqual(typed["a5"], "C.3")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from filereader.aip_reader import AipReader
+from filereader.aip_bulk_reader import read_aip_files, SURFACE_COLUMNS
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'test_files', '')
+
+aip_water = f"{FIXTURE_DIR}/water_ssip.xml"
+aip_simple = f"{FIXTURE_DIR}/simple_ssip.xml"
+
+
+class TestAipBulkReader(unittest.TestCase):
+    def setUp(self):
+        self.tmp_directory = tempfile.mkdtemp()
+        self.broken = os.path.join(self.tmp_directory, "broken_ssip.xml")
+        with open(self.broken, "w") as open_file:
+            open_file.write("<ssip:SSIPMolecule")
+        self.files = [aip_water, self.broken, aip_water]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_directory)
+
+    def assertSameAips(self, columns, molecule_index, aip_file):
+        reader = AipReader(aip_file)
+        mask = columns.aips["molecule_index"] == molecule_index
+        self.assertEqual(list(columns.aips["value"][mask]), [a.value for a in reader.list_aips])
+        np.testing.assert_array_equal(columns.aips["xyz"][mask],
+                                      np.vstack([a.xyz for a in reader.list_aips]))
+        self.assertEqual(list(columns.aips["mepsvalue"][mask]), [a.mepsvalue for a in reader.list_aips])
+        self.assertEqual(list(columns.aips["isosurface"][mask]), [a.isosurface for a in reader.list_aips])
+        self.assertEqual(list(columns.aips["fraction"][mask]), [a.fraction for a in reader.list_aips])
+        self.assertEqual(list(columns.aips["atom_type"][mask]), [a.atom_type for a in reader.list_aips])
+        self.assertEqual(list(columns.aips["atom_name"][mask]), [a.atom_name for a in reader.list_aips])
+        self.assertEqual(columns.molecules["inchikey"][molecule_index], reader.inchikey)
+        for column in SURFACE_COLUMNS:
+            expected = getattr(reader.surface, column)
+            if expected is None:
+                self.assertTrue(np.isnan(columns.molecules[column][molecule_index]))
+            else:
+                self.assertEqual(columns.molecules[column][molecule_index], expected)
+
+    def test_matches_aip_reader(self):
+        columns = read_aip_files(self.files, n_processes=1)
+        self.assertEqual(len(columns), 8)
+        self.assertSameAips(columns, 0, aip_water)
+        self.assertSameAips(columns, 2, aip_water)
+
+    def test_failed_file(self):
+        columns = read_aip_files(self.files, n_processes=1)
+        self.assertEqual(columns.molecules["error"][0], "")
+        self.assertIn("XMLSyntaxError", columns.molecules["error"][1])
+        self.assertFalse(np.any(columns.aips["molecule_index"] == 1))
+
+    def test_process_pool(self):
+        serial = read_aip_files(self.files + [aip_simple], n_processes=1)
+        parallel = read_aip_files(self.files + [aip_simple], n_processes=2, chunksize=1)
+        for column in serial.aips:
+            np.testing.assert_array_equal(serial.aips[column], parallel.aips[column])
+        self.assertEqual(list(serial.molecules["inchikey"]), list(parallel.molecules["inchikey"]))
+
+    def test_to_dataframe(self):
+        df = read_aip_files(self.files, n_processes=1).to_dataframe()
+        self.assertEqual(len(df), 8)
+        self.assertEqual(list(df.inchikey.unique()), [AipReader(aip_water).inchikey])
+        self.assertIn("total", df.columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from filereader.aip_reader import AipReader
+from filereader.aip_store import AipStore, create_parser
+from filewriter.AIP_writer import AIPWriter
+from aip_footprinting.surface_class import Surface
+from aip_footprinting.read_MEPS import MEPS
+from aip_footprinting.footprinting import Footprinting
+from aip_footprinting.atom_class import AtomSet
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'test_files', '')
+
+aip_water = f"{FIXTURE_DIR}/water_ssip.xml"
+cml_nw = f"{FIXTURE_DIR}/methane_nwchem_out.cml"
+cube_nw = f"{FIXTURE_DIR}/methane_merged.cube"
+cube_middle = f"{FIXTURE_DIR}/methane_0104_merged.cube"
+
+
+class TestAipStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_directory = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_directory, "aip_store.db")
+        self.store = AipStore(self.db_file)
+        self.water = AipReader(aip_water)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_directory)
+
+    def test_import_aip_files(self):
+        self.assertEqual(self.store.add_aip_files([aip_water, aip_water], n_processes=1), 2)
+        # the second import of the molecule replaces the first
+        self.assertEqual(self.store.inchikeys(), [self.water.inchikey])
+        stored = self.store.get_aips(self.water.inchikey)
+        self.assertEqual([a.value for a in stored], [a.value for a in self.water.list_aips])
+        self.assertEqual([a.atom_type for a in stored], [a.atom_type for a in self.water.list_aips])
+        np.testing.assert_array_equal(np.vstack([a.xyz for a in stored]),
+                                      np.vstack([a.xyz for a in self.water.list_aips]))
+        surface = self.store.get_surface(self.water.inchikey)
+        self.assertEqual(surface.total, self.water.surface.total)
+        self.assertEqual(surface.negative_nonpolar, self.water.surface.negative_nonpolar)
+        self.assertIsNone(self.store.get_surface("MISSING"))
+
+    def test_query_aips(self):
+        self.store.add_molecule(self.water.inchikey, self.water.surface, self.water.list_aips)
+        self.store.add_molecule("OTHER", self.water.surface, self.water.list_aips[:1])
+        expected = [a.value for a in self.water.list_aips if a.atom_type == "O.3.water" and a.value < -5]
+        result = self.store.query_aips(atom_type="O.3.water", value_below=-5,
+                                       inchikey=self.water.inchikey)
+        self.assertEqual(list(result["value"]), expected)
+        self.assertEqual(result["xyz"].shape, (len(expected), 3))
+        self.assertEqual(len(self.store.query_aips(inchikey=["OTHER"])["value"]), 1)
+        self.assertEqual(len(self.store.query_aips(atom_type="N.1")["value"]), 0)
+        self.store.remove_molecule("OTHER")
+        self.assertEqual(len(self.store.query_aips()["value"]), len(self.water.list_aips))
+        self.store.close()
+        result = AipReader.query_store(self.db_file, atom_type="O.3.water", value_below=-5)
+        self.assertEqual(list(result["value"]), expected)
+        self.store = AipStore(self.db_file)
+
+    def test_writer_appends_to_store(self):
+        meps = MEPS(cube_nw, cml_nw)
+        atom = AtomSet()
+        atom._create_from_MEPS(meps)
+        aip = Footprinting(meps, 0, MEPS(cube_middle, cml_nw), atom)
+        surface = Surface(meps, aip, atom)
+        writer = AIPWriter(cml_nw)
+        filename = os.path.join(self.tmp_directory, "methane_aip.xml")
+        writer.write_file(surface, aip.AIP, filename, store=self.store)
+        written = AipReader(filename)
+        stored = self.store.get_aips(writer.inchikey)
+        self.assertEqual([a.value for a in stored], [a.value for a in written.list_aips])
+        self.assertEqual([a.mepsvalue for a in stored], [a.mepsvalue for a in written.list_aips])
+        self.assertEqual(self.store.get_surface(writer.inchikey).total_nonpolar,
+                         written.surface.total_nonpolar)
+
+    def test_parser(self):
+        args = create_parser().parse_args(["-d", self.db_file, "-i", aip_water, "-np", "1"])
+        self.assertEqual(args.aip_files, [aip_water])
+        self.assertEqual(args.processes, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
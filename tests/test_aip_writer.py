@@ -1,5 +1,5 @@
 import unittest
-from filewriter.AIP_writer import AIPWriter, CML_NAMESPACE_DICT
+from filewriter.AIP_writer import AIPWriter, CML_NAMESPACE_DICT, write_aip_files
 from aip_footprinting.AIP_class import AIP
 from aip_footprinting.surface_class import Surface
 from aip_footprinting.read_MEPS import MEPS
@@ -109,6 +109,34 @@ class TestAIPWriter(unittest.TestCase):
             CML_NAMESPACE_DICT["ssip"])], str(self.aip_area_fraction))
         tp.close()
 
+    def test_write_file_without_copies(self):
+        reference_tree = self.aip_writer.add_aip_information(
+            self.aip_writer.add_surface_information(self.aip_writer.tree, self.surface), self.list_aips)
+        reference = etree.tostring(reference_tree, encoding="UTF-8", xml_declaration=True,
+                                   pretty_print=True)
+        self.assertEqual(etree.tostring(self.aip_writer.get_surface_aip_tree(self.surface, self.list_aips),
+                                        encoding="UTF-8", xml_declaration=True, pretty_print=True),
+                         reference)
+        with tempfile.TemporaryDirectory() as directory:
+            filenames = [os.path.join(directory, "{}.xml".format(i)) for i in range(2)]
+            self.aip_writer.write_file(self.surface, self.list_aips, filenames[0])
+            self.aip_writer.write_file(self.surface, self.list_aips, filenames[1])
+            for filename in filenames:
+                with open(filename, "rb") as open_file:
+                    self.assertEqual(open_file.read(), reference)
+            # the writer's own tree is left as it was
+            self.assertEqual(len(self.aip_writer.tree.getroot()), 1)
+
+    def test_write_aip_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            molecules = [(cml_nw, self.surface, self.list_aips[:i + 1],
+                          os.path.join(directory, "{}.xml".format(i))) for i in range(2)]
+            filenames = write_aip_files(molecules)
+            self.assertEqual(filenames, [m[3] for m in molecules])
+            for i, filename in enumerate(filenames):
+                tree = etree.parse(filename)
+                self.assertEqual(len(tree.xpath("//ssip:SSIP", namespaces=CML_NAMESPACE_DICT)), i + 1)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,101 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import cmlgenerator.cmlmaker as cmlmaker
+import aip_atom_types.batch_assign as batch_assign
+from aip_atom_types.batch_assign import batch_assign_aip_atom_types, create_parser, find_structure_files
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'test_files', '')
+
+mol2_water = f"{FIXTURE_DIR}/water.mol2"
+mol2_phenol = f"{FIXTURE_DIR}/phenol.mol2"
+mol2_urea = f"{FIXTURE_DIR}/urea.mol2"
+
+
+def type_record_or_die(source, record, molecule_cml, output_dir, aromatic=False):
+    """Stands in for type_record, with the worker killed outright for record 3"""
+    if record == 3:
+        os._exit(9)
+    return {"source": source, "record": record, "inchikey": "", "status": "ok", "seconds": 0.0,
+            "output": "", "error": ""}
+
+
+class TestBatchAtomTypes(unittest.TestCase):
+    def setUp(self):
+        self.tmp_directory = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.tmp_directory, "library")
+        self.output_dir = os.path.join(self.tmp_directory, "cml")
+        os.makedirs(self.input_dir)
+        # a multi-record file followed by a file with no readable molecule
+        with open(os.path.join(self.input_dir, "a_library.mol2"), "w") as open_file:
+            for mol2_file in [mol2_water, mol2_phenol]:
+                with open(mol2_file, "r") as mol2:
+                    open_file.write(mol2.read())
+        with open(os.path.join(self.input_dir, "b_broken.mol2"), "w") as open_file:
+            open_file.write("not a molecule\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_directory)
+
+    def test_find_structure_files(self):
+        self.assertEqual(find_structure_files([self.input_dir, mol2_urea]),
+                         [os.path.join(self.input_dir, "a_library.mol2"),
+                          os.path.join(self.input_dir, "b_broken.mol2"), mol2_urea])
+
+    def test_batch_assign(self):
+        results, summary = batch_assign_aip_atom_types([self.input_dir, mol2_urea], self.output_dir,
+                                                       n_processes=1, chunksize=2)
+        self.assertEqual([(os.path.basename(r["source"]), r["record"]) for r in results],
+                         [("a_library.mol2", 0), ("a_library.mol2", 1), ("b_broken.mol2", 0),
+                          ("urea.mol2", 0)])
+        self.assertEqual([r["status"] for r in results], ["ok", "ok", "failed", "ok"])
+        self.assertEqual(summary["molecules"], 4)
+        self.assertEqual(summary["failed"], 1)
+        self.assertGreater(summary["molecules_per_second"], 0)
+        # the same cml as cmlgenerator generate -y -t writes for the single file
+        single_dir = os.path.join(self.tmp_directory, "single")
+        os.makedirs(single_dir)
+        cmlmaker.generate_cml_file_from_file(mol2_urea, "mol2", directory=single_dir, add_sybyl=True,
+                                             add_aip_atom_types=True)
+        filename = os.path.basename(results[3]["output"])
+        with open(os.path.join(single_dir, filename), "r") as expected, \
+                open(results[3]["output"], "r") as written:
+            self.assertEqual(written.read(), expected.read())
+        with open(results[0]["output"], "r") as open_file:
+            self.assertIn('cml:aipAtomType="O.3.water"', open_file.read())
+        with open(os.path.join(self.output_dir, "atom_type_report.tsv"), "r") as open_file:
+            report = list(csv.DictReader(open_file, delimiter="\t"))
+        self.assertEqual([r["status"] for r in report], ["ok", "ok", "failed", "ok"])
+
+    def test_process_pool(self):
+        serial, summary = batch_assign_aip_atom_types([self.input_dir], self.output_dir, n_processes=1)
+        parallel, summary = batch_assign_aip_atom_types([self.input_dir], self.output_dir,
+                                                        n_processes=2, chunksize=1)
+        self.assertEqual([(r["record"], r["inchikey"], r["status"]) for r in serial],
+                         [(r["record"], r["inchikey"], r["status"]) for r in parallel])
+
+    def test_killed_worker(self):
+        library = os.path.join(self.tmp_directory, "killed.mol2")
+        with open(library, "w") as open_file, open(mol2_urea, "r") as mol2:
+            open_file.write(mol2.read() * 12)
+        with mock.patch.object(batch_assign, "type_record", type_record_or_die):
+            results, summary = batch_assign_aip_atom_types([library], self.output_dir,
+                                                           n_processes=2, chunksize=2)
+        self.assertEqual([r["record"] for r in results], list(range(12)))
+        self.assertEqual([r["status"] for r in results],
+                         ["failed" if i == 3 else "ok" for i in range(12)])
+        self.assertIn("BrokenProcessPool", results[3]["error"])
+        self.assertEqual(summary["failed"], 1)
+        self.assertTrue(os.path.isfile(os.path.join(self.output_dir, "atom_type_report.tsv")))
+
+    def test_parser(self):
+        args = create_parser().parse_args(["-i", self.input_dir, "-o", self.output_dir, "-np", "2", "-a"])
+        self.assertEqual(args.inputs, [self.input_dir])
+        self.assertEqual(args.processes, 2)
+        self.assertTrue(args.aromatic)
+
+
+if __name__ == '__main__':
+    unittest.main()
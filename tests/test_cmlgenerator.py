@@ -27,6 +27,7 @@ from tests.structuretocmltest import StructureToCMLTestCase
 from tests.smilestocmltest import SmilesToCMLTestCase
 from tests.cmlnamespacingtest import CMLNamespacingTestCase
 from tests.cmlmakertest import CMLMakerTestCase
+from tests.smilesbatchtest import SmilesBatchTestCase
 
 logging.basicConfig()
 LOGGER = logging.getLogger(__name__)
@@ -37,6 +38,7 @@ TESTCASES = [
     SmilesToCMLTestCase,
     CMLNamespacingTestCase,
     CMLMakerTestCase,
+    SmilesBatchTestCase,
 ]
 
 
@@ -0,0 +1,68 @@
+import unittest
+import os
+import numpy as np
+from filereader.cml_reader import CmlReader
+from filewriter.compute_virtual_sites import get_anchors, get_hop_distances, get_average_weights_batch, \
+    format_weight
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'test_files', '')
+
+cml_water = f"{FIXTURE_DIR}/water_ns.cml"
+cml_tenoxicam = f"{FIXTURE_DIR}/tenoxicam.cml"
+
+
+class TestComputeVirtualSites(unittest.TestCase):
+    def setUp(self):
+        self.water = CmlReader(cml_water)
+        self.tenoxicam = CmlReader(cml_tenoxicam)
+
+    def test_hop_distances(self):
+        hops = get_hop_distances(self.water.get_cml_network())
+        self.assertEqual(hops["a2"], {"a2": 0, "a1": 1, "a3": 2})
+
+    def test_water_anchors(self):
+        network = self.water.get_cml_network()
+        # a single hydrogen is taken at the first pass, the second one only as a fallback
+        anchors = get_anchors(self.water.dict_atoms["a2"], network, self.water.dict_atoms)
+        self.assertEqual([a.aname for a in anchors], ["a2", "a1", "a3"])
+        anchors = get_anchors(self.water.dict_atoms["a1"], network, self.water.dict_atoms)
+        self.assertEqual([a.aname for a in anchors], ["a1", "a2", "a3"])
+
+    def test_shared_hop_distances(self):
+        network = self.tenoxicam.get_cml_network()
+        hop_distances = get_hop_distances(network)
+        for atom in self.tenoxicam.list_atoms:
+            anchors = get_anchors(atom, network, self.tenoxicam.dict_atoms)
+            shared = get_anchors(atom, network, self.tenoxicam.dict_atoms, hop_distances)
+            self.assertEqual([a.aname for a in anchors], [a.aname for a in shared])
+            self.assertEqual(anchors[0], atom)
+            self.assertEqual(len({a.aname for a in anchors}), 3)
+
+    def test_average_weights_batch(self):
+        anchors = np.array([[1.0, 0.2, 0.0], [-0.3, 1.1, 0.4], [0.1, -0.5, 1.3]])
+        ssips = np.random.RandomState(0).normal(size=(5, 3))
+        weights = get_average_weights_batch(ssips, anchors)
+        for ssip, ssip_weights in zip(ssips, weights):
+            np.testing.assert_allclose(ssip_weights, np.linalg.solve(anchors.T, ssip))
+        np.testing.assert_allclose(get_average_weights_batch(ssips, np.stack([anchors] * 5)), weights)
+        self.assertEqual(get_average_weights_batch(np.empty((0, 3)), anchors).shape, (0, 3))
+
+    def test_degenerate_average_weights(self):
+        # water flattened onto a plane through the origin, as in water_ssip.xml: the SSIPs in
+        # that plane take the minimum-norm weights that still reproduce their position
+        anchors = np.vstack([self.water.dict_atoms[a].xyz for a in ["a1", "a2", "a3"]])
+        anchors[:, 1] = 0.0
+        ssip = 0.4 * anchors[0] + 0.6 * anchors[2]
+        weights = get_average_weights_batch(ssip, anchors)
+        self.assertTrue(np.all(np.isfinite(weights)))
+        np.testing.assert_allclose(weights[0] @ anchors, ssip, atol=1e-10)
+
+    def test_format_weight(self):
+        self.assertEqual(format_weight(-244.0204), "-244.020")
+        self.assertEqual(format_weight(-9.0002989), "-9.00000000000000")
+        self.assertEqual(format_weight(0.0096438), "0.01")
+        self.assertEqual(format_weight(0.0003), "0.0")
+        self.assertEqual(format_weight(-0.0007), "-0.e-3")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -63,3 +63,13 @@ class TestCubeReader(unittest.TestCase):
     def test_maximum_MEP_value(self):
         maximum = self.cube.values.max()
         self.assertEqual(0.403625, maximum)
+
+    def test_get_atoms(self):
+        parent_directory = pathlib.Path(__file__).resolve().parents[0]
+        cml_filename = (
+            (parent_directory / "test_files/ethanolnamespaced.cml").absolute().as_posix())
+        string_atoms, len_atoms = reader.TMesh.get_atoms(cml_filename, 1.0)
+        self.assertEqual(9, len_atoms)
+        lines = string_atoms.splitlines()
+        self.assertEqual("    6    0.000000   -0.888300    0.167000   -0.027300", lines[0])
+        self.assertEqual("    8    0.000000    1.431100    0.322900    0.586700", lines[2])
@@ -0,0 +1,40 @@
+"""
+Script for tests of the precomputed element table.
+
+@author: Katarzyna Joanna Zator (kz265)
+"""
+import logging
+import unittest
+import numpy as np
+from mendeleev import element
+import filereader.element_table as table
+
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.WARN)
+
+
+class ElementTableTestCase(unittest.TestCase):
+    """Test case for element property lookups"""
+
+    def test_matches_mendeleev(self):
+        LOGGER.info("Testing table values against mendeleev")
+        for symbol in ["H", "C", "N", "O", "S", "Cl", "I"]:
+            reference = element(symbol)
+            for elem in [symbol, reference.atomic_number]:
+                self.assertEqual(table.atomic_number(elem), reference.atomic_number)
+                self.assertEqual(table.vdw_radius(elem), reference.vdw_radius)
+                self.assertEqual(table.covalent_radius(elem), reference.covalent_radius)
+                self.assertEqual(table.cpk_color(elem), reference.cpk_color)
+                self.assertEqual(table.atomic_weight(elem), reference.atomic_weight)
+            self.assertEqual(table.VDW_RADIUS[reference.atomic_number], reference.vdw_radius)
+
+    def test_fallback(self):
+        LOGGER.info("Testing missing values fall back to mendeleev")
+        self.assertTrue(np.isnan(table.VDW_RADIUS[104]))
+        self.assertEqual(table.vdw_radius("Rf"), element("Rf").vdw_radius)
+        self.assertEqual(table.covalent_radius("Rf"), 157.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from lxml import etree
+from filewriter.phasetransferssipwriter import PhaseTransferSsipWriter, write_phase_transfer_files
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'test_files', '')
+
+aip_water = f"{FIXTURE_DIR}/water_ssip.xml"
+
+
+def to_bytes(tree):
+    return etree.tostring(tree, encoding="UTF-8", xml_declaration=True, pretty_print=True)
+
+
+class TestPhaseTransferSsipWriter(unittest.TestCase):
+    def setUp(self):
+        self.writer = PhaseTransferSsipWriter(aip_water)
+
+    def tearDown(self):
+        del self.writer
+
+    def read_files(self, directory):
+        filename = self.writer.aip.inchikey[:26]
+        with open(os.path.join(directory, filename + "A_ssip.xml"), "rb") as open_file:
+            file_a = open_file.read()
+        with open(os.path.join(directory, filename + "B_ssip.xml"), "rb") as open_file:
+            file_b = open_file.read()
+        return file_a, file_b
+
+    def test_write_files_with_whole_aips(self):
+        # water has AIPs with a whole fraction: A holds all the AIPs and B the whole ones
+        all_tree = self.writer.get_all_aips_tree()
+        whole_tree = self.writer.get_whole_aips_tree()
+        with tempfile.TemporaryDirectory() as directory:
+            self.writer.write_files(directory)
+            file_a, file_b = self.read_files(directory)
+        self.assertEqual(file_a, to_bytes(all_tree))
+        self.assertEqual(file_b, to_bytes(whole_tree))
+        self.assertEqual(len(etree.fromstring(file_a).xpath(
+            "//ssip:SSIP", namespaces={"ssip": "http://www-hunter.ch.cam.ac.uk/SSIP"})),
+            len(self.writer.aip.list_aips))
+
+    def test_write_files_split_halves(self):
+        # without any whole AIP the first AIP goes to A and the rest to B
+        for aip in self.writer.aip.list_aips:
+            aip.fraction = 0.5
+        half_trees = self.writer.get_split_half_aips_tree()
+        with tempfile.TemporaryDirectory() as directory:
+            self.writer.write_files(directory)
+            file_a, file_b = self.read_files(directory)
+        self.assertEqual(file_a, to_bytes(half_trees[0]))
+        self.assertEqual(file_b, to_bytes(half_trees[1]))
+
+    def test_write_phase_transfer_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            failed = write_phase_transfer_files([aip_water, "missing_ssip.xml"], directory)
+            self.assertEqual([f[0] for f in failed], ["missing_ssip.xml"])
+            self.assertEqual(len(os.listdir(directory)), 2)
+            file_a, file_b = self.read_files(directory)
+        self.assertEqual(file_a, to_bytes(self.writer.get_all_aips_tree()))
+        self.assertEqual(file_b, to_bytes(self.writer.get_whole_aips_tree()))
+
+if __name__ == '__main__':
+    unittest.main()